@@ -65,8 +65,11 @@ def find_radiology_files(root_directory: str) -> List[str]:
         logging.error(f"Error scanning directory: {e}")
         return []
 
-def process_files_in_batches(files: List[str], batch_size: int = 5) -> dict:
-    """Process files in batches to avoid memory issues"""
+def process_files_in_batches(files: List[str], batch_size: int = 5, encode_workers: int = None) -> dict:
+    """Process files in batches to avoid memory issues
+
+    encode_workers: encoder processes (None: one per pair of cores, 1: encode in-process)
+    """
     
     # Initialize the RAG system
     logging.info("Initializing RAG system...")
@@ -90,37 +93,41 @@ def process_files_in_batches(files: List[str], batch_size: int = 5) -> dict:
     
     start_time = time.time()
     
-    # Process files in batches
-    for i in range(0, total_files, batch_size):
-        batch = files[i:i + batch_size]
-        batch_num = (i // batch_size) + 1
-        total_batches = (total_files + batch_size - 1) // batch_size
+    # Chunk encoding is sharded across core-pinned worker processes for the whole run
+    with rag_system.bulk_encoding(workers=encode_workers):
+        # Process files in batches
+        for i in range(0, total_files, batch_size):
+            batch = files[i:i + batch_size]
+            batch_num = (i // batch_size) + 1
+            total_batches = (total_files + batch_size - 1) // batch_size
         
-        logging.info(f"\n--- Processing Batch {batch_num}/{total_batches} ---")
-        logging.info(f"Files in this batch: {len(batch)}")
+            logging.info(f"\n--- Processing Batch {batch_num}/{total_batches} ---")
+            logging.info(f"Files in this batch: {len(batch)}")
         
-        try:
-            # Process the batch
-            result = rag_system.process_documents(batch)
+            try:
+                # Parsing fans out across cores; chunks stream into the vector store as files finish
+                result = rag_system.process_documents(batch)
             
-            if result.get("success", False):
-                batch_processed = result.get("processed", 0)
-                processed_count += batch_processed
-                logging.info(f"Batch {batch_num} completed: {batch_processed} files processed")
-            else:
-                logging.warning(f"Batch {batch_num} had issues: {result.get('error', 'Unknown error')}")
-                failed_files.extend(batch)
+                if result.get("success", False):
+                    batch_processed = result.get("processed", 0)
+                    processed_count += batch_processed
+                    failed_files.extend(
+                        path for path, outcome in result.get("documents", {}).items()
+                        if outcome['status'] == 'failed'
+                    )
+                    logging.info(f"Batch {batch_num} completed: {batch_processed} files processed "
+                                 f"in {result.get('elapsed_seconds', 0)}s")
+                else:
+                    logging.warning(f"Batch {batch_num} had issues: {result.get('error', 'Unknown error')}")
+                    failed_files.extend(batch)
                 
-        except Exception as e:
-            logging.error(f"Error processing batch {batch_num}: {e}")
-            failed_files.extend(batch)
+            except Exception as e:
+                logging.error(f"Error processing batch {batch_num}: {e}")
+                failed_files.extend(batch)
             
-        # Progress update
-        percent_complete = (i + len(batch)) / total_files * 100
-        logging.info(f"Overall progress: {percent_complete:.1f}% ({processed_count}/{total_files} files)")
-        
-        # Small delay between batches
-        time.sleep(1)
+            # Progress update
+            percent_complete = (i + len(batch)) / total_files * 100
+            logging.info(f"Overall progress: {percent_complete:.1f}% ({processed_count}/{total_files} files)")
     
     processing_time = time.time() - start_time
     
@@ -138,7 +145,8 @@ def main():
     
     # Configuration
     SOURCE_DIRECTORY = r"X:\Subfolders\Rads HDD"
-    BATCH_SIZE = 2  # Process 2 files at a time to avoid memory issues with large collection
+    BATCH_SIZE = 50  # Memory stays bounded by the pipeline queue, not the batch size
+    ENCODE_WORKERS = None  # Encoder processes; None uses one per pair of cores, 1 encodes in-process
     
     logging.info("=== RADIOLOGY MATERIALS BULK INGESTION ===")
     logging.info(f"Source directory: {SOURCE_DIRECTORY}")
@@ -174,7 +182,7 @@ def main():
     logging.info(f"\n2. Starting bulk processing of {len(files_to_process)} files...")
     logging.info(f"Processing in batches of {BATCH_SIZE} files")
     
-    results = process_files_in_batches(files_to_process, BATCH_SIZE)
+    results = process_files_in_batches(files_to_process, BATCH_SIZE, ENCODE_WORKERS)
     
     # Step 3: Report results
     logging.info("\n=== PROCESSING COMPLETE ===")
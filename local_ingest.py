@@ -16,6 +16,7 @@ import json
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from retrieval.rag_system import RadiologyRAGSystem
+from document_processor.ingestion_manifest import IngestionManifest
 
 # Configure logging
 logging.basicConfig(
@@ -30,7 +31,8 @@ logging.basicConfig(
 class LocalRadiologyIngestor:
     def __init__(self):
         self.rag_system = RadiologyRAGSystem()
-        self.processed_files = self.load_processed_files()
+        # Shared with the RAG system, which records each document as it is indexed
+        self.manifest = self.rag_system._init_manifest() or IngestionManifest()
         self.stats = {
             'total_processed': 0,
             'successful': 0,
@@ -39,24 +41,6 @@ class LocalRadiologyIngestor:
             'total_chunks': 0
         }
 
-    def load_processed_files(self) -> Dict:
-        """Load record of already processed files"""
-        processed_file = Path("data/processed_documents.json")
-        if processed_file.exists():
-            try:
-                with open(processed_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-
-    def save_processed_files(self):
-        """Save record of processed files"""
-        processed_file = Path("data/processed_documents.json")
-        processed_file.parent.mkdir(exist_ok=True)
-        with open(processed_file, 'w') as f:
-            json.dump(self.processed_files, f, indent=2)
-
     def find_local_documents(self) -> List[str]:
         """Find all supported documents in local directories"""
 
@@ -82,57 +66,50 @@ class LocalRadiologyIngestor:
                         if any(file.lower().endswith(ext) for ext in extensions):
                             full_path = os.path.join(root, file)
 
-                            # Skip if already processed (check file modification time too)
-                            file_key = f"{full_path}:{os.path.getmtime(full_path)}"
-                            if file_key not in self.processed_files:
+                            # Skip if unchanged since it was last indexed
+                            needed, reason = self.manifest.check(full_path)
+                            if needed:
                                 documents.append(full_path)
-                                logging.info(f"Found: {file}")
+                                logging.info(f"Found: {file} ({reason})")
                             else:
-                                logging.debug(f"Already processed: {file}")
+                                logging.debug(f"Already processed: {file} ({reason})")
                                 self.stats['skipped'] += 1
 
         logging.info(f"Found {len(documents)} new documents to process")
         return documents
 
-    def process_documents_batch(self, documents: List[str], batch_size: int = 5):
-        """Process documents in batches for better memory management"""
-
-        total_batches = (len(documents) + batch_size - 1) // batch_size
-
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
-            batch_num = i // batch_size + 1
-
-            logging.info(f"Processing batch {batch_num}/{total_batches}")
+    def process_documents_batch(self, documents: List[str], batch_size: int = 5, encode_workers: int = None):
+        """Process documents in batches for better memory management
 
-            try:
-                result = self.rag_system.process_documents(batch)
+        encode_workers: encoder processes (None: one per pair of cores, 1: encode in-process)
+        """
 
-                if result.get('success', False):
-                    self.stats['successful'] += result.get('processed', 0)
-                    self.stats['total_chunks'] += result.get('total_chunks', 0)
+        total_batches = (len(documents) + batch_size - 1) // batch_size
 
-                    # Mark files as processed
-                    for doc_path in batch:
-                        file_key = f"{doc_path}:{os.path.getmtime(doc_path)}"
-                        self.processed_files[file_key] = {
-                            'processed_date': time.time(),
-                            'file_size': os.path.getsize(doc_path),
-                            'file_name': os.path.basename(doc_path)
-                        }
-                else:
+        # Chunk encoding is sharded across core-pinned worker processes for the whole run
+        with self.rag_system.bulk_encoding(workers=encode_workers):
+            for i in range(0, len(documents), batch_size):
+                batch = documents[i:i + batch_size]
+                batch_num = i // batch_size + 1
+
+                logging.info(f"Processing batch {batch_num}/{total_batches}")
+
+                try:
+                    result = self.rag_system.process_documents(batch)
+
+                    # The RAG system records each document in the manifest as it is indexed
+                    if result.get('success', False):
+                        self.stats['successful'] += result.get('processed', 0)
+                        self.stats['failed'] += len(result.get('errors', []))
+                        self.stats['skipped'] += result.get('skipped', 0)
+                        self.stats['total_chunks'] += result.get('total_chunks', 0)
+                    else:
+                        self.stats['failed'] += len(batch)
+                        logging.error(f"Batch processing failed: {result.get('error', 'Unknown error')}")
+
+                except Exception as e:
+                    logging.error(f"Error processing batch {batch_num}: {e}")
                     self.stats['failed'] += len(batch)
-                    logging.error(f"Batch processing failed: {result.get('error', 'Unknown error')}")
-
-                # Save progress after each batch
-                self.save_processed_files()
-
-                # Brief pause between batches
-                time.sleep(1)
-
-            except Exception as e:
-                logging.error(f"Error processing batch {batch_num}: {e}")
-                self.stats['failed'] += len(batch)
 
         self.stats['total_processed'] = self.stats['successful'] + self.stats['failed']
 
@@ -179,7 +156,7 @@ class LocalRadiologyIngestor:
             'ingestion_stats': self.stats,
             'timestamp': time.time(),
             'system_status': self.rag_system.get_system_status(),
-            'total_files_in_db': len(self.processed_files)
+            'total_files_in_db': len(self.manifest)
         }
 
         # Save report
@@ -193,7 +170,7 @@ class LocalRadiologyIngestor:
         logging.info(f"Failed: {self.stats['failed']}")
         logging.info(f"Skipped: {self.stats['skipped']}")
         logging.info(f"Total chunks: {self.stats['total_chunks']}")
-        logging.info(f"Files in database: {len(self.processed_files)}")
+        logging.info(f"Files in database: {len(self.manifest)}")
 
         return report
 
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Populate the BM25 lexical index from the RadBERT collections
+Run once after upgrading so hybrid search can match exact terms in existing content
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from embeddings.radbert_embedding_system import RadBERTEmbeddingSystem
+
+def main():
+    print("=== REBUILDING LEXICAL INDEX ===")
+
+    embedding_system = RadBERTEmbeddingSystem()
+    indexed = embedding_system.rebuild_lexical_index()
+
+    for category, count in indexed.items():
+        print(f"  • {category}: {count} records")
+    print(f"✅ Lexical index now holds {len(embedding_system.lexical_index)} documents")
+
+if __name__ == "__main__":
+    main()
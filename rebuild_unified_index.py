@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Populate the unified RadBERT collection from the specialized collections
+Run once after upgrading so searches use a single ANN pass; stored vectors are reused
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from embeddings.radbert_embedding_system import RadBERTEmbeddingSystem
+
+def main():
+    print("=== REBUILDING UNIFIED INDEX ===")
+
+    embedding_system = RadBERTEmbeddingSystem()
+    copied = embedding_system.rebuild_unified_index()
+
+    for category, count in copied.items():
+        print(f"  • {category}: {count} records")
+    print(f"✅ Unified collection now holds {embedding_system.unified_collection.count()} records")
+
+if __name__ == "__main__":
+    main()
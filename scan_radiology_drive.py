@@ -105,6 +105,9 @@ def main():
         
         print(f"\nNOTE: Processing large numbers of files will take time")
         print("   Estimated time: 1-2 minutes per file depending on size")
+        cores = os.cpu_count() or 1
+        print(f"   Chunk encoding runs in {max(1, cores // 2) if cores >= 4 else cores} encoder processes on this machine ({cores} cores);")
+        print("   set ENCODE_WORKERS in bulk_ingest_materials.py to change this")
     else:
         print(f"\nERROR: Cannot access the radiology drive.")
         print("Please check the drive connection and path.")
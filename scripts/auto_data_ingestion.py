@@ -9,7 +9,6 @@ import sys
 import time
 import logging
 import json
-import hashlib
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Set
@@ -22,6 +21,8 @@ script_dir = Path(__file__).parent
 project_root = script_dir.parent
 sys.path.append(str(project_root / "src"))
 
+from document_processor.ingestion_manifest import IngestionManifest
+
 try:
     from retrieval.rag_system import RadiologyRAGSystem
     RAG_AVAILABLE = True
@@ -102,86 +103,34 @@ class DataIngestionConfig:
         return self.config.get(key, default)
 
 class DocumentTracker:
-    """Track processed documents to avoid reprocessing"""
-    
-    def __init__(self, tracker_file: str = "./data/processed_documents.json"):
-        self.tracker_file = tracker_file
-        self.processed_files = self.load_tracker()
+    """Track processed documents to avoid reprocessing
     
-    def load_tracker(self) -> Dict:
-        """Load tracker from file"""
-        try:
-            if os.path.exists(self.tracker_file):
-                with open(self.tracker_file, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"Warning: Could not load tracker file: {e}")
-        return {}
+    A view over the shared ingestion manifest (data/ingestion_manifest.json), which
+    the RAG system also updates, so every ingest path agrees on what is indexed.
+    """
     
-    def save_tracker(self):
-        """Save tracker to file"""
-        try:
-            os.makedirs(os.path.dirname(self.tracker_file), exist_ok=True)
-            with open(self.tracker_file, 'w') as f:
-                json.dump(self.processed_files, f, indent=2)
-        except Exception as e:
-            print(f"Error saving tracker: {e}")
-    
-    def get_file_hash(self, file_path: str) -> str:
-        """Get hash of file for change detection"""
-        try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
-                return hashlib.md5(content).hexdigest()
-        except Exception as e:
-            print(f"Error hashing file {file_path}: {e}")
-            return ""
+    def __init__(self, manifest: IngestionManifest = None):
+        self.manifest = manifest or IngestionManifest()
     
     def is_processed(self, file_path: str) -> bool:
-        """Check if file has been processed"""
-        file_hash = self.get_file_hash(file_path)
-        if not file_hash:
-            return False
-        
-        abs_path = os.path.abspath(file_path)
-        
-        # Check if file exists in tracker and hash matches
-        if abs_path in self.processed_files:
-            return self.processed_files[abs_path].get('hash') == file_hash
-        
-        return False
+        """Check if file has been processed (stat fast path, hash only when inconclusive)"""
+        return not self.manifest.needs_processing(file_path)
     
     def mark_processed(self, file_path: str, processing_result: Dict):
-        """Mark file as processed"""
-        file_hash = self.get_file_hash(file_path)
-        abs_path = os.path.abspath(file_path)
-        
-        self.processed_files[abs_path] = {
-            'hash': file_hash,
-            'processed_at': datetime.now().isoformat(),
-            'result': processing_result,
-            'file_size': os.path.getsize(file_path),
-            'filename': os.path.basename(file_path)
-        }
+        """Record failures the RAG system never saw (successes are recorded during ingest)"""
+        if processing_result.get('success', False):
+            return
         
-        self.save_tracker()
+        try:
+            self.manifest.record(file_path, 'failed', self.manifest.chunk_ids(file_path),
+                                 error=processing_result.get('error'))
+            self.manifest.save()
+        except Exception as e:
+            print(f"Error saving ingestion manifest: {e}")
     
     def get_processed_stats(self) -> Dict:
         """Get statistics about processed files"""
-        if not self.processed_files:
-            return {'total': 0, 'successful': 0, 'failed': 0}
-        
-        total = len(self.processed_files)
-        successful = sum(1 for f in self.processed_files.values() 
-                        if f.get('result', {}).get('success', False))
-        failed = total - successful
-        
-        return {
-            'total': total,
-            'successful': successful, 
-            'failed': failed,
-            'success_rate': round((successful / total) * 100, 1) if total > 0 else 0
-        }
+        return self.manifest.get_stats()
 
 class DocumentProcessor:
     """Process documents using the RAG system"""
@@ -395,8 +344,10 @@ class AutoDataIngestion:
     
     def __init__(self, config_path: str = None):
         self.config = DataIngestionConfig(config_path) if config_path else DataIngestionConfig()
-        self.tracker = DocumentTracker()
         self.processor = DocumentProcessor(self.config)
+        # Share the RAG system's manifest so both sides see the same records
+        manifest = self.processor.rag_system._init_manifest() if self.processor.rag_system else None
+        self.tracker = DocumentTracker(manifest)
         self.observer = None
         self.watchers = []
         self.logger = logging.getLogger('AutoDataIngestion')
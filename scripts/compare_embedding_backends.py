@@ -0,0 +1,68 @@
+# scripts/compare_embedding_backends.py
+"""
+Compare the int8 ONNX embedding backend against the fp32 PyTorch model on the indexed corpus
+Reports encode throughput, memory and top-k retrieval overlap; --export-only just builds the ONNX model
+"""
+
+import sys
+import json
+import argparse
+import logging
+from pathlib import Path
+
+# Add src to path
+script_dir = Path(__file__).parent
+project_root = script_dir.parent
+sys.path.append(str(project_root / "src"))
+
+from embeddings.onnx_backend import compare_backends, export_quantized
+
+
+def load_corpus(collection_name: str, limit: int) -> list:
+    """Chunk texts from a Chroma collection in the local vector store"""
+    import chromadb
+    from chromadb.config import Settings
+
+    client = chromadb.PersistentClient(path="./data/embeddings", settings=Settings(anonymized_telemetry=False))
+    records = client.get_collection(collection_name).get(limit=limit, include=['documents'])
+    return [text for text in records['documents'] if text and text.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare int8 ONNX and fp32 embeddings")
+    parser.add_argument('--model', default="zzxslp/RadBERT-RoBERTa-4m", help="SentenceTransformer model name")
+    parser.add_argument('--collection', default="radiology_texts_radbert", help="Chroma collection to sample")
+    parser.add_argument('--limit', type=int, default=2000, help="Maximum corpus texts to encode")
+    parser.add_argument('--queries', help="Text file with one query per line (default: sample corpus texts)")
+    parser.add_argument('-k', type=int, default=10, help="Top-k for retrieval overlap")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--export-only', action='store_true', help="Export and quantize the model, then exit")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.export_only:
+        print(f"✅ Exported to {export_quantized(args.model)}")
+        return
+
+    texts = load_corpus(args.collection, args.limit)
+    if not texts:
+        print(f"❌ No documents in collection {args.collection}")
+        sys.exit(1)
+
+    queries = None
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    report = compare_backends(args.model, texts, queries=queries, k=args.k, batch_size=args.batch_size)
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# scripts/fill_question_pool.py
+"""
+Fill the board study question pool up to its targets in the foreground
+Useful before an exam simulation, or overnight, so sessions never wait on generation
+"""
+
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+# Add src to path
+script_dir = Path(__file__).parent
+project_root = script_dir.parent
+sys.path.append(str(project_root / "src"))
+
+from study.board_study_system import BoardStudySystem
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate board study questions")
+    parser.add_argument('--status', action='store_true', help="Print pool depth per section and exit")
+    parser.add_argument('--max-questions', type=int, default=None, help="Stop after generating this many")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    study_system = BoardStudySystem()
+    pool = study_system.question_pool
+
+    if not args.status:
+        generated = 0
+        failures = 0
+        while pool.shortfall() and (args.max_questions is None or generated < args.max_questions):
+            if pool.refill_once():
+                generated += 1
+                failures = 0
+                if generated % 5 == 0:
+                    pool.save()
+                    print(f"✅ {generated} generated, {sum(pool.shortfall().values())} still missing")
+            else:
+                failures += 1
+                if failures >= 3:
+                    print("❌ Generation keeps failing - is Ollama running?")
+                    break
+        pool.save()
+
+    for section, depths in pool.status().items():
+        print(f"{section:22} " + "  ".join(f"{difficulty}: {depth}" for difficulty, depth in depths.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# scripts/refresh_model_manifest.py
+"""
+Re-resolve the embedding model and rewrite its model manifest entry
+Startup loads the recorded model from disk without probing the Hub, so run this after
+downloading a better model or when the recorded copy has moved
+"""
+
+import sys
+import json
+import argparse
+import logging
+from pathlib import Path
+
+# Add src to path
+script_dir = Path(__file__).parent
+project_root = script_dir.parent
+sys.path.append(str(project_root / "src"))
+
+from embeddings.model_manifest import ModelManifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the local embedding model manifest")
+    parser.add_argument('--preference', default="radiology_optimized", help="Model preference to resolve")
+    parser.add_argument('--show', action='store_true', help="Print the manifest and exit")
+    parser.add_argument('--verify', action='store_true', help="Check the recorded model against its checksum and exit")
+    parser.add_argument('--forget', action='store_true', help="Drop the entry so the next startup probes again")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    manifest = ModelManifest()
+
+    if args.show:
+        print(json.dumps(manifest.entries, indent=2))
+        return
+
+    if args.verify:
+        entry = manifest.get(args.preference)
+        if entry is None:
+            print(f"❌ No manifest entry for {args.preference}")
+            sys.exit(1)
+        if manifest.verify(args.preference):
+            print(f"✅ {entry['model_name']} matches its checksum ({entry['path']})")
+        else:
+            print(f"❌ {entry['model_name']} does not match its checksum - run without --verify to refresh")
+            sys.exit(1)
+        return
+
+    if args.forget:
+        manifest.forget(args.preference)
+        manifest.save()
+        print(f"🗑️ Removed manifest entry for {args.preference}")
+        return
+
+    from embeddings.radbert_embedding_system import RadBERTEmbeddingSystem
+
+    system = RadBERTEmbeddingSystem(model_preference=args.preference, refresh_model=True)
+    entry = ModelManifest().get(args.preference)
+    if entry and entry['model_name'] == system.embedding_model_name:
+        print(f"✅ {args.preference} -> {entry['model_name']} ({entry['path']}, dimension {entry['dimension']})")
+    else:
+        print(f"⚠️ Resolved {system.embedding_model_name}, but found no local copy to record")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -36,6 +36,9 @@ PRIORITY_DIRS = [
     "Articles"              # Select journal articles
 ]
 
+# Encoder processes; None uses one per pair of cores, 1 encodes in-process
+ENCODE_WORKERS = None
+
 def process_priority_directories():
     """Process the most important directories first"""
     
@@ -54,64 +57,66 @@ def process_priority_directories():
     
     total_processed = 0
     
-    for priority_dir in PRIORITY_DIRS:
-        dir_path = source_root / priority_dir
+    # Chunk encoding is sharded across core-pinned worker processes for the whole run
+    with rag_system.bulk_encoding(workers=ENCODE_WORKERS):
+        for priority_dir in PRIORITY_DIRS:
+            dir_path = source_root / priority_dir
         
-        if not dir_path.exists():
-            logging.warning(f"Priority directory not found: {priority_dir}")
-            continue
+            if not dir_path.exists():
+                logging.warning(f"Priority directory not found: {priority_dir}")
+                continue
             
-        logging.info(f"\n=== PROCESSING: {priority_dir} ===")
+            logging.info(f"\n=== PROCESSING: {priority_dir} ===")
         
-        # Find files in this directory
-        files_in_dir = []
-        supported_extensions = {'.pdf', '.ppt', '.pptx'}
+            # Find files in this directory
+            files_in_dir = []
+            supported_extensions = {'.pdf', '.ppt', '.pptx'}
         
-        for file_path in dir_path.rglob('*'):
-            if (file_path.is_file() and 
-                file_path.suffix.lower() in supported_extensions and
-                not file_path.name.startswith('._') and  # Skip macOS metadata files
-                not file_path.name.startswith('.DS_Store')):  # Skip other system files
-                files_in_dir.append(str(file_path))
+            for file_path in dir_path.rglob('*'):
+                if (file_path.is_file() and 
+                    file_path.suffix.lower() in supported_extensions and
+                    not file_path.name.startswith('._') and  # Skip macOS metadata files
+                    not file_path.name.startswith('.DS_Store')):  # Skip other system files
+                    files_in_dir.append(str(file_path))
         
-        logging.info(f"Found {len(files_in_dir)} files in {priority_dir}")
+            logging.info(f"Found {len(files_in_dir)} files in {priority_dir}")
         
-        if not files_in_dir:
-            continue
+            if not files_in_dir:
+                continue
             
-        # Process files in small batches
-        batch_size = 2
-        processed_in_dir = 0
+            # Process files in small batches
+            batch_size = 2
+            processed_in_dir = 0
         
-        for i in range(0, len(files_in_dir), batch_size):
-            batch = files_in_dir[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
-            total_batches = (len(files_in_dir) + batch_size - 1) // batch_size
+            for i in range(0, len(files_in_dir), batch_size):
+                batch = files_in_dir[i:i + batch_size]
+                batch_num = (i // batch_size) + 1
+                total_batches = (len(files_in_dir) + batch_size - 1) // batch_size
             
-            logging.info(f"Processing batch {batch_num}/{total_batches} from {priority_dir}")
+                logging.info(f"Processing batch {batch_num}/{total_batches} from {priority_dir}")
             
-            try:
-                result = rag_system.process_documents(batch)
+                try:
+                    result = rag_system.process_documents(batch)
                 
-                if result.get("success", False):
-                    batch_processed = result.get("processed", 0)
-                    processed_in_dir += batch_processed
-                    total_processed += batch_processed
-                    logging.info(f"Batch completed: {batch_processed} files processed")
-                else:
-                    logging.warning(f"Batch failed: {result.get('error', 'Unknown error')}")
+                    if result.get("success", False):
+                        batch_processed = result.get("processed", 0)
+                        processed_in_dir += batch_processed
+                        total_processed += batch_processed
+                        logging.info(f"Batch completed: {batch_processed} files processed")
+                    else:
+                        logging.warning(f"Batch failed: {result.get('error', 'Unknown error')}")
                     
-            except Exception as e:
-                logging.error(f"Error processing batch: {e}")
+                except Exception as e:
+                    logging.error(f"Error processing batch: {e}")
             
-            # Progress update
-            percent_dir = (i + len(batch)) / len(files_in_dir) * 100
-            logging.info(f"Directory progress: {percent_dir:.1f}% ({processed_in_dir}/{len(files_in_dir)})")
+                # Progress update
+                percent_dir = (i + len(batch)) / len(files_in_dir) * 100
+                logging.info(f"Directory progress: {percent_dir:.1f}% ({processed_in_dir}/{len(files_in_dir)})")
             
-            # Small delay between batches
-            time.sleep(2)
+                # Small delay between batches
+                time.sleep(2)
         
-        logging.info(f"Completed {priority_dir}: {processed_in_dir}/{len(files_in_dir)} files processed")
+            logging.info(f"Completed {priority_dir}: {processed_in_dir}/{len(files_in_dir)} files processed")
     
     logging.info(f"\n=== SELECTIVE PROCESSING COMPLETE ===")
     logging.info(f"Total files processed: {total_processed}")
@@ -746,6 +746,7 @@ models:
     name: "llama3.1:8b"
     temperature: 0.1
     max_tokens: 1000
+    context_tokens: 2000  # Budget for retrieved context in each prompt
     
   multimodal:
     name: "llava:7b"  # For image analysis
@@ -0,0 +1,28 @@
+# src/config/settings.py
+"""
+Access to config/config.yaml settings
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+import logging
+
+DEFAULT_CONFIG_FILE = Path(__file__).resolve().parents[2] / "config" / "config.yaml"
+
+
+@lru_cache(maxsize=None)
+def load_app_config(config_file: str = str(DEFAULT_CONFIG_FILE)) -> Dict[str, Any]:
+    """Parsed config.yaml ({} when the file or PyYAML is missing)"""
+    try:
+        import yaml
+        with open(config_file, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Could not read {config_file}, using defaults: {e}")
+        return {}
+
+
+def get_setting(section: str, key: str, default: Any = None) -> Any:
+    """A single setting, e.g. get_setting('retrieval', 'rerank', False)"""
+    return (load_app_config().get(section) or {}).get(key, default)
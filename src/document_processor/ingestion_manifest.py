@@ -0,0 +1,200 @@
+# src/document_processor/ingestion_manifest.py
+"""
+Incremental ingestion manifest shared by every ingest path
+Records, per source file, its (inode, size, mtime) stamp, content hash and the chunk IDs it produced
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import threading
+
+DEFAULT_MANIFEST_FILE = "./data/ingestion_manifest.json"
+LEGACY_TRACKER_FILE = "./data/processed_documents.json"
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def file_stamp(path: str) -> Dict:
+    stat = os.stat(path)
+    return {'inode': stat.st_ino, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def hash_file(path: str) -> str:
+    """MD5 of the file read in 1 MB blocks (MD5 keeps hashes from the old tracker comparable)"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """JSON manifest of ingested files keyed by absolute path"""
+
+    def __init__(self, manifest_file: str = DEFAULT_MANIFEST_FILE,
+                 legacy_file: Optional[str] = LEGACY_TRACKER_FILE):
+        self.logger = logging.getLogger(__name__)
+        self.manifest_file = Path(manifest_file)
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.RLock()
+        self._load(legacy_file)
+
+    # ------------------------------------------------------------------ persistence
+
+    def _load(self, legacy_file: Optional[str]):
+        if self.manifest_file.exists():
+            try:
+                with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('files', {})
+                return
+            except Exception as e:
+                self.logger.warning(f"Could not read ingestion manifest, starting empty: {e}")
+                return
+
+        if legacy_file and os.path.exists(legacy_file):
+            self._import_legacy(legacy_file)
+
+    def _import_legacy(self, legacy_file: str):
+        """Adopt entries from processed_documents.json (DocumentTracker and local_ingest schemes)"""
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Could not read {legacy_file}: {e}")
+            return
+        if not isinstance(legacy, dict):
+            return  # The UI's plain list of uploaded paths carries no change information
+
+        for key, record in legacy.items():
+            if not isinstance(record, dict):
+                continue
+            if 'hash' in record:
+                # DocumentTracker: absolute path -> MD5 of contents
+                self.entries[file_key(key)] = {
+                    'md5': record['hash'],
+                    'size': record.get('file_size'),
+                    'status': 'indexed' if record.get('result', {}).get('success') else 'failed',
+                    'chunk_ids': [],
+                    'processed_at': record.get('processed_at')
+                }
+            elif ':' in key:
+                # local_ingest: "path:mtime" -> size
+                path, _, mtime = key.rpartition(':')
+                try:
+                    mtime_ns = int(float(mtime) * 1e9)
+                except ValueError:
+                    continue
+                self.entries[file_key(path)] = {
+                    'legacy_mtime_ns': mtime_ns,
+                    'size': record.get('file_size'),
+                    'status': 'indexed',
+                    'chunk_ids': [],
+                    'processed_at': datetime.fromtimestamp(record.get('processed_date', 0)).isoformat()
+                }
+
+        if self.entries:
+            self.logger.info(f"Imported {len(self.entries)} entries from {legacy_file}")
+            self.save()
+
+    def save(self):
+        with self._lock:
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.manifest_file.with_suffix('.json.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'files': self.entries}, f, indent=1)
+            os.replace(temp_file, self.manifest_file)
+
+    # ------------------------------------------------------------------ change detection
+
+    def check(self, path: str) -> Tuple[bool, str]:
+        """(needs processing, reason); hashes only when the cheap stat comparison is inconclusive"""
+        key = file_key(path)
+        try:
+            stamp = file_stamp(path)
+        except OSError as e:
+            return False, f"unreadable: {e}"
+
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return True, "new"
+            if entry.get('status') != 'indexed':
+                return True, "previously failed"
+
+            if all(entry.get(field) == stamp[field] for field in ('inode', 'size', 'mtime_ns')):
+                return False, "unchanged"
+
+            legacy_mtime = entry.get('legacy_mtime_ns')
+            if legacy_mtime is not None and entry.get('size') in (None, stamp['size']) \
+                    and abs(legacy_mtime - stamp['mtime_ns']) < 1000:
+                entry.update(stamp)
+                entry.pop('legacy_mtime_ns', None)
+                return False, "unchanged"
+
+            if entry.get('size') not in (None, stamp['size']) or not entry.get('md5'):
+                return True, "modified"
+
+        # Same size, different stamp (copied, touched, restored from backup): compare contents
+        digest = hash_file(path)
+        with self._lock:
+            if digest == entry.get('md5'):
+                entry.update(stamp)
+                return False, "unchanged (content)"
+        return True, "modified"
+
+    def needs_processing(self, path: str) -> bool:
+        return self.check(path)[0]
+
+    def chunk_ids(self, path: str) -> List[str]:
+        with self._lock:
+            return list(self.entries.get(file_key(path), {}).get('chunk_ids', []))
+
+    # ------------------------------------------------------------------ recording
+
+    def record(self, path: str, status: str, chunk_ids: Iterable[str] = (), error: Optional[str] = None):
+        """Store the outcome of ingesting path (call save() to persist)"""
+        key = file_key(path)
+        chunk_ids = list(chunk_ids)
+        entry = {
+            'status': status,
+            'chunk_ids': chunk_ids,
+            'processed_at': datetime.now().isoformat(),
+            'error': error
+        }
+        try:
+            entry.update(file_stamp(path))
+            entry['md5'] = hash_file(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.entries[key] = entry
+
+    def forget(self, path: str) -> List[str]:
+        """Drop path from the manifest, returning the chunk IDs it had produced"""
+        with self._lock:
+            entry = self.entries.pop(file_key(path), None)
+            return entry.get('chunk_ids', []) if entry else []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            total = len(self.entries)
+            indexed = sum(1 for entry in self.entries.values() if entry.get('status') == 'indexed')
+            return {
+                'total': total,
+                'successful': indexed,
+                'failed': total - indexed,
+                'success_rate': round(indexed / total * 100, 1) if total else 0,
+                'chunks': sum(len(entry.get('chunk_ids', [])) for entry in self.entries.values())
+            }
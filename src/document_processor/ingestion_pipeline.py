@@ -0,0 +1,268 @@
+# src/document_processor/ingestion_pipeline.py
+"""
+Pipelined document ingestion
+Parsing runs in a process pool, parsed documents flow through a bounded queue,
+and chunks are embedded and written to the vector store in batches as they arrive
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional
+import logging
+import os
+import queue
+import re
+import threading
+import time
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.ppt', '.pptx', '.txt')
+
+
+def assign_chunk_ids(chunks: List[Dict]) -> List[str]:
+    """Give each chunk its deterministic vector-store ID (kept in chunk['id'])"""
+    from embeddings.chunk_ids import make_chunk_id
+
+    for chunk in chunks:
+        if 'id' not in chunk:
+            metadata = chunk.get('metadata', {})
+            kind = "image" if metadata.get('chunk_type') == 'image' or 'image_data' in chunk else "text"
+            chunk['id'] = make_chunk_id(chunk.get('text', ''), metadata, kind=kind)
+    return [chunk['id'] for chunk in chunks]
+
+
+# Parsers are built once per worker process
+_processors = {}
+
+
+def _get_processor(kind: str):
+    if kind not in _processors:
+        if kind == 'pdf':
+            from document_processor.pdf_processor import PDFProcessor
+            _processors[kind] = PDFProcessor()
+        elif kind == 'ppt':
+            from document_processor.ppt_processor import PPTProcessor
+            _processors[kind] = PPTProcessor()
+        else:
+            from document_processor.transcript_processor import LectureTranscriptProcessor
+            _processors[kind] = LectureTranscriptProcessor()
+    return _processors[kind]
+
+
+def is_transcript(doc_path: str) -> bool:
+    """Heuristic: timestamps, speaker labels or a 'transcript' filename mark a lecture transcript"""
+    with open(doc_path, 'r', encoding='utf-8', errors='ignore') as f:
+        sample = f.read(1000)
+
+    return bool(re.search(r'\d{1,2}:\d{2}', sample) or
+                re.search(r'^[A-Z][a-z]+\s*:', sample, re.MULTILINE) or
+                'transcript' in os.path.basename(doc_path).lower())
+
+
+def parse_document(doc_path: str) -> Dict:
+    """Parse one file into chunks (runs in a worker process)
+
+    Returns {'path', 'chunks', 'transcript', 'stats'}; raises on parse failure.
+    """
+    lower_path = doc_path.lower()
+    transcript = False
+    stats = {}
+
+    if lower_path.endswith('.pdf'):
+        # Page-wise, so a textbook never sits in memory as one string
+        chunks = list(_get_processor('pdf').iter_chunks(doc_path))
+
+    elif lower_path.endswith(('.ppt', '.pptx')):
+        ppt_processor = _get_processor('ppt')
+        content = ppt_processor.extract_content(doc_path)
+        chunks = ppt_processor.create_chunks(content)
+
+    elif lower_path.endswith('.txt'):
+        if is_transcript(doc_path):
+            transcript_processor = _get_processor('transcript')
+            transcript_data = transcript_processor.process_transcript(doc_path)
+            chunks = transcript_processor.create_chunks(transcript_data)
+            stats = transcript_data.get('processing_stats', {})
+            transcript = True
+        else:
+            with open(doc_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+
+            chunks = [{
+                'text': content,
+                'metadata': {
+                    'source': doc_path,
+                    'chunk_type': 'text_file',
+                    'file_type': 'plain_text'
+                }
+            }]
+    else:
+        raise ValueError(f"Unsupported file type: {doc_path}")
+
+    return {'path': doc_path, 'chunks': chunks, 'transcript': transcript, 'stats': stats}
+
+
+class IngestionPipeline:
+    """Parse -> bounded queue -> batched embed/write, with per-document outcomes"""
+
+    def __init__(self, embedding_system,
+                 chunk_transform: Optional[Callable[[List[Dict]], List[Dict]]] = None,
+                 max_workers: Optional[int] = None,
+                 queue_size: int = 8,
+                 write_batch_chunks: int = 256,
+                 use_processes: bool = True):
+        self.logger = logging.getLogger(__name__)
+        self.embedding_system = embedding_system
+        self.chunk_transform = chunk_transform
+        self.max_workers = max_workers or self.default_workers(embedding_system)
+        self.queue_size = queue_size
+        self.write_batch_chunks = write_batch_chunks
+        self.use_processes = use_processes
+
+    @staticmethod
+    def default_workers(embedding_system) -> int:
+        """Parser processes: every core but one, or only the cores an active encoding pool leaves free"""
+        encoding_pool = getattr(embedding_system, 'encoding_pool', None)
+        if encoding_pool is not None and not encoding_pool.broken:
+            return max(1, encoding_pool.free_cores)
+        return max(1, (os.cpu_count() or 2) - 1)
+
+    def _make_executor(self):
+        if self.use_processes and self.max_workers > 1:
+            try:
+                return ProcessPoolExecutor(max_workers=self.max_workers)
+            except (OSError, NotImplementedError, PermissionError) as e:
+                self.logger.warning(f"Process pool unavailable, parsing in threads: {e}")
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest-parse")
+
+    def _produce(self, paths: List[str], parsed: "queue.Queue", stop: threading.Event):
+        """Parse in the pool, keeping at most 2x workers in flight, and feed the queue"""
+        executor = self._make_executor()
+        pending = {}
+        remaining = iter(paths)
+
+        def submit_next() -> bool:
+            for path in remaining:
+                pending[executor.submit(parse_document, path)] = path
+                return True
+            return False
+
+        try:
+            for _ in range(self.max_workers * 2):
+                if not submit_next():
+                    break
+
+            while pending and not stop.is_set():
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        item = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        item = {'path': path, 'error': str(e)}
+                    parsed.put(item)  # Blocks while the writer is behind
+                    submit_next()
+
+        except BrokenProcessPool as e:
+            # A worker died (e.g. out of memory on a huge PDF); report what didn't finish
+            for path in list(pending.values()) + list(remaining):
+                parsed.put({'path': path, 'error': f"Parser process failed: {e}"})
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            parsed.put(None)
+
+    def run(self, paths: List[str], progress_callback: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Ingest paths; returns totals plus a per-document status map
+
+        documents[path] = {'status': 'indexed' | 'failed' | 'skipped', 'chunks': int,
+                           'chunk_ids': [str], 'error': str}
+        """
+        start = time.perf_counter()
+        documents = {}
+        for path in paths:
+            if not path.lower().endswith(SUPPORTED_EXTENSIONS):
+                documents[path] = {'status': 'skipped', 'chunks': 0, 'chunk_ids': [],
+                                   'error': "Unsupported file type"}
+        to_parse = [path for path in paths if path not in documents]
+
+        parsed: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        producer = threading.Thread(target=self._produce, args=(to_parse, parsed, stop),
+                                    name="ingest-producer", daemon=True)
+        producer.start()
+
+        batch_chunks: List[Dict] = []
+        batch_docs: List[str] = []
+        stats = {'chunks_written': 0, 'write_batches': 0, 'transcript_count': 0}
+
+        def write_batch():
+            if not batch_chunks:
+                batch_docs.clear()
+                return
+            try:
+                self.embedding_system.add_text_chunks(batch_chunks)
+                stats['chunks_written'] += len(batch_chunks)
+                for path in batch_docs:
+                    documents[path]['status'] = 'indexed'
+            except Exception as e:
+                self.logger.error(f"❌ Vector store write failed for {len(batch_docs)} documents: {e}")
+                for path in batch_docs:
+                    documents[path].update({'status': 'failed', 'error': f"Vector store error: {e}"})
+            stats['write_batches'] += 1
+            batch_chunks.clear()
+            batch_docs.clear()
+
+        try:
+            while True:
+                item = parsed.get()
+                if item is None:
+                    break
+
+                path = item['path']
+                if 'error' in item:
+                    self.logger.error(f"Error processing {os.path.basename(path)}: {item['error']}")
+                    documents[path] = {'status': 'failed', 'chunks': 0, 'chunk_ids': [], 'error': item['error']}
+                else:
+                    chunks = item['chunks']
+                    if self.chunk_transform:
+                        chunks = self.chunk_transform(chunks)
+                    if item['transcript']:
+                        stats['transcript_count'] += 1
+
+                    # Nothing to write, so a document without chunks is indexed as soon as it's parsed
+                    documents[path] = {'status': 'parsed' if chunks else 'indexed', 'chunks': len(chunks),
+                                       'chunk_ids': assign_chunk_ids(chunks), 'error': None}
+                    if chunks:
+                        batch_chunks.extend(chunks)
+                        batch_docs.append(path)
+                    self.logger.info(f"Parsed {os.path.basename(path)}: {len(chunks)} chunks")
+
+                    if len(batch_chunks) >= self.write_batch_chunks:
+                        write_batch()
+
+                if progress_callback:
+                    progress_callback({'path': path, **documents[path]})
+
+            write_batch()
+        finally:
+            stop.set()
+            # Unblock the producer if the consumer stopped early
+            while producer.is_alive():
+                try:
+                    parsed.get_nowait()
+                except queue.Empty:
+                    producer.join(timeout=0.1)
+
+        elapsed = time.perf_counter() - start
+        indexed = [doc for doc in documents.values() if doc['status'] == 'indexed']
+        return {
+            'documents': documents,
+            'processed': len(indexed),
+            'failed': sum(1 for doc in documents.values() if doc['status'] == 'failed'),
+            'total_chunks': sum(doc['chunks'] for doc in indexed),
+            'transcript_count': stats['transcript_count'],
+            'write_batches': stats['write_batches'],
+            'elapsed_seconds': round(elapsed, 2),
+            'workers': self.max_workers
+        }
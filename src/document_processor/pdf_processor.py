@@ -1,124 +1,148 @@
 # src/document_processor/pdf_processor.py
 import pymupdf
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator
 import re
 import logging
 
+# Medical section headers that start a new chunking section
+SECTION_PATTERNS = [re.compile(pattern) for pattern in [
+    # Medical section headers
+    r'(?i)^(anatomy|pathology|clinical features|imaging findings|differential diagnosis|treatment|management).*$',
+    r'(?i)^(case \d+|patient \d+).*$',
+    r'(?i)^(introduction|conclusion|discussion|references|summary).*$',
+    # Radiology-specific sections
+    r'(?i)^(technique|protocol|indications|contraindications|complications).*$',
+    r'(?i)^(ct findings|mri findings|x-ray findings|ultrasound findings).*$',
+    # Physics sections
+    r'(?i)^(radiation safety|dose|image quality|artifacts).*$'
+]]
+
 class PDFProcessor:
     def __init__(self):
         self.chunk_size = 1000
         self.overlap = 200
         self.logger = logging.getLogger(__name__)
     
-    def extract_text_and_metadata(self, pdf_path: str) -> Dict:
-        """Extract text and metadata without problematic image processing"""
-        doc = pymupdf.open(pdf_path)
-        content = {
-            'text': '',
-            'metadata': {
-                'title': doc.metadata.get('title', ''),
-                'author': doc.metadata.get('author', ''),
-                'pages': doc.page_count,
-                'source': pdf_path
-            },
-            'pages': []
+    def _document_metadata(self, doc, pdf_path: str) -> Dict:
+        return {
+            'title': doc.metadata.get('title', ''),
+            'author': doc.metadata.get('author', ''),
+            'pages': doc.page_count,
+            'source': pdf_path
         }
-        
+    
+    def _pages(self, doc) -> Iterator[Dict]:
         for page_num in range(doc.page_count):
             page = doc[page_num]
-            text = page.get_text()
             
             # Skip image extraction to avoid PNG errors
             # We'll focus on text content for now
-            content['pages'].append({
+            yield {
                 'page_num': page_num + 1,  # 1-indexed for user display
-                'text': text,
+                'text': page.get_text(),
                 'has_images': len(page.get_images()) > 0  # Just note if images exist
-            })
-            content['text'] += text + '\n'
+            }
+    
+    def iter_pages(self, pdf_path: str) -> Iterator[Dict]:
+        """Yield one page at a time ({'page_num', 'text', 'has_images'})"""
+        with pymupdf.open(pdf_path) as doc:  # Closes the document even if the caller stops early
+            yield from self._pages(doc)
+    
+    def extract_text_and_metadata(self, pdf_path: str) -> Dict:
+        """Extract text and metadata without problematic image processing"""
+        with pymupdf.open(pdf_path) as doc:
+            pages = list(self._pages(doc))
+            return {
+                'text': ''.join(page['text'] + '\n' for page in pages),
+                'metadata': self._document_metadata(doc, pdf_path),
+                'pages': pages
+            }
+    
+    def iter_chunks(self, pdf_path: str) -> Iterator[Dict]:
+        """Stream chunks page by page; memory is bounded by the largest section, not the book
         
-        doc.close()  # Important: close the document
-        return content
+        Sections carry across page boundaries, so a header on one page and its body on
+        the next still form one section. Yields the same chunks as semantic_chunking on
+        the extracted text (a PDF with no text at all yields none).
+        """
+        with pymupdf.open(pdf_path) as doc:
+            metadata = self._document_metadata(doc, pdf_path)
+            
+            def lines() -> Iterator[str]:
+                # Same line sequence as splitting the joined document text
+                for page in self._pages(doc):
+                    yield from (page['text'] + '\n').split('\n')[:-1]
+                yield ''
+            
+            for section in self._iter_sections(lines()):
+                yield from self._chunk_section(section, metadata)
     
     def semantic_chunking(self, text: str, metadata: Dict) -> List[Dict]:
         """Medical-specific chunking logic"""
         sections = self._identify_medical_sections(text)
         chunks = []
-        
         for section in sections:
-            if len(section['text']) > self.chunk_size:
-                # Split large sections while preserving context
-                sub_chunks = self._split_with_overlap(section['text'])
-                for i, chunk_text in enumerate(sub_chunks):
-                    chunks.append({
-                        'text': chunk_text,
-                        'metadata': {
-                            **metadata,
-                            'section': section['title'],
-                            'chunk_id': f"{section['title']}_{i}",
-                            'chunk_type': 'text'
-                        }
-                    })
-            else:
-                chunks.append({
-                    'text': section['text'],
+            chunks.extend(self._chunk_section(section, metadata))
+        return chunks
+    
+    def _chunk_section(self, section: Dict, metadata: Dict) -> Iterator[Dict]:
+        """Chunks for one section, splitting large sections while preserving context"""
+        if len(section['text']) > self.chunk_size:
+            sub_chunks = self._split_with_overlap(section['text'])
+            for i, chunk_text in enumerate(sub_chunks):
+                yield {
+                    'text': chunk_text,
                     'metadata': {
                         **metadata,
                         'section': section['title'],
+                        'chunk_id': f"{section['title']}_{i}",
                         'chunk_type': 'text'
                     }
-                })
-        
-        return chunks
+                }
+        else:
+            yield {
+                'text': section['text'],
+                'metadata': {
+                    **metadata,
+                    'section': section['title'],
+                    'chunk_type': 'text'
+                }
+            }
     
-    def _identify_medical_sections(self, text: str) -> List[Dict]:
-        """Identify medical sections: Anatomy, Pathology, Imaging, etc."""
-        section_patterns = [
-            # Medical section headers
-            r'(?i)^(anatomy|pathology|clinical features|imaging findings|differential diagnosis|treatment|management).*$',
-            r'(?i)^(case \d+|patient \d+).*$', 
-            r'(?i)^(introduction|conclusion|discussion|references|summary).*$',
-            # Radiology-specific sections
-            r'(?i)^(technique|protocol|indications|contraindications|complications).*$',
-            r'(?i)^(ct findings|mri findings|x-ray findings|ultrasound findings).*$',
-            # Physics sections
-            r'(?i)^(radiation safety|dose|image quality|artifacts).*$'
-        ]
-        
-        sections = []
-        current_section = {'title': 'General Content', 'text': ''}
+    def _iter_sections(self, lines: Iterable[str]) -> Iterator[Dict]:
+        """Group lines into sections as they arrive, yielding each once the next header starts"""
+        title = 'General Content'
+        parts: List[str] = []
         
-        lines = text.split('\n')
         for line in lines:
             line_stripped = line.strip()
             
             # Skip empty lines
             if not line_stripped:
-                current_section['text'] += '\n'
+                parts.append('\n')
                 continue
             
             # Check if line is a section header
-            is_header = False
-            for pattern in section_patterns:
-                if re.search(pattern, line_stripped):
-                    # Save previous section if it has content
-                    if current_section['text'].strip():
-                        sections.append(current_section)
-                    
-                    # Start new section
-                    current_section = {
-                        'title': line_stripped[:100],  # Limit title length
-                        'text': ''
-                    }
-                    is_header = True
-                    break
-            
-            if not is_header:
-                current_section['text'] += line + '\n'
+            if any(pattern.search(line_stripped) for pattern in SECTION_PATTERNS):
+                # Emit previous section if it has content
+                text = ''.join(parts)
+                if text.strip():
+                    yield {'title': title, 'text': text}
+                
+                # Start new section
+                title = line_stripped[:100]  # Limit title length
+                parts = []
+            else:
+                parts.append(line + '\n')
         
-        # Add final section
-        if current_section['text'].strip():
-            sections.append(current_section)
+        # Final section
+        text = ''.join(parts)
+        if text.strip():
+            yield {'title': title, 'text': text}
+    
+    def _identify_medical_sections(self, text: str) -> List[Dict]:
+        """Identify medical sections: Anatomy, Pathology, Imaging, etc."""
+        sections = list(self._iter_sections(text.split('\n')))
         
         # If no sections found, create one big section
         if not sections:
@@ -9,6 +9,30 @@ from datetime import datetime, timedelta
 import logging
 from pathlib import Path
 
+from embeddings.medical_terms import get_medical_annotator
+
+
+def timestamp_to_seconds(timestamp: Optional[str]) -> Optional[int]:
+    """Seconds into the recording for 'H:MM:SS' or 'MM:SS' (minutes may run past 59)"""
+    if not timestamp:
+        return None
+    try:
+        parts = [int(part) for part in timestamp.strip('[] ').split(':')]
+    except ValueError:
+        return None
+    seconds = 0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return seconds
+
+
+def format_timestamp(seconds: int) -> str:
+    """'12:34', or '1:02:03' past the hour"""
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
 class LectureTranscriptProcessor:
     def __init__(self):
         self.chunk_size = 800  # Smaller for spoken content
@@ -245,6 +269,22 @@ class LectureTranscriptProcessor:
     def _create_lecture_segments(self, structured_content: Dict, metadata: Dict) -> List[Dict]:
         """Create searchable segments from structured content"""
         segments = []
+        lecture_title = metadata.get('inferred_title') or Path(metadata.get('source', '')).stem
+        
+        # A segment runs until the next later timestamp (the last one ends where it starts)
+        starts = [timestamp_to_seconds(segment.get('timestamp')) for segment in structured_content['segments']]
+        ends = [None] * len(starts)
+        next_index = None
+        for i in reversed(range(len(starts))):
+            if starts[i] is None:
+                continue
+            if next_index is not None and starts[next_index] > starts[i]:
+                ends[i] = starts[next_index]
+            elif next_index is not None and starts[next_index] == starts[i]:
+                ends[i] = ends[next_index]  # Same timestamp (e.g. a speaker change)
+            else:
+                ends[i] = starts[i]
+            next_index = i
         
         for i, segment in enumerate(structured_content['segments']):
             # Create base chunk
@@ -252,6 +292,10 @@ class LectureTranscriptProcessor:
             if not chunk_text:
                 continue
             
+            # Numeric position fields, so search can filter by time without re-parsing
+            segment = {**segment, 'segment_index': i, 'lecture_title': lecture_title,
+                       'timestamp_seconds': starts[i], 'segment_end_seconds': ends[i]}
+            
             # Split long segments
             if len(chunk_text) > self.chunk_size:
                 sub_chunks = self._split_lecture_segment(chunk_text)
@@ -284,8 +328,13 @@ class LectureTranscriptProcessor:
             'chunk_type': 'lecture_segment',
             'timestamp': segment.get('timestamp'),
             'speaker': segment.get('speaker'),
-            'line_start': segment.get('line_start')
+            'line_start': segment.get('line_start'),
+            'segment_index': segment.get('segment_index'),
+            'lecture_title': segment.get('lecture_title')
         }
+        if segment.get('timestamp_seconds') is not None:
+            metadata['timestamp_seconds'] = segment['timestamp_seconds']
+            metadata['segment_end_seconds'] = segment['segment_end_seconds']
         
         # Add lecture-specific tags
         lecture_tags = self._analyze_segment_content(text)
@@ -307,10 +356,11 @@ class LectureTranscriptProcessor:
         
         # Analyze content using medical lecture keywords
         for category, subcategories in self.medical_lecture_keywords.items():
+            field = 'emphasis_level' if category == 'emphasis' else category
             for subcat, keywords in subcategories.items():
                 for keyword in keywords:
                     if keyword in text_lower:
-                        analysis[category].append(subcat)
+                        analysis[field].append(subcat)
                         analysis['medical_relevance_score'] += 2
         
         # Check for transition phrases
@@ -407,23 +457,14 @@ class LectureTranscriptProcessor:
     
     def _analyze_topic_coverage(self, text: str) -> Dict:
         """Analyze what medical topics are covered"""
-        text_lower = text.lower()
+        annotation = get_medical_annotator().annotate(text)
         
-        # CORE exam areas
-        core_areas = {
-            'physics': ['physics', 'radiation', 'dose', 'technique', 'safety'],
-            'chest': ['lung', 'chest', 'pulmonary', 'pneumonia', 'nodule'],
-            'cardiac': ['heart', 'cardiac', 'coronary', 'echo', 'ekg'],
-            'neuro': ['brain', 'head', 'neurologic', 'stroke', 'spine'],
-            'gi': ['abdomen', 'liver', 'bowel', 'gi', 'gastrointestinal'],
-            'gu': ['kidney', 'bladder', 'pelvis', 'prostate', 'renal'],
-            'msk': ['bone', 'joint', 'fracture', 'musculoskeletal', 'spine'],
-            'interventional': ['biopsy', 'drainage', 'embolization', 'catheter']
-        }
+        # CORE exam areas (topic_* vocabularies)
+        core_areas = ['physics', 'chest', 'cardiac', 'neuro', 'gi', 'gu', 'msk', 'interventional']
         
         coverage = {}
-        for area, keywords in core_areas.items():
-            score = sum(text_lower.count(keyword) for keyword in keywords)
+        for area in core_areas:
+            score = annotation.count(f"topic_{area}")
             if score > 0:
                 coverage[area] = score
         
@@ -0,0 +1,59 @@
+# src/embeddings/chunk_ids.py
+"""
+Deterministic vector-store IDs for document chunks
+The same chunk of the same file always maps to the same ID, so re-ingesting upserts in place
+"""
+
+from typing import Dict, List, Tuple
+import hashlib
+import os
+
+from embeddings.query_embedding_cache import normalize_query
+
+# Metadata fields that locate a chunk inside its source, most specific last
+LOCATION_FIELDS = ('page', 'slide_number', 'segment_id', 'section', 'chunk_id', 'image_index')
+
+
+def normalize_source(source: str) -> str:
+    """Absolute, case-normalized path so relative and absolute spellings agree"""
+    if not source:
+        return ""
+    return os.path.normcase(os.path.abspath(source))
+
+
+def make_chunk_id(text: str, metadata: Dict, kind: str = "text") -> str:
+    """sha256 over source path, in-document location and normalized content"""
+    metadata = metadata or {}
+    source = normalize_source(metadata.get('source') or metadata.get('source_document') or "")
+    location = "|".join(f"{field}={metadata[field]}" for field in LOCATION_FIELDS
+                        if metadata.get(field) not in (None, ""))
+
+    digest = hashlib.sha256(f"{kind}\0{source}\0{location}\0{normalize_query(text)}".encode('utf-8'))
+    return f"{kind}-{digest.hexdigest()[:32]}"
+
+
+def dedupe_by_id(ids: List[str], *columns: List) -> Tuple[List, ...]:
+    """Drop repeated IDs (first occurrence wins) across parallel lists; Chroma rejects duplicates in one call"""
+    seen = set()
+    keep = []
+    for position, chunk_id in enumerate(ids):
+        if chunk_id not in seen:
+            seen.add(chunk_id)
+            keep.append(position)
+    return ([ids[position] for position in keep],
+            *([column[position] for position in keep] for column in columns))
+
+
+def flatten_metadata(metadata: Dict) -> Dict:
+    """Metadata Chroma can store and filter on: None dropped, lists joined, scalars kept as typed"""
+    flat = {}
+    for key, value in (metadata or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            flat[key] = ", ".join(str(item) for item in value)
+        elif isinstance(value, (str, int, float, bool)):
+            flat[key] = value
+        else:
+            flat[key] = str(value)
+    return flat
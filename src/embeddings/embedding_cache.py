@@ -0,0 +1,181 @@
+# src/embeddings/embedding_cache.py
+"""
+Persistent content-addressed cache of chunk embeddings
+Re-ingesting unchanged text costs a disk read instead of a transformer forward pass
+"""
+
+from pathlib import Path
+from typing import Dict, List
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from embeddings.query_embedding_cache import normalize_query
+from embeddings.encoding_scheduler import encode_by_token_budget
+
+DEFAULT_CACHE_DIR = "./data/embeddings/vector_cache"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def content_key(model_name: str, text: str) -> bytes:
+    """sha256 of model name + whitespace-normalized text"""
+    return hashlib.sha256(f"{model_name}\0{normalize_query(text)}".encode('utf-8')).digest()
+
+
+class EmbeddingCache:
+    """SQLite-backed map of content key -> float32 vector bytes, evicted least recently used past max_bytes
+
+    SQLite keeps the store safe to share between concurrent ingest processes.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self._connection = sqlite3.connect(str(self.cache_dir / "embeddings.sqlite"),
+                                           check_same_thread=False, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            " key BLOB PRIMARY KEY, dimension INTEGER NOT NULL, vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS vectors_last_used ON vectors (last_used)")
+        self._connection.commit()
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.encoded_tokens = 0
+        self.encode_seconds = 0.0
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """Cached vectors for whichever keys are present"""
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):  # Stay under SQLite's bound-parameter limit
+                batch = keys[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT key, dimension, vector FROM vectors WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                for key, dimension, vector in rows:
+                    found[bytes(key)] = np.frombuffer(vector, dtype=np.float32, count=dimension)
+
+            if found:
+                now = time.time()
+                self._connection.executemany("UPDATE vectors SET last_used = ? WHERE key = ?",
+                                             [(now, key) for key in found])
+                self._connection.commit()
+        return found
+
+    def put_many(self, items: Dict[bytes, np.ndarray]):
+        """Store vectors, then evict the least recently used entries if over max_bytes"""
+        now = time.time()
+        rows = []
+        for key, vector in items.items():
+            vector = np.ascontiguousarray(vector, dtype=np.float32).reshape(-1)
+            rows.append((key, len(vector), vector.tobytes(), now))
+
+        with self._lock:
+            self._connection.executemany("INSERT OR REPLACE INTO vectors VALUES (?, ?, ?, ?)", rows)
+            self._connection.commit()
+            self._evict()
+
+    def _size_bytes(self) -> int:
+        page_size = self._connection.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self._connection.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self._connection.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def _evict(self):
+        size = self._size_bytes()
+        if size <= self.max_bytes:
+            return
+
+        # Drop oldest entries until roughly 10% under the limit
+        entries = self._connection.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+        excess_fraction = 1 - (self.max_bytes * 0.9) / size
+        to_remove = max(1, int(entries * excess_fraction))
+        self._connection.execute(
+            "DELETE FROM vectors WHERE key IN (SELECT key FROM vectors ORDER BY last_used LIMIT ?)",
+            (to_remove,)
+        )
+        self._connection.commit()
+        self.logger.info(f"🧹 Embedding cache: evicted {to_remove} least recently used vectors")
+
+    def encode(self, model, model_name: str, texts: List[str], max_batch_tokens: int = 8192,
+               pool=None) -> np.ndarray:
+        """Embeddings for texts, encoding only texts not seen before (in length-aware batches)
+
+        pool (an EncodingPool) shards the batches across encoder processes.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        keys = [content_key(model_name, text) for text in texts]
+        cached = self.get_many(list(set(keys)))
+
+        missing = []
+        seen_missing = set()
+        for position, key in enumerate(keys):
+            if key not in cached and key not in seen_missing:
+                missing.append(position)
+                seen_missing.add(key)
+
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            encode = pool.encode_by_token_budget if pool is not None else encode_by_token_budget
+            encoded, encode_stats = encode(
+                model, [texts[position] for position in missing], max_batch_tokens=max_batch_tokens
+            )
+            with self._lock:
+                self.encoded_tokens += encode_stats['tokens']
+                self.encode_seconds += encode_stats['seconds']
+            self.logger.info(f"🧠 Encoded {encode_stats['texts']} texts in {encode_stats['batches']} batches: "
+                             f"{encode_stats['tokens_per_second']} tokens/s, "
+                             f"{encode_stats['padding_ratio']:.0%} padding"
+                             + (f", {encode_stats['workers']} workers" if 'workers' in encode_stats else ""))
+            fresh = {keys[position]: vector for position, vector in zip(missing, encoded)}
+            self.put_many(fresh)
+            cached.update(fresh)
+
+        return np.stack([cached[key] for key in keys])
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+            size = self._size_bytes()
+            total = self.hits + self.misses
+            return {
+                'entries': entries,
+                'size_mb': round(size / 1024 ** 2, 1),
+                'max_mb': round(self.max_bytes / 1024 ** 2, 1),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'encode_tokens_per_second': (round(self.encoded_tokens / self.encode_seconds, 1)
+                                             if self.encode_seconds else None)
+            }
+
+
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """The process-wide on-disk embedding cache"""
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache()
+        return _embedding_cache
@@ -3,17 +3,37 @@ import chromadb
 from chromadb.config import Settings
 import numpy as np
 from typing import List, Dict, Optional
-import uuid
 import logging
 
+from embeddings.model_registry import get_model_registry
+from embeddings.query_embedding_cache import get_query_embedding_cache
+from embeddings.medical_terms import get_medical_annotator
+from embeddings.embedding_cache import get_embedding_cache
+from embeddings.chunk_ids import make_chunk_id, dedupe_by_id
+from embeddings.lexical_index import LexicalIndex, fuse_dense_and_lexical
+from embeddings.onnx_backend import resolve_backend
+
 class EmbeddingSystem:
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", backend: Optional[str] = None):
         """Initialize embedding system with medical-aware features"""
         self.logger = logging.getLogger(__name__)
         
         # Use medical-specific embeddings if available
-        self.embedding_model = SentenceTransformer(model_name)
-        self.logger.info(f"Initialized embedding model: {model_name}")
+        self.embedding_model_name = model_name
+        self.backend = resolve_backend(backend)
+        try:
+            self.embedding_model = get_model_registry().get_embedding_encoder(model_name, self.backend)
+        except Exception as e:
+            if self.backend == "torch":
+                raise
+            self.logger.warning(f"⚠️ {self.backend} backend unavailable, using PyTorch: {e}")
+            self.backend = "torch"
+            self.embedding_model = get_model_registry().get_sentence_transformer(model_name)
+        self.embedding_key = model_name if self.backend == "torch" else f"{model_name}#{self.backend}"
+        self.logger.info(f"Initialized embedding model: {model_name} ({self.backend})")
+        
+        # Multi-process encoder pool, only started for bulk ingestion runs
+        self.encoding_pool = None
         
         # Initialize ChromaDB
         try:
@@ -35,10 +55,30 @@ class EmbeddingSystem:
             
             self.logger.info("ChromaDB collections initialized successfully")
             
+            # BM25 index over the text collection for hybrid search
+            self.lexical_index = LexicalIndex("./data/embeddings/lexical/texts")
+            
         except Exception as e:
             self.logger.error(f"Failed to initialize ChromaDB: {e}")
             raise
     
+    def start_encoding_pool(self, workers: Optional[int] = None, threads_per_worker: Optional[int] = None):
+        """Shard chunk encoding across pinned worker processes until stop_encoding_pool()"""
+        if self.encoding_pool is None:
+            from embeddings.encoding_pool import EncodingPool
+            from embeddings.model_manifest import local_model_path
+            
+            self.encoding_pool = EncodingPool(self.embedding_model_name, workers=workers,
+                                              threads_per_worker=threads_per_worker,
+                                              local_path=local_model_path(self.embedding_model_name),
+                                              backend=self.backend)
+        return self.encoding_pool
+    
+    def stop_encoding_pool(self):
+        if self.encoding_pool is not None:
+            self.encoding_pool.shutdown()
+            self.encoding_pool = None
+    
     def add_text_chunks(self, chunks: List[Dict]):
         """Add text chunks to the embedding database"""
         texts = []
@@ -50,20 +90,26 @@ class EmbeddingSystem:
             if chunk_type in ['text', 'slide', 'paragraph']:
                 texts.append(chunk['text'])
                 metadatas.append(chunk['metadata'])
-                ids.append(str(uuid.uuid4()))
+                ids.append(chunk.get('id') or make_chunk_id(chunk['text'], chunk['metadata']))
+        
+        # Stable IDs make re-ingestion an in-place upsert
+        ids, texts, metadatas = dedupe_by_id(ids, texts, metadatas)
         
         if texts:
             try:
-                # Generate embeddings
-                embeddings = self.embedding_model.encode(texts)
+                # Generate embeddings (unchanged text is served from the on-disk cache)
+                embeddings = get_embedding_cache().encode(self.embedding_model, self.embedding_key, texts,
+                                                          pool=self.encoding_pool)
                 
                 # Add to ChromaDB
-                self.text_collection.add(
+                self.text_collection.upsert(
                     embeddings=embeddings.tolist(),
                     documents=texts,
                     metadatas=metadatas,
                     ids=ids
                 )
+                self.lexical_index.add(ids, texts, self.text_collection.name)
+                self.lexical_index.flush()
                 
                 self.logger.info(f"Added {len(texts)} text chunks to database")
                 
@@ -71,17 +117,30 @@ class EmbeddingSystem:
                 self.logger.error(f"Failed to add text chunks: {e}")
                 raise
     
-    def search_similar_texts(self, query: str, n_results: int = 5) -> Dict:
-        """Search for similar texts using embedding similarity"""
+    def search_similar_texts(self, query: str, n_results: int = 5, search_type: str = "dense") -> Dict:
+        """Search for similar texts using embedding similarity
+        
+        search_type "hybrid" fuses the embedding ranking with BM25 via reciprocal rank fusion.
+        """
         try:
-            query_embedding = self.embedding_model.encode([query])
+            query_embedding = self.embed_query(query).reshape(1, -1)
+            hybrid = search_type == "hybrid" and len(self.lexical_index) > 0
+            candidates = n_results * 4 if hybrid else n_results
             
             results = self.text_collection.query(
                 query_embeddings=query_embedding.tolist(),
-                n_results=n_results,
+                n_results=candidates,
                 include=['documents', 'metadatas', 'distances']
             )
             
+            if hybrid:
+                results = fuse_dense_and_lexical(
+                    {key: results[key] for key in ('ids', 'documents', 'metadatas', 'distances')},
+                    self.lexical_index.search(query, candidates),
+                    n_results,
+                    self._fetch_records
+                )
+            
             self.logger.info(f"Found {len(results['documents'][0])} similar texts for query")
             return results
             
@@ -89,25 +148,33 @@ class EmbeddingSystem:
             self.logger.error(f"Search failed: {e}")
             return {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
     
+    def _fetch_records(self, collection_name: str, ids: List[str]) -> Dict[str, tuple]:
+        """Documents and metadata for lexical-only hits"""
+        records = self.text_collection.get(ids=ids, include=['documents', 'metadatas'])
+        return {
+            doc_id: (document, metadata)
+            for doc_id, document, metadata in zip(records['ids'], records['documents'], records['metadatas'])
+        }
+    
+    def delete_chunks(self, ids: List[str]):
+        """Remove chunks by ID from the text collection and the lexical index"""
+        if not ids:
+            return
+        self.text_collection.delete(ids=list(ids))
+        self.lexical_index.delete(ids)
+        self.lexical_index.flush()
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """Query embedding, served from the shared LRU cache when the query was seen before"""
+        return get_query_embedding_cache().encode(self.embedding_model, self.embedding_key, query)
+    
     def add_medical_keywords_boost(self, chunks: List[Dict]) -> List[Dict]:
         """Boost chunks containing important medical terms"""
-        medical_keywords = [
-            'pathology', 'diagnosis', 'imaging', 'radiograph', 'ct scan', 'mri',
-            'ultrasound', 'contrast', 'lesion', 'mass', 'nodule', 'tumor',
-            'anatomy', 'physiology', 'syndrome', 'disease', 'treatment',
-            'pneumonia', 'fracture', 'hemorrhage', 'stroke', 'cancer',
-            'birads', 'consolidation', 'atelectasis', 'pneumothorax'
-        ]
+        annotator = get_medical_annotator()
         
         for chunk in chunks:
-            boost_score = 0
-            text_lower = chunk['text'].lower()
-            
-            for keyword in medical_keywords:
-                if keyword in text_lower:
-                    boost_score += text_lower.count(keyword)
-            
-            chunk['metadata']['medical_relevance_score'] = boost_score
+            annotation = annotator.annotate(chunk['text'])
+            chunk['metadata']['medical_relevance_score'] = annotation.count('keyword_boost')
         
         return chunks
 
@@ -120,7 +187,9 @@ class EmbeddingSystem:
             return {
                 'text_chunks': text_count,
                 'image_chunks': image_count,
-                'total_chunks': text_count + image_count
+                'total_chunks': text_count + image_count,
+                'query_embedding_cache': get_query_embedding_cache().get_stats(),
+                'embedding_cache': get_embedding_cache().get_stats()
             }
         except Exception as e:
             self.logger.error(f"Failed to get collection stats: {e}")
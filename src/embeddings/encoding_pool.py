@@ -0,0 +1,178 @@
+# src/embeddings/encoding_pool.py
+"""
+Multi-process encoding pool for bulk ingestion
+Each worker process is pinned to its own set of cores, runs torch with that many
+threads and holds its own copy of the model; token-budgeted batches are sharded
+across the workers
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from embeddings.encoding_scheduler import token_lengths, plan_batches, encode_by_token_budget
+
+logger = logging.getLogger(__name__)
+
+
+def available_cores() -> List[int]:
+    """CPU ids this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def core_sets(workers: int, threads_per_worker: int, cores: Optional[List[int]] = None) -> List[List[int]]:
+    """Disjoint, contiguous core sets, one per worker (wrapping around if cores run out)"""
+    cores = cores or available_cores()
+    return [
+        [cores[(worker * threads_per_worker + offset) % len(cores)] for offset in range(threads_per_worker)]
+        for worker in range(workers)
+    ]
+
+
+def pin_to_cores(cores: List[int]) -> bool:
+    """Restrict the current process to cores (sched_setaffinity, or psutil on Windows)"""
+    try:
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, cores)
+        else:
+            import psutil
+            psutil.Process().cpu_affinity(list(cores))
+        return True
+    except Exception as e:
+        logger.debug(f"Could not pin encoder worker to cores {cores}: {e}")
+        return False
+
+
+# Per-worker state, set by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_name: str, local_path: Optional[str], backend: str,
+                 threads: int, pending_core_sets, loader: Optional[Callable] = None) -> None:
+    global _worker_model
+    cores = pending_core_sets.get()
+    pin_to_cores(cores)
+
+    # Must be set before torch / onnxruntime create their thread pools
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+    if loader is not None:
+        _worker_model = loader(model_name, local_path, threads)
+    elif backend == "torch":
+        import torch
+        from sentence_transformers import SentenceTransformer
+        torch.set_num_threads(threads)
+        _worker_model = SentenceTransformer(local_path or model_name, device="cpu")
+    else:
+        from embeddings.onnx_backend import load_quantized
+        _worker_model = load_quantized(model_name, num_threads=threads, model_path=local_path)
+
+
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    return np.asarray(_worker_model.encode(texts, batch_size=len(texts), show_progress_bar=False,
+                                           convert_to_numpy=True), dtype=np.float32)
+
+
+class EncodingPool:
+    """Pool of pinned encoder processes; use as a context manager or call shutdown()
+
+    Worker processes are spawned (not forked), so no torch thread state is inherited.
+    loader, if given, must be a module-level callable (model_name, local_path, threads)
+    returning an object with encode(); it replaces the backend's own model loading.
+    """
+
+    def __init__(self, model_name: str, workers: Optional[int] = None,
+                 threads_per_worker: Optional[int] = None, local_path: Optional[str] = None,
+                 backend: str = "torch", loader: Optional[Callable] = None):
+        cores = available_cores()
+        self.threads_per_worker = threads_per_worker or (2 if len(cores) >= 4 else 1)
+        self.workers = workers or max(1, len(cores) // self.threads_per_worker)
+        self.model_name = model_name
+        self.backend = backend
+        self.core_sets = core_sets(self.workers, self.threads_per_worker, cores)
+        # Cores no encoder is pinned to, for callers sizing their own pools (e.g. parsers)
+        pinned = {core for cores_for_worker in self.core_sets for core in cores_for_worker}
+        self.free_cores = len(set(cores) - pinned)
+
+        context = multiprocessing.get_context("spawn")
+        pending_core_sets = context.Queue()
+        for cores_for_worker in self.core_sets:
+            pending_core_sets.put(cores_for_worker)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model_name, local_path, backend, self.threads_per_worker, pending_core_sets, loader)
+        )
+        self.broken = False
+        logger.info(f"🧵 Encoding pool: {self.workers} workers x {self.threads_per_worker} threads for {model_name}")
+
+    def encode_by_token_budget(self, model, texts: List[str], max_batch_tokens: int = 8192,
+                               max_batch_size: int = 128) -> Tuple[np.ndarray, Dict]:
+        """Drop-in for encoding_scheduler.encode_by_token_budget that runs batches on the workers
+
+        model (the parent's copy) only supplies the tokenizer for batch planning, and encodes
+        everything in-process if the pool has broken.
+        """
+        if self.broken or self._executor is None or not texts:
+            return encode_by_token_budget(model, texts, max_batch_tokens, max_batch_size)
+
+        lengths = token_lengths(model, texts)
+        batches = plan_batches(lengths, max_batch_tokens, max_batch_size)
+
+        start = time.perf_counter()
+        embeddings = None
+        padded_tokens = 0
+        try:
+            futures = {self._executor.submit(_encode_batch, [texts[position] for position in batch]): batch
+                       for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                encoded = future.result()
+                if embeddings is None:
+                    embeddings = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+                embeddings[batch] = encoded
+                padded_tokens += lengths[batch[-1]] * len(batch)
+        except BrokenProcessPool as e:
+            logger.warning(f"⚠️ Encoding pool failed, encoding in-process from now on: {e}")
+            self.broken = True
+            self.shutdown()
+            return encode_by_token_budget(model, texts, max_batch_tokens, max_batch_size)
+        elapsed = time.perf_counter() - start
+
+        tokens = sum(lengths)
+        stats = {
+            'texts': len(texts),
+            'batches': len(batches),
+            'tokens': tokens,
+            'padded_tokens': padded_tokens,
+            'padding_ratio': round(1 - tokens / padded_tokens, 3) if padded_tokens else 0.0,
+            'seconds': round(elapsed, 3),
+            'tokens_per_second': round(tokens / elapsed, 1) if elapsed > 0 else None,
+            'workers': self.workers
+        }
+        return embeddings, stats
+
+    def shutdown(self):
+        """Stop the workers, waiting for batches already submitted"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            logger.info("🧵 Encoding pool shut down")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
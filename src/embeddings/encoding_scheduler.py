@@ -0,0 +1,82 @@
+# src/embeddings/encoding_scheduler.py
+"""
+Length-aware batching for sentence-transformer encoding
+Texts are sorted by token length and packed into batches by padded-token budget,
+so short captions are not padded out to the length of 1000-character chunks
+"""
+
+from typing import Dict, List, Tuple
+import logging
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def token_lengths(model, texts: List[str]) -> List[int]:
+    """Token counts under the model's tokenizer (capped at its max length), or a character estimate"""
+    max_length = getattr(model, 'max_seq_length', None) or 512
+    tokenizer = getattr(model, 'tokenizer', None)
+    if tokenizer is not None:
+        try:
+            encoded = tokenizer(texts, add_special_tokens=True, truncation=True, max_length=max_length)
+            return [len(ids) for ids in encoded['input_ids']]
+        except Exception as e:
+            logger.debug(f"Tokenizer length estimate failed, using characters: {e}")
+    return [min(max_length, len(text) // 4 + 2) for text in texts]
+
+
+def plan_batches(lengths: List[int], max_batch_tokens: int, max_batch_size: int) -> List[List[int]]:
+    """Positions grouped into batches whose padded size (longest x count) fits the budget"""
+    order = sorted(range(len(lengths)), key=lambda position: lengths[position])
+    batches = []
+    current = []
+    for position in order:
+        # Sorted ascending, so this text is the longest in the batch if added
+        if current and (len(current) >= max_batch_size or
+                        lengths[position] * (len(current) + 1) > max_batch_tokens):
+            batches.append(current)
+            current = []
+        current.append(position)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def encode_by_token_budget(model, texts: List[str], max_batch_tokens: int = 8192,
+                           max_batch_size: int = 128) -> Tuple[np.ndarray, Dict]:
+    """Encode texts in length-sorted, token-budgeted batches; rows come back in input order"""
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32), {'texts': 0, 'tokens': 0, 'seconds': 0.0}
+
+    lengths = token_lengths(model, texts)
+    batches = plan_batches(lengths, max_batch_tokens, max_batch_size)
+
+    start = time.perf_counter()
+    embeddings = None
+    padded_tokens = 0
+    for batch in batches:
+        encoded = np.asarray(model.encode(
+            [texts[position] for position in batch],
+            batch_size=len(batch),
+            show_progress_bar=False,
+            convert_to_numpy=True
+        ), dtype=np.float32)
+        if embeddings is None:
+            embeddings = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+        embeddings[batch] = encoded
+        padded_tokens += lengths[batch[-1]] * len(batch)
+    elapsed = time.perf_counter() - start
+
+    tokens = sum(lengths)
+    stats = {
+        'texts': len(texts),
+        'batches': len(batches),
+        'tokens': tokens,
+        'padded_tokens': padded_tokens,
+        'padding_ratio': round(1 - tokens / padded_tokens, 3) if padded_tokens else 0.0,
+        'seconds': round(elapsed, 3),
+        'tokens_per_second': round(tokens / elapsed, 1) if elapsed > 0 else None
+    }
+    return embeddings, stats
@@ -0,0 +1,412 @@
+# src/embeddings/lexical_index.py
+"""
+On-disk BM25 inverted index for exact-token radiology retrieval
+Complements dense embeddings for terms like "BI-RADS 4", "kVp", "HIDA" and "T2 FLAIR"
+
+Layout (one directory per index):
+    manifest.json              ordered list of live segments
+    seg_NNNNNN.lexicon.json    term -> [row offset, row count], doc ids, collections, deletions
+    seg_NNNNNN.postings.npy    uint32 rows of (doc ordinal, term frequency), memory-mapped
+    seg_NNNNNN.lengths.npy     uint32 token count per doc ordinal, memory-mapped
+
+Each ingest flushes one immutable segment. A doc id in a later segment supersedes
+earlier copies, and a segment's "deleted" list tombstones ids. Past max_segments,
+flush() merges the adjacent run of segments holding the fewest docs (tiered merging,
+so large old segments are rarely rewritten); compact() merges everything into one.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import Counter, defaultdict
+from pathlib import Path
+import json
+import logging
+import math
+import os
+import re
+import threading
+
+import numpy as np
+
+# Tokens keep internal hyphens/slashes so terms like "bi-rads" and "v/q" survive
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-/][a-z0-9]+)*")
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'for',
+    'from', 'how', 'in', 'is', 'it', 'me', 'of', 'on', 'or', 'some', 'that', 'the',
+    'this', 'to', 'what', 'when', 'which', 'who', 'why', 'with', 'you', 'your'
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, strip HTML and split text into index terms"""
+    if not text:
+        return []
+    text = HTML_TAG_PATTERN.sub(' ', text).lower()
+    return [token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: score(id) = sum over lists of 1 / (k + rank)"""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class _Segment:
+    """Read-only view of one flushed segment"""
+
+    def __init__(self, directory: Path, name: str):
+        self.name = name
+        with open(directory / f"{name}.lexicon.json", 'r', encoding='utf-8') as f:
+            lexicon = json.load(f)
+
+        self.terms: Dict[str, List[int]] = lexicon['terms']
+        self.doc_ids: List[str] = lexicon['doc_ids']
+        self.collections: List[str] = lexicon['collections']
+        self.deleted: List[str] = lexicon.get('deleted', [])
+
+        self.postings = np.load(directory / f"{name}.postings.npy", mmap_mode='r')
+        self.lengths = np.load(directory / f"{name}.lengths.npy", mmap_mode='r')
+
+        # Filled in by the index once later segments are known
+        self.live = np.ones(len(self.doc_ids), dtype=bool)
+
+
+class LexicalIndex:
+    """Segmented BM25 index persisted next to the vector store"""
+
+    def __init__(self, index_dir: str, k1: float = 1.2, b: float = 0.75, max_segments: int = 8,
+                 merge_factor: int = 4):
+        self.logger = logging.getLogger(__name__)
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_file = self.index_dir / "manifest.json"
+
+        self.k1 = k1
+        self.b = b
+        self.max_segments = max_segments
+        self.merge_factor = max(2, merge_factor)  # Adjacent segments merged at a time once over max_segments
+
+        self.segments: List[_Segment] = []
+        self.live_docs: Dict[str, Tuple[int, int]] = {}  # doc id -> (segment position, ordinal)
+        self.total_length = 0
+        self._manifest_stamp: Optional[Tuple[int, int]] = None
+        self._loaded = False
+
+        # Unflushed changes from the current ingest
+        self._pending: Dict[str, Tuple[Counter, str]] = {}
+        self._pending_deletes: set = set()
+
+        self._lock = threading.RLock()
+        self._refresh()
+
+    # ------------------------------------------------------------------ loading
+
+    def _read_manifest(self) -> Dict:
+        if not self.manifest_file.exists():
+            return {'segments': [], 'next_segment': 1}
+        with open(self.manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: Dict):
+        temp_file = self.manifest_file.with_suffix('.json.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(temp_file, self.manifest_file)
+
+    def _refresh(self):
+        """Reload segments if another writer (or this one) changed the manifest"""
+        try:
+            stat = self.manifest_file.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+
+        if self._loaded and stamp == self._manifest_stamp:
+            return
+
+        manifest = self._read_manifest()
+        segments = [_Segment(self.index_dir, name) for name in manifest['segments']]
+
+        # Later segments win: resolve which (segment, ordinal) holds each live doc
+        live_docs = {}
+        for position, segment in enumerate(segments):
+            for doc_id in segment.deleted:
+                live_docs.pop(doc_id, None)
+            for ordinal, doc_id in enumerate(segment.doc_ids):
+                live_docs[doc_id] = (position, ordinal)
+
+        total_length = 0
+        for segment in segments:
+            segment.live[:] = False
+        for position, ordinal in live_docs.values():
+            segments[position].live[ordinal] = True
+            total_length += int(segments[position].lengths[ordinal])
+
+        self.segments = segments
+        self.live_docs = live_docs
+        self.total_length = total_length
+        self._manifest_stamp = stamp
+        self._loaded = True
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self.live_docs)
+
+    # ------------------------------------------------------------------ writing
+
+    def add(self, doc_ids: Iterable[str], texts: Iterable[str], collection: str = ""):
+        """Stage documents (new or replacing an existing id) for the next flush"""
+        with self._lock:
+            for doc_id, text in zip(doc_ids, texts):
+                self._pending[doc_id] = (Counter(tokenize(text)), collection)
+                self._pending_deletes.discard(doc_id)
+
+    def delete(self, doc_ids: Iterable[str]):
+        """Stage removal of documents for the next flush"""
+        with self._lock:
+            for doc_id in doc_ids:
+                self._pending.pop(doc_id, None)
+                self._pending_deletes.add(doc_id)
+
+    def flush(self):
+        """Write staged changes as a new segment and publish it in the manifest"""
+        with self._lock:
+            if not self._pending and not self._pending_deletes:
+                return
+
+            manifest = self._read_manifest()
+            name = f"seg_{manifest['next_segment']:06d}"
+
+            doc_ids = list(self._pending.keys())
+            collections = [self._pending[doc_id][1] for doc_id in doc_ids]
+            lengths = np.array([sum(self._pending[doc_id][0].values()) for doc_id in doc_ids], dtype=np.uint32)
+
+            term_postings = defaultdict(list)
+            for ordinal, doc_id in enumerate(doc_ids):
+                for term, frequency in self._pending[doc_id][0].items():
+                    term_postings[term].append((ordinal, frequency))
+
+            self._write_segment(name, term_postings, doc_ids, collections, lengths, sorted(self._pending_deletes))
+
+            manifest['segments'].append(name)
+            manifest['next_segment'] += 1
+            self._write_manifest(manifest)
+
+            self.logger.info(f"📇 Lexical index: flushed {len(doc_ids)} docs, {len(self._pending_deletes)} deletions to {name}")
+            self._pending.clear()
+            self._pending_deletes.clear()
+
+            self._loaded = False
+            self._refresh()
+            while len(self.segments) > self.max_segments:
+                self._merge_smallest()
+
+    def _write_segment(self, name: str, term_postings: Dict[str, List[Tuple[int, int]]],
+                       doc_ids: List[str], collections: List[str], lengths: np.ndarray,
+                       deleted: List[str]):
+        terms = {}
+        rows = []
+        for term in sorted(term_postings):
+            postings = term_postings[term]
+            terms[term] = [len(rows), len(postings)]
+            rows.extend(postings)
+
+        postings_array = np.array(rows, dtype=np.uint32).reshape(-1, 2)
+        np.save(self.index_dir / f"{name}.postings.npy", postings_array)
+        np.save(self.index_dir / f"{name}.lengths.npy", lengths.astype(np.uint32))
+
+        # Lexicon last: a segment without one is never referenced by the manifest
+        with open(self.index_dir / f"{name}.lexicon.json", 'w', encoding='utf-8') as f:
+            json.dump({'terms': terms, 'doc_ids': doc_ids, 'collections': collections,
+                       'deleted': deleted}, f, ensure_ascii=False)
+
+    def compact(self):
+        """Merge all segments into one, dropping superseded and deleted docs"""
+        with self._lock:
+            self._refresh()
+            if len(self.segments) <= 1 and not any(segment.deleted for segment in self.segments):
+                return
+            self._merge(0, len(self.segments))
+
+    def _merge_smallest(self):
+        """Merge the adjacent run of merge_factor segments with the fewest docs
+
+        Only neighbours are merged, so later segments still supersede earlier ones.
+        Repeated flushes of similar size build up tiers, so each doc is rewritten
+        about log(N) times instead of once per compaction.
+        """
+        width = min(self.merge_factor, len(self.segments))
+        sizes = [len(segment.doc_ids) for segment in self.segments]
+        start = min(range(len(sizes) - width + 1), key=lambda i: sum(sizes[i:i + width]))
+        self._merge(start, start + width)
+
+    def _merge(self, start: int, end: int):
+        """Rewrite segments[start:end] as one segment in their place, dropping superseded and deleted docs"""
+        with self._lock:
+            merging = self.segments[start:end]
+
+            doc_ids, collections, lengths = [], [], []
+            remaps = []
+            for segment in merging:
+                remap = np.full(len(segment.doc_ids), -1, dtype=np.int64)
+                for ordinal in np.flatnonzero(segment.live):
+                    remap[ordinal] = len(doc_ids)
+                    doc_ids.append(segment.doc_ids[ordinal])
+                    collections.append(segment.collections[ordinal])
+                    lengths.append(int(segment.lengths[ordinal]))
+                remaps.append(remap)
+
+            term_postings = defaultdict(list)
+            for segment, remap in zip(merging, remaps):
+                for term, (row_start, row_count) in segment.terms.items():
+                    rows = np.asarray(segment.postings[row_start:row_start + row_count])
+                    new_ordinals = remap[rows[:, 0]]
+                    keep = new_ordinals >= 0
+                    term_postings[term].extend(zip(new_ordinals[keep].tolist(), rows[keep, 1].tolist()))
+
+            for term in term_postings:
+                term_postings[term].sort()
+
+            # Tombstones still hide copies in segments before the merged run
+            deleted = sorted({doc_id for segment in merging for doc_id in segment.deleted}) if start > 0 else []
+
+            manifest = self._read_manifest()
+            name = f"seg_{manifest['next_segment']:06d}"
+            self._write_segment(name, term_postings, doc_ids, collections,
+                                np.array(lengths, dtype=np.uint32), deleted)
+
+            old_names = [segment.name for segment in merging]
+            position = manifest['segments'].index(old_names[0])
+            manifest['segments'][position:position + len(old_names)] = [name]
+            manifest['next_segment'] += 1
+            self._write_manifest(manifest)
+
+            self._loaded = False
+            self._refresh()
+            self._remove_unreferenced(keep=set(manifest['segments']))
+            self.logger.info(f"📇 Lexical index: merged {len(old_names)} segments into {name} ({len(doc_ids)} docs)")
+
+    def _remove_unreferenced(self, keep: set):
+        """Delete segment files no longer in the manifest (skipping files still mapped elsewhere)"""
+        for path in self.index_dir.glob("seg_*.*"):
+            if path.name.split('.')[0] in keep:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                pass  # Still memory-mapped by a reader (Windows); removed on a later compaction
+
+    # ------------------------------------------------------------------ search
+
+    def search(self, query: str, n_results: int = 20) -> List[Dict]:
+        """BM25 top-n as [{'id', 'score', 'collection'}], best first"""
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return []
+
+        with self._lock:
+            self._refresh()
+            total_docs = len(self.live_docs)
+            if total_docs == 0:
+                return []
+            avg_length = self.total_length / total_docs
+
+            # Document frequency over live docs, across segments
+            doc_freqs = {}
+            for term in query_terms:
+                df = 0
+                for segment in self.segments:
+                    entry = segment.terms.get(term)
+                    if entry:
+                        rows = segment.postings[entry[0]:entry[0] + entry[1]]
+                        df += int(segment.live[rows[:, 0]].sum())
+                doc_freqs[term] = df
+
+            candidates = []
+            for segment in self.segments:
+                scores = None
+                for term in query_terms:
+                    entry = segment.terms.get(term)
+                    if not entry or not doc_freqs[term]:
+                        continue
+
+                    rows = np.asarray(segment.postings[entry[0]:entry[0] + entry[1]])
+                    ordinals = rows[:, 0]
+                    frequencies = rows[:, 1].astype(np.float64)
+                    df = doc_freqs[term]
+
+                    idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                    length_norm = 1 - self.b + self.b * segment.lengths[ordinals] / avg_length
+                    term_scores = idf * frequencies * (self.k1 + 1) / (frequencies + self.k1 * length_norm)
+
+                    if scores is None:
+                        scores = np.zeros(len(segment.doc_ids), dtype=np.float64)
+                    np.add.at(scores, ordinals, term_scores)
+
+                if scores is None:
+                    continue
+
+                scores[~segment.live] = 0.0
+                hit_ordinals = np.flatnonzero(scores)
+                if len(hit_ordinals) > n_results:
+                    top = np.argpartition(scores[hit_ordinals], -n_results)[-n_results:]
+                    hit_ordinals = hit_ordinals[top]
+
+                for ordinal in hit_ordinals:
+                    candidates.append({
+                        'id': segment.doc_ids[ordinal],
+                        'score': float(scores[ordinal]),
+                        'collection': segment.collections[ordinal]
+                    })
+
+            candidates.sort(key=lambda hit: hit['score'], reverse=True)
+            return candidates[:n_results]
+
+
+def fuse_dense_and_lexical(dense_results: Dict, lexical_hits: List[Dict], n_results: int,
+                           fetch_records, k: int = 60) -> Dict:
+    """Merge a Chroma-style dense result with lexical hits using reciprocal-rank fusion
+
+    fetch_records(collection_name, ids) must return {id: (document, metadata)} for
+    lexical-only hits. Distances of lexical-only hits are set to the worst dense
+    distance so downstream distance-based displays stay meaningful.
+    """
+    dense_ids = dense_results.get('ids', [[]])[0]
+    records = {
+        doc_id: (document, metadata, distance)
+        for doc_id, document, metadata, distance in zip(
+            dense_ids,
+            dense_results['documents'][0],
+            dense_results['metadatas'][0],
+            dense_results['distances'][0]
+        )
+    }
+
+    fused = reciprocal_rank_fusion([dense_ids, [hit['id'] for hit in lexical_hits]], k=k)[:n_results]
+
+    missing_by_collection = defaultdict(list)
+    for hit in lexical_hits:
+        if hit['id'] not in records:
+            missing_by_collection[hit['collection']].append(hit['id'])
+
+    fallback_distance = max(dense_results['distances'][0], default=1.0)
+    wanted = {doc_id for doc_id, _ in fused}
+    for collection_name, ids in missing_by_collection.items():
+        ids = [doc_id for doc_id in ids if doc_id in wanted]
+        if ids:
+            for doc_id, (document, metadata) in fetch_records(collection_name, ids).items():
+                records[doc_id] = (document, metadata, fallback_distance)
+
+    fused = [(doc_id, score) for doc_id, score in fused if doc_id in records]
+    return {
+        'ids': [[doc_id for doc_id, _ in fused]],
+        'documents': [[records[doc_id][0] for doc_id, _ in fused]],
+        'metadatas': [[records[doc_id][1] for doc_id, _ in fused]],
+        'distances': [[records[doc_id][2] for doc_id, _ in fused]],
+        'fusion_scores': [[round(score, 6) for _, score in fused]]
+    }
@@ -11,6 +11,23 @@ import logging
 from pathlib import Path
 import re
 
+from embeddings.medical_terms import MEDICAL_VOCABULARIES, TermAnnotator
+
+# CORE section indicators, checked in order (first match wins)
+CORE_SECTION_INDICATORS = [
+    ('Physics & Safety', ['dose', 'kvp', 'physics', 'radiation', 'safety', 'technique']),
+    ('Cardiothoracic', ['chest', 'lung', 'heart', 'pneumonia', 'cardiac']),
+    ('Neuroradiology', ['brain', 'head', 'neuro', 'stroke', 'hemorrhage']),
+    ('Musculoskeletal', ['bone', 'joint', 'fracture', 'msk', 'musculoskeletal']),
+    ('Abdominal & Pelvic', ['abdomen', 'liver', 'pancreas', 'bowel', 'gi']),
+    ('Breast Imaging', ['breast', 'mammography', 'birads']),
+    ('Pediatric Radiology', ['pediatric', 'child', 'infant', 'neonatal']),
+    ('Nuclear Medicine', ['nuclear', 'pet', 'spect', 'scintigraphy'])
+]
+
+# Anatomy, pathology and modality entity vocabularies
+ENTITY_CATEGORIES = ['entity_anatomy', 'entity_pathology', 'entity_modality']
+
 class MedicalParameterOptimizer:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
@@ -87,31 +104,30 @@ class MedicalParameterOptimizer:
             }
         }
 
+        # One pass over a chunk answers every scoring and extraction question below
+        self.term_annotator = TermAnnotator({
+            **{f"high_yield:{category}": term_data['terms'] for category, term_data in self.high_yield_terms.items()},
+            **{f"anatomy:{anatomy}": params['keywords'] for anatomy, params in self.anatomy_parameters.items()},
+            **{f"modality:{anatomy}": params['modalities'] for anatomy, params in self.anatomy_parameters.items()},
+            **{f"section:{section}": terms for section, terms in CORE_SECTION_INDICATORS},
+            **{category: MEDICAL_VOCABULARIES[category] for category in ENTITY_CATEGORIES}
+        })
+
     def calculate_medical_relevance_score(self, text: str, metadata: Dict = None) -> float:
         """Calculate comprehensive medical relevance score"""
 
-        text_lower = text.lower()
+        annotation = self.term_annotator.annotate(text)
         base_score = 0.0
 
         # High-yield term scoring
         for category, term_data in self.high_yield_terms.items():
-            for term in term_data['terms']:
-                if term in text_lower:
-                    base_score += term_data['weight'] * text_lower.count(term)
+            base_score += term_data['weight'] * annotation.count(f"high_yield:{category}")
 
         # Anatomy-specific scoring
         for anatomy, params in self.anatomy_parameters.items():
-            anatomy_score = 0
-
-            # Check for anatomy keywords
-            for keyword in params['keywords']:
-                if keyword in text_lower:
-                    anatomy_score += 1
-
-            # Check for relevant modalities
-            for modality in params['modalities']:
-                if modality in text_lower:
-                    anatomy_score += 0.5
+            # One point per anatomy keyword present, half per relevant modality
+            anatomy_score = len(annotation.matched(f"anatomy:{anatomy}"))
+            anatomy_score += 0.5 * len(annotation.matched(f"modality:{anatomy}"))
 
             # Apply multiplier
             base_score += anatomy_score * params['weight_multiplier']
@@ -159,8 +175,9 @@ class MedicalParameterOptimizer:
                 'optimization_version': '1.0'
             }
 
-            # Create optimized chunk
+            # Create optimized chunk, keeping the chunk's other keys (its ID, image data)
             optimized_chunk = {
+                **chunk,
                 'text': text,
                 'metadata': enhanced_metadata,
                 'optimization_score': relevance_score
@@ -178,87 +195,31 @@ class MedicalParameterOptimizer:
     def _classify_core_section(self, text: str) -> str:
         """Classify text into CORE exam sections"""
 
-        text_lower = text.lower()
-
-        # Physics indicators
-        if any(term in text_lower for term in ['dose', 'kvp', 'physics', 'radiation', 'safety', 'technique']):
-            return 'Physics & Safety'
-
-        # Cardiothoracic indicators
-        elif any(term in text_lower for term in ['chest', 'lung', 'heart', 'pneumonia', 'cardiac']):
-            return 'Cardiothoracic'
-
-        # Neuro indicators
-        elif any(term in text_lower for term in ['brain', 'head', 'neuro', 'stroke', 'hemorrhage']):
-            return 'Neuroradiology'
-
-        # MSK indicators
-        elif any(term in text_lower for term in ['bone', 'joint', 'fracture', 'msk', 'musculoskeletal']):
-            return 'Musculoskeletal'
-
-        # Abdominal indicators
-        elif any(term in text_lower for term in ['abdomen', 'liver', 'pancreas', 'bowel', 'gi']):
-            return 'Abdominal & Pelvic'
+        annotation = self.term_annotator.annotate(text)
 
-        # Breast indicators
-        elif any(term in text_lower for term in ['breast', 'mammography', 'birads']):
-            return 'Breast Imaging'
+        for section, _ in CORE_SECTION_INDICATORS:
+            if annotation.has(f"section:{section}"):
+                return section
 
-        # Pediatric indicators
-        elif any(term in text_lower for term in ['pediatric', 'child', 'infant', 'neonatal']):
-            return 'Pediatric Radiology'
-
-        # Nuclear medicine indicators
-        elif any(term in text_lower for term in ['nuclear', 'pet', 'spect', 'scintigraphy']):
-            return 'Nuclear Medicine'
-
-        else:
-            return 'General Radiology'
+        return 'General Radiology'
 
     def _extract_medical_entities(self, text: str) -> List[str]:
         """Extract medical entities from text"""
 
-        entities = []
-        text_lower = text.lower()
-
-        # Anatomy entities
-        anatomy_terms = [
-            'heart', 'lung', 'liver', 'kidney', 'brain', 'spine', 'bone',
-            'chest', 'abdomen', 'pelvis', 'head', 'neck', 'extremity'
-        ]
-
-        # Pathology entities
-        pathology_terms = [
-            'tumor', 'mass', 'lesion', 'nodule', 'cyst', 'inflammation',
-            'infection', 'hemorrhage', 'infarct', 'edema', 'stenosis'
-        ]
+        annotation = self.term_annotator.annotate(text)
 
-        # Modality entities
-        modality_terms = [
-            'ct', 'mri', 'x-ray', 'ultrasound', 'pet', 'spect',
-            'mammography', 'fluoroscopy', 'angiography'
-        ]
+        entities = [term for category in ENTITY_CATEGORIES for term in annotation.matched(category)]
 
-        all_terms = anatomy_terms + pathology_terms + modality_terms
-
-        for term in all_terms:
-            if term in text_lower:
-                entities.append(term)
-
-        return list(set(entities))  # Remove duplicates
+        return list(dict.fromkeys(entities))  # Remove duplicates
 
     def _identify_high_yield_terms(self, text: str) -> List[str]:
         """Identify high-yield terms for CORE exam"""
 
-        high_yield = []
-        text_lower = text.lower()
-
-        for category, term_data in self.high_yield_terms.items():
-            for term in term_data['terms']:
-                if term in text_lower:
-                    high_yield.append(f"{category}:{term}")
+        annotation = self.term_annotator.annotate(text)
 
-        return high_yield
+        return [f"{category}:{term}"
+                for category in self.high_yield_terms
+                for term in annotation.matched(f"high_yield:{category}")]
 
     def generate_optimization_report(self, chunks: List[Dict]) -> Dict:
         """Generate optimization report"""
@@ -0,0 +1,240 @@
+# src/embeddings/medical_terms.py
+"""
+Single-pass medical term annotation
+One compiled matcher finds every vocabulary term in a chunk, replacing the
+per-keyword `in` / .count() scans that used to run once per keyword per call site
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Mapping
+import re
+import threading
+
+# Optional C Aho-Corasick automaton; a compiled regex trie is used without it
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Shared vocabularies, one category per former keyword list
+MEDICAL_VOCABULARIES = {
+    # RadiologyRAGSystem._add_medical_boost
+    'medical_boost': [
+        'radiology', 'imaging', 'ct', 'mri', 'x-ray', 'ultrasound', 'pet', 'spect',
+        'diagnosis', 'findings', 'pathology', 'clinical', 'patient', 'case',
+        'contrast', 'enhancement', 'lesion', 'mass', 'nodule', 'tumor',
+        'pneumonia', 'fracture', 'hemorrhage', 'stroke', 'cancer', 'benign',
+        'malignant', 'acute', 'chronic', 'bilateral', 'unilateral',
+        'dose', 'radiation', 'safety', 'protocol', 'technique', 'quality'
+    ],
+    # EmbeddingSystem.add_medical_keywords_boost
+    'keyword_boost': [
+        'pathology', 'diagnosis', 'imaging', 'radiograph', 'ct scan', 'mri',
+        'ultrasound', 'contrast', 'lesion', 'mass', 'nodule', 'tumor',
+        'anatomy', 'physiology', 'syndrome', 'disease', 'treatment',
+        'pneumonia', 'fracture', 'hemorrhage', 'stroke', 'cancer',
+        'birads', 'consolidation', 'atelectasis', 'pneumothorax'
+    ],
+    # RadBERTEmbeddingSystem.add_medical_keywords_boost
+    'core_exam': [
+        # High-yield CORE terms
+        'differential diagnosis', 'first-line imaging', 'contraindication',
+        'radiation dose', 'contrast reaction', 'patient safety',
+        'bi-rads', 'lung-rads', 'pi-rads', 'ti-rads', 'acr appropriateness',
+        # Critical findings
+        'acute', 'emergent', 'malignant', 'pathognomonic',
+        'consolidation', 'ground glass', 'mass effect', 'midline shift',
+        # Modalities
+        'ct angiography', 'mr angiography', 'pet-ct', 'dual energy',
+        'contrast enhanced', 'non-contrast', 'arterial phase', 'portal venous'
+    ],
+    # RadBERTEmbeddingSystem._categorize_medical_content
+    'physics_content': [
+        'radiation dose', 'kvp', 'mas', 'ct number', 'hounsfield',
+        'signal intensity', 'magnetic field', 'frequency', 'wavelength',
+        'attenuation', 'beam hardening', 'scatter', 'collimation'
+    ],
+    'case_content': [
+        'patient presents', 'year old', 'clinical history', 'case study',
+        'findings show', 'differential diagnosis', 'impression:', 'recommendation:'
+    ],
+    # RadBERTEmbeddingSystem._generate_medical_image_tags
+    'image_anatomy': [
+        'chest', 'abdomen', 'pelvis', 'head', 'brain', 'heart', 'lung', 'liver',
+        'kidney', 'spine', 'bone', 'joint', 'muscle', 'vessel', 'artery', 'vein'
+    ],
+    'image_modality': [
+        'ct', 'mri', 'x-ray', 'ultrasound', 'nuclear', 'pet', 'mammography',
+        'fluoroscopy', 'angiography', 'radiograph'
+    ],
+    'image_pathology': [
+        'mass', 'lesion', 'tumor', 'fracture', 'inflammation', 'infection',
+        'stenosis', 'occlusion', 'hemorrhage', 'edema', 'ischemia'
+    ],
+    # MedicalParameterOptimizer._extract_medical_entities
+    'entity_anatomy': [
+        'heart', 'lung', 'liver', 'kidney', 'brain', 'spine', 'bone',
+        'chest', 'abdomen', 'pelvis', 'head', 'neck', 'extremity'
+    ],
+    'entity_pathology': [
+        'tumor', 'mass', 'lesion', 'nodule', 'cyst', 'inflammation',
+        'infection', 'hemorrhage', 'infarct', 'edema', 'stenosis'
+    ],
+    'entity_modality': [
+        'ct', 'mri', 'x-ray', 'ultrasound', 'pet', 'spect',
+        'mammography', 'fluoroscopy', 'angiography'
+    ],
+    # LectureTranscriptProcessor._analyze_topic_coverage (CORE exam areas)
+    'topic_physics': ['physics', 'radiation', 'dose', 'technique', 'safety'],
+    'topic_chest': ['lung', 'chest', 'pulmonary', 'pneumonia', 'nodule'],
+    'topic_cardiac': ['heart', 'cardiac', 'coronary', 'echo', 'ekg'],
+    'topic_neuro': ['brain', 'head', 'neurologic', 'stroke', 'spine'],
+    'topic_gi': ['abdomen', 'liver', 'bowel', 'gi', 'gastrointestinal'],
+    'topic_gu': ['kidney', 'bladder', 'pelvis', 'prostate', 'renal'],
+    'topic_msk': ['bone', 'joint', 'fracture', 'musculoskeletal', 'spine'],
+    'topic_interventional': ['biopsy', 'drainage', 'embolization', 'catheter']
+}
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Regex for the terms with shared prefixes factored out, so matching at a position
+    walks one trie path instead of trying every alternative (longest term wins)"""
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if '' in node else body
+
+    return build(trie)
+
+
+class Annotation:
+    """Term counts for one text, viewed per vocabulary category"""
+
+    def __init__(self, counts: Dict[str, int], vocabularies: Mapping[str, List[str]]):
+        self.counts = counts
+        self._vocabularies = vocabularies
+
+    def hits(self, category: str) -> Dict[str, int]:
+        """term -> occurrences for the category's terms that appear, in vocabulary order"""
+        return {term: self.counts[term] for term in self._vocabularies[category] if term in self.counts}
+
+    def matched(self, category: str) -> List[str]:
+        return list(self.hits(category))
+
+    def count(self, category: str) -> int:
+        """Total occurrences of the category's terms"""
+        return sum(self.hits(category).values())
+
+    def has(self, category: str) -> bool:
+        return any(term in self.counts for term in self._vocabularies[category])
+
+    def score(self, weights: Mapping[str, float]) -> float:
+        """Weighted sum of category occurrence counts"""
+        return sum(weight * self.count(category) for category, weight in weights.items())
+
+    def categories(self) -> Dict[str, int]:
+        """category -> occurrences, for every category with at least one hit"""
+        return {category: self.count(category) for category in self._vocabularies if self.has(category)}
+
+
+class TermAnnotator:
+    """Finds every vocabulary term in lowercased text in one pass
+
+    Matching is by substring and counts are non-overlapping per term, exactly like
+    text.lower().count(term), so scores match the per-keyword scans they replace.
+    Recent annotations are cached, so call sites that look at the same chunk share
+    one pass.
+    """
+
+    def __init__(self, vocabularies: Mapping[str, Iterable[str]], cache_size: int = 1024,
+                 use_automaton: bool = True):
+        self.vocabularies = {
+            category: list(dict.fromkeys(term.lower() for term in terms))
+            for category, terms in vocabularies.items()
+        }
+        terms = {term for category_terms in self.vocabularies.values() for term in category_terms if term}
+        self._automaton = None
+        self._pattern = None
+        if terms and use_automaton and AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for term in terms:
+                self._automaton.add_word(term, term)
+            self._automaton.make_automaton()
+        elif terms:
+            self._pattern = re.compile(f"(?=({_trie_pattern(terms)}))")
+
+            # Every term found at a position is a prefix of the longest term found there
+            self._prefix_terms = {
+                term: [term[:end] for end in range(1, len(term) + 1) if term[:end] in terms]
+                for term in terms
+            }
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count_terms(self, text: str) -> Dict[str, int]:
+        """term -> occurrences for every vocabulary term in text"""
+        counts: Dict[str, int] = {}
+        if not text:
+            return counts
+
+        if self._automaton is not None:
+            matches = ((end - len(term) + 1, term) for end, term in self._automaton.iter(text.lower()))
+        elif self._pattern is not None:
+            matches = ((match.start(), term)
+                       for match in self._pattern.finditer(text.lower())
+                       for term in self._prefix_terms[match.group(1)])
+        else:
+            return counts
+
+        # Skip occurrences overlapping the previous counted one of the same term (as str.count does)
+        next_free: Dict[str, int] = {}
+        for position, term in matches:
+            if position >= next_free.get(term, 0):
+                counts[term] = counts.get(term, 0) + 1
+                next_free[term] = position + len(term)
+        return counts
+
+    def annotate(self, text: str) -> Annotation:
+        with self._lock:
+            counts = self._cache.get(text)
+            if counts is not None:
+                self._cache.move_to_end(text)
+
+        if counts is None:
+            counts = self.count_terms(text)
+            with self._lock:
+                self._cache[text] = counts
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return Annotation(counts, self.vocabularies)
+
+    def annotate_many(self, texts: List[str]) -> List[Annotation]:
+        """Annotations in input order; each distinct text is matched once"""
+        unique = {text: self.annotate(text) for text in dict.fromkeys(texts)}
+        return [unique[text] for text in texts]
+
+
+_medical_annotator = None
+_medical_annotator_lock = threading.Lock()
+
+
+def get_medical_annotator() -> TermAnnotator:
+    """The process-wide annotator over MEDICAL_VOCABULARIES"""
+    global _medical_annotator
+    with _medical_annotator_lock:
+        if _medical_annotator is None:
+            _medical_annotator = TermAnnotator(MEDICAL_VOCABULARIES)
+        return _medical_annotator
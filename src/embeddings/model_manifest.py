@@ -0,0 +1,142 @@
+# src/embeddings/model_manifest.py
+"""
+Local manifest of resolved embedding models
+Records which model a preference resolved to, where its files are on disk, its
+dimension and checksum, so later startups load it directly without probing the Hub
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+import hashlib
+import json
+import logging
+import os
+import threading
+
+DEFAULT_MANIFEST_FILE = "./data/models/model_manifest.json"
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def local_model_path(model_name: str) -> Optional[str]:
+    """Directory holding a local copy of model_name, without touching the network"""
+    if os.path.isdir(model_name):
+        return os.path.abspath(model_name)
+
+    try:
+        from huggingface_hub import snapshot_download
+        return snapshot_download(repo_id=model_name, local_files_only=True)
+    except Exception:
+        pass
+
+    # sentence-transformers < 2.3 kept its own cache
+    legacy_home = os.getenv('SENTENCE_TRANSFORMERS_HOME',
+                            str(Path.home() / ".cache" / "torch" / "sentence_transformers"))
+    legacy_path = Path(legacy_home) / model_name.replace('/', '_')
+    return str(legacy_path) if legacy_path.is_dir() else None
+
+
+def model_files(path: str) -> Dict[str, int]:
+    """relative path -> size for every file of the model directory (Hub snapshot symlinks followed)"""
+    root = Path(path)
+    return {
+        file.relative_to(root).as_posix(): file.stat().st_size
+        for file in sorted(root.rglob('*'))
+        if file.is_file() and not any(part.startswith('.') for part in file.relative_to(root).parts)
+    }
+
+
+def model_checksum(path: str) -> str:
+    """SHA-256 over the names and contents of the model's files"""
+    digest = hashlib.sha256()
+    for name in model_files(path):
+        digest.update(name.encode('utf-8') + b'\0')
+        with open(Path(path) / name, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelManifest:
+    """JSON manifest of resolved models keyed by model preference"""
+
+    def __init__(self, manifest_file: str = DEFAULT_MANIFEST_FILE):
+        self.logger = logging.getLogger(__name__)
+        self.manifest_file = Path(manifest_file)
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.RLock()
+
+        if self.manifest_file.exists():
+            try:
+                with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('models', {})
+            except Exception as e:
+                self.logger.warning(f"Could not read model manifest, starting empty: {e}")
+
+    def save(self):
+        with self._lock:
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.manifest_file.with_suffix('.json.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'models': self.entries}, f, indent=1)
+            os.replace(temp_file, self.manifest_file)
+
+    def get(self, preference: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self.entries.get(preference)
+            return dict(entry) if entry else None
+
+    def resolve(self, preference: str) -> Optional[Dict]:
+        """The recorded entry if its files are still on disk with their recorded sizes
+
+        Only stats the files; verify() re-hashes them against the checksum.
+        """
+        entry = self.get(preference)
+        if entry is None:
+            return None
+
+        try:
+            present = model_files(entry['path']) if os.path.isdir(entry['path']) else {}
+        except OSError:
+            present = {}
+        if not present or any(present.get(name) != size for name, size in entry.get('files', {}).items()):
+            self.logger.info(f"Model manifest entry for '{preference}' is stale: {entry['path']} changed")
+            return None
+        return entry
+
+    def verify(self, preference: str) -> bool:
+        """Whether the recorded model's files still match its checksum"""
+        entry = self.get(preference)
+        if entry is None or not os.path.isdir(entry['path']):
+            return False
+        return model_checksum(entry['path']) == entry.get('checksum')
+
+    def record(self, preference: str, model_name: str, dimension: int,
+               path: Optional[str] = None) -> Optional[Dict]:
+        """Store the model preference resolved to (call save() to persist)
+
+        Returns None, recording nothing, when no local copy of the model can be found.
+        """
+        path = path or local_model_path(model_name)
+        if path is None:
+            self.logger.info(f"No local copy of {model_name} found; not recording it in the model manifest")
+            return None
+
+        entry = {
+            'model_name': model_name,
+            'path': os.path.abspath(path),
+            'dimension': int(dimension),
+            'checksum': model_checksum(path),
+            'files': model_files(path),
+            'resolved_at': datetime.now().isoformat()
+        }
+        with self._lock:
+            self.entries[preference] = entry
+        return dict(entry)
+
+    def forget(self, preference: str) -> Optional[Dict]:
+        with self._lock:
+            return self.entries.pop(preference, None)
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,140 @@
+# src/embeddings/model_registry.py
+"""
+Process-wide registry for heavyweight ML models (SentenceTransformer, ONNX encoders, CLIP)
+Each model is loaded lazily, at most once per process, and shared by all callers
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+DEFAULT_CLIP_MODEL = "openai/clip-vit-base-patch32"
+
+
+def _current_rss_mb() -> float:
+    """Resident set size of this process in MB (0.0 if it cannot be measured)"""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+class ModelRegistry:
+    """Thread-safe lazy model cache with load-time and memory accounting"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Return the model registered under key, calling loader the first time
+
+        Loads of different models can run in parallel; concurrent requests for
+        the same model wait for a single load. Failed loads are not cached.
+        """
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock_for(key):
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            self.logger.info(f"📦 Loading model: {key}")
+            rss_before = _current_rss_mb()
+            start = time.perf_counter()
+
+            model = loader()
+
+            load_seconds = time.perf_counter() - start
+            rss_delta = max(0.0, _current_rss_mb() - rss_before)
+
+            self._models[key] = model
+            self._stats[key] = {
+                'load_seconds': round(load_seconds, 2),
+                'resident_memory_mb': round(rss_delta, 1),
+                'loaded_at': time.strftime("%Y-%m-%dT%H:%M:%S")
+            }
+            self.logger.info(f"✅ Loaded {key} in {load_seconds:.1f}s (+{rss_delta:.0f} MB resident)")
+            return model
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._models
+
+    def get_sentence_transformer(self, model_name: str, local_path: Optional[str] = None):
+        """Shared SentenceTransformer instance for model_name
+
+        local_path loads the weights from a local copy instead of resolving model_name on the Hub;
+        the instance is still shared under model_name.
+        """
+        def load():
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer(local_path or model_name)
+
+        return self.get(f"sentence_transformer:{model_name}", load)
+
+    def get_embedding_encoder(self, model_name: str, backend: str = "torch",
+                              local_path: Optional[str] = None):
+        """Shared sentence encoder for model_name: SentenceTransformer, or its int8 ONNX export"""
+        if backend == "torch":
+            return self.get_sentence_transformer(model_name, local_path)
+
+        def load():
+            from embeddings.onnx_backend import load_quantized
+            return load_quantized(model_name, model_path=local_path)
+
+        return self.get(f"{backend}:{model_name}", load)
+
+    def get_cross_encoder(self, model_name: str):
+        """Shared CrossEncoder instance for model_name (CPU reranking)"""
+        def load():
+            from sentence_transformers import CrossEncoder
+            return CrossEncoder(model_name, device="cpu")
+
+        return self.get(f"cross_encoder:{model_name}", load)
+
+    def get_clip(self, model_name: str = DEFAULT_CLIP_MODEL) -> Tuple[Any, Any]:
+        """Shared (CLIPModel, CLIPProcessor) pair for model_name"""
+        def load():
+            from transformers import CLIPModel, CLIPProcessor
+            model = CLIPModel.from_pretrained(model_name)
+            model.eval()
+            return model, CLIPProcessor.from_pretrained(model_name)
+
+        return self.get(f"clip:{model_name}", load)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Load time and resident memory for every model loaded so far"""
+        with self._lock:
+            return {key: dict(stats) for key, stats in self._stats.items()}
+
+
+_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """The process-wide model registry"""
+    return _registry
@@ -0,0 +1,270 @@
+# src/embeddings/onnx_backend.py
+"""
+Quantized ONNX CPU backend for sentence-transformer embeddings
+A model is exported once to ONNX with int8 dynamic quantization and then served by
+ONNX Runtime, without loading the fp32 PyTorch weights
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import inspect
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from embeddings.model_registry import _current_rss_mb
+
+DEFAULT_ONNX_DIR = "./data/models/onnx"
+BACKENDS = ("torch", "onnx_int8")
+MODEL_FILE = "model_int8.onnx"
+CONFIG_FILE = "encoder_config.json"
+
+logger = logging.getLogger(__name__)
+
+
+def export_dir_for(model_name: str, onnx_dir: str = DEFAULT_ONNX_DIR) -> Path:
+    return Path(onnx_dir) / f"{model_name.replace('/', '__')}-int8"
+
+
+def _pooling_mode(model) -> str:
+    """'mean', 'cls' or 'max' from the SentenceTransformer's Pooling module"""
+    for module in model:
+        if type(module).__name__ == 'Pooling':
+            # get_pooling_mode_str() in sentence-transformers 2.x-5.x, a pooling_mode string after that
+            mode = (module.get_pooling_mode_str() if hasattr(module, 'get_pooling_mode_str')
+                    else getattr(module, 'pooling_mode', 'mean'))
+            if mode not in ('mean', 'cls', 'max'):
+                raise ValueError(f"Unsupported pooling mode for ONNX export: {mode}")
+            return mode
+    return 'mean'
+
+
+def export_quantized(model_name: str, onnx_dir: str = DEFAULT_ONNX_DIR, opset: int = 14,
+                     model_path: Optional[str] = None) -> Path:
+    """Export model_name's transformer to ONNX, quantize weights to int8 and save the tokenizer
+
+    Pooling and normalization run in numpy at encode time, as configured in the source model.
+    model_path reads the weights from a local copy instead of the Hub.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output_dir = export_dir_for(model_name, onnx_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # A private fp32 copy, so it is freed after export instead of staying in the model registry
+    model = SentenceTransformer(model_path or model_name, device="cpu")
+    pooling = _pooling_mode(model)
+    normalize = any(type(module).__name__ == 'Normalize' for module in model)
+    tokenizer = model.tokenizer
+
+    sample = tokenizer(["radiology export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class HiddenStates(torch.nn.Module):
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            return self.transformer(**dict(zip(input_names, inputs)))[0]
+
+    fp32_path = output_dir / "model_fp32.onnx"
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+    # The TorchScript exporter (torch >= 2.9 defaults to dynamo, which needs onnxscript)
+    exporter = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(
+            HiddenStates(model[0].auto_model.eval()),
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            **exporter
+        )
+
+    quantize_dynamic(str(fp32_path), str(output_dir / MODEL_FILE), weight_type=QuantType.QInt8)
+    fp32_path.unlink()
+
+    tokenizer.save_pretrained(str(output_dir))
+    with open(output_dir / CONFIG_FILE, 'w', encoding='utf-8') as f:
+        json.dump({
+            'source_model': model_name,
+            'pooling': pooling,
+            'normalize': normalize,
+            'max_seq_length': model.max_seq_length,
+            'dimension': model.get_sentence_embedding_dimension(),
+            'exported_at': time.strftime("%Y-%m-%dT%H:%M:%S")
+        }, f, indent=2)
+
+    logger.info(f"📦 Exported {model_name} to {output_dir} (int8, {pooling} pooling)")
+    return output_dir
+
+
+class OnnxSentenceEncoder:
+    """ONNX Runtime stand-in for the parts of SentenceTransformer the embedding systems use
+    (encode, tokenizer, max_seq_length, get_sentence_embedding_dimension)"""
+
+    def __init__(self, model_dir: Union[str, Path], num_threads: Optional[int] = None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_dir = Path(model_dir)
+        with open(self.model_dir / CONFIG_FILE, 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(str(self.model_dir / MODEL_FILE), options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+        self.max_seq_length = self.config['max_seq_length']
+
+    def __str__(self) -> str:
+        return f"OnnxSentenceEncoder({self.config['source_model']}, int8)"
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config['dimension']
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.config['pooling'] == 'cls':
+            return hidden[:, 0]
+        mask = attention_mask[..., None].astype(hidden.dtype)
+        if self.config['pooling'] == 'max':
+            return np.where(mask > 0, hidden, -1e9).max(axis=1)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32,
+               show_progress_bar: bool = False, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            encoded = self.tokenizer(sentences[start:start + batch_size], padding=True, truncation=True,
+                                     max_length=self.max_seq_length, return_tensors="np")
+            feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+            hidden = self.session.run(None, feeds)[0]
+            batches.append(self._pool(hidden, encoded['attention_mask']).astype(np.float32))
+
+        embeddings = (np.concatenate(batches) if batches
+                      else np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32))
+        if self.config['normalize'] or normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+
+        return embeddings[0] if single else embeddings
+
+
+def load_quantized(model_name: str, onnx_dir: str = DEFAULT_ONNX_DIR,
+                   num_threads: Optional[int] = None, model_path: Optional[str] = None) -> OnnxSentenceEncoder:
+    """Int8 encoder for model_name, exporting it (from model_path if given) on first use"""
+    model_dir = export_dir_for(model_name, onnx_dir)
+    if not (model_dir / MODEL_FILE).exists() or not (model_dir / CONFIG_FILE).exists():
+        export_quantized(model_name, onnx_dir, model_path=model_path)
+    return OnnxSentenceEncoder(model_dir, num_threads=num_threads)
+
+
+def resolve_backend(backend: Optional[str]) -> str:
+    """backend, or models.embedding.backend from config.yaml ('torch' by default)"""
+    if backend is None:
+        from config.settings import get_setting
+        backend = (get_setting('models', 'embedding', {}) or {}).get('backend', 'torch')
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+    return backend
+
+
+def _top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    corpus = corpus / np.clip(np.linalg.norm(corpus, axis=1, keepdims=True), 1e-12, None)
+    queries = queries / np.clip(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12, None)
+    scores = queries @ corpus.T
+    k = min(k, corpus.shape[0])
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def _measure(load, texts: List[str], batch_size: int) -> Dict:
+    rss_before = _current_rss_mb()
+    start = time.perf_counter()
+    model = load()
+    load_seconds = time.perf_counter() - start
+    rss_loaded = _current_rss_mb()
+
+    start = time.perf_counter()
+    embeddings = np.asarray(model.encode(texts, batch_size=batch_size, show_progress_bar=False,
+                                         convert_to_numpy=True), dtype=np.float32)
+    encode_seconds = time.perf_counter() - start
+
+    return {
+        'model': model,
+        'embeddings': embeddings,
+        'report': {
+            'load_seconds': round(load_seconds, 2),
+            'model_memory_mb': round(max(0.0, rss_loaded - rss_before), 1),
+            'peak_encode_memory_mb': round(max(0.0, _current_rss_mb() - rss_before), 1),
+            'encode_seconds': round(encode_seconds, 2),
+            'texts_per_second': round(len(texts) / encode_seconds, 1) if encode_seconds > 0 else None
+        }
+    }
+
+
+def compare_backends(model_name: str, texts: List[str], queries: Optional[List[str]] = None,
+                     k: int = 10, batch_size: int = 32, onnx_dir: str = DEFAULT_ONNX_DIR) -> Dict:
+    """Throughput, memory and retrieval agreement of the int8 ONNX model against fp32
+
+    Each query retrieves its top k texts under both models; overlap is the mean share of
+    the fp32 top k that the int8 model also returns. Without queries, up to 100 corpus
+    texts are used as queries.
+    """
+    from sentence_transformers import SentenceTransformer
+    from embeddings.encoding_scheduler import token_lengths
+
+    queries = queries or texts[:100]
+
+    # ONNX first: its resident memory is then measured before the fp32 weights are loaded
+    int8 = _measure(lambda: load_quantized(model_name, onnx_dir), texts, batch_size)
+    fp32 = _measure(lambda: SentenceTransformer(model_name, device="cpu"), texts, batch_size)
+
+    tokens = sum(token_lengths(fp32['model'], texts))
+    for run in (fp32, int8):
+        seconds = run['report']['encode_seconds']
+        run['report']['tokens_per_second'] = round(tokens / seconds, 1) if seconds > 0 else None
+
+    fp32_query = np.asarray(fp32['model'].encode(queries, batch_size=batch_size, show_progress_bar=False,
+                                                 convert_to_numpy=True), dtype=np.float32)
+    int8_query = np.asarray(int8['model'].encode(queries, batch_size=batch_size), dtype=np.float32)
+    fp32_top = _top_k(fp32['embeddings'], fp32_query, k)
+    int8_top = _top_k(int8['embeddings'], int8_query, k)
+    overlaps = [len(set(a) & set(b)) / len(a) for a, b in zip(fp32_top.tolist(), int8_top.tolist())]
+
+    a = fp32['embeddings'] / np.clip(np.linalg.norm(fp32['embeddings'], axis=1, keepdims=True), 1e-12, None)
+    b = int8['embeddings'] / np.clip(np.linalg.norm(int8['embeddings'], axis=1, keepdims=True), 1e-12, None)
+    cosines = (a * b).sum(axis=1)
+
+    model_dir = export_dir_for(model_name, onnx_dir)
+    return {
+        'model': model_name,
+        'texts': len(texts),
+        'queries': len(queries),
+        'tokens': tokens,
+        'k': k,
+        'fp32': fp32['report'],
+        'onnx_int8': {**int8['report'],
+                      'file_size_mb': round(os.path.getsize(model_dir / MODEL_FILE) / 1024 ** 2, 1)},
+        'speedup': (round(fp32['report']['encode_seconds'] / int8['report']['encode_seconds'], 2)
+                    if int8['report']['encode_seconds'] else None),
+        f'top_{k}_overlap': round(float(np.mean(overlaps)), 3) if overlaps else None,
+        f'min_top_{k}_overlap': round(float(np.min(overlaps)), 3) if overlaps else None,
+        'mean_cosine_to_fp32': round(float(cosines.mean()), 4) if len(cosines) else None
+    }
@@ -0,0 +1,78 @@
+# src/embeddings/query_embedding_cache.py
+"""
+Process-wide LRU cache of query embeddings
+Repeated queries (search, answer cache lookups, quick-topic buttons) skip the model forward pass
+"""
+
+from collections import OrderedDict
+from typing import Dict, Tuple
+import threading
+
+import numpy as np
+
+
+def normalize_query(text: str) -> str:
+    """Collapse whitespace so trivially different spellings of a query share an entry"""
+    return " ".join(text.split())
+
+
+class QueryEmbeddingCache:
+    """Bounded, thread-safe LRU map of (model name, normalized query) -> embedding"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, model, model_name: str, query: str) -> np.ndarray:
+        """Embedding of query under model, computed at most once per cache lifetime"""
+        normalized = normalize_query(query)
+        key = (model_name, normalized)
+
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embedding
+            self.misses += 1
+
+        # Encode outside the lock so concurrent queries don't serialize on the model
+        embedding = np.asarray(
+            model.encode([normalized], show_progress_bar=False, convert_to_numpy=True)[0],
+            dtype=np.float32
+        )
+        embedding.setflags(write=False)  # Shared between callers
+
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return embedding
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+
+_query_cache = QueryEmbeddingCache()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """The process-wide query embedding cache"""
+    return _query_cache
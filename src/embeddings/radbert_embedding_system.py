@@ -7,16 +7,35 @@ from sentence_transformers import SentenceTransformer
 import chromadb
 from chromadb.config import Settings
 import numpy as np
-from typing import List, Dict
-import uuid
+from typing import List, Dict, Optional
 import logging
+import re
 import torch
 import random
 
+from embeddings.model_registry import get_model_registry
+from embeddings.query_embedding_cache import get_query_embedding_cache
+from embeddings.embedding_cache import get_embedding_cache
+from embeddings.chunk_ids import make_chunk_id, dedupe_by_id, flatten_metadata
+from embeddings.lexical_index import LexicalIndex, fuse_dense_and_lexical
+from embeddings.medical_terms import get_medical_annotator
+from embeddings.onnx_backend import resolve_backend
+from embeddings.model_manifest import ModelManifest
+
+# Whole words only: "pituitary stalk" or "videofluoroscopic" are not lecture questions
+LECTURE_QUERY_PATTERN = re.compile(r'\b(lecture|transcript|video|talk)s?\b')
+
 class RadBERTEmbeddingSystem:
-    def __init__(self, model_preference: str = "radiology_optimized"):
+    def __init__(self, model_preference: str = "radiology_optimized",
+                 use_unified_index: bool = True, unified_overfetch: int = 3,
+                 hybrid_candidates: int = 4, rrf_k: int = 60, max_batch_tokens: int = 8192,
+                 backend: Optional[str] = None, refresh_model: bool = False):
         self.logger = logging.getLogger(__name__)
         
+        # "torch" (SentenceTransformer) or "onnx_int8" (quantized ONNX Runtime, CPU);
+        # defaults to models.embedding.backend in config.yaml
+        self.backend = resolve_backend(backend)
+        
         # RadBERT model hierarchy (best to fallback)
         self.model_options = {
             "radiology_optimized": [
@@ -27,8 +46,10 @@ class RadBERTEmbeddingSystem:
             ]
         }
         
-        # Try to load RadBERT with fallbacks
-        self.embedding_model = self._load_best_medical_model(model_preference)
+        # Try to load RadBERT with fallbacks; the manifest remembers which one resolved last time
+        self.embedding_model_name = None
+        self.model_manifest = ModelManifest()
+        self.embedding_model = self._load_best_medical_model(model_preference, refresh=refresh_model)
         
         # Initialize ChromaDB with medical collections
         self.chroma_client = chromadb.PersistentClient(
@@ -41,10 +62,42 @@ class RadBERTEmbeddingSystem:
         self.cases_collection = self._get_or_create_collection("radiology_cases")
         self.physics_collection = self._get_or_create_collection("radiology_physics")
         self.image_collection = self._get_or_create_collection("radiology_images_radbert")
+        # Lecture transcript segments, with numeric timestamp_seconds / segment_end_seconds for seeking
+        self.transcript_collection = self._get_or_create_collection("radiology_lecture_transcripts")
+        
+        # Unified collection: every chunk once, tagged with its category, so a query
+        # needs a single ANN traversal instead of one per specialized collection
+        self.unified_collection = self._get_or_create_collection("radiology_unified_radbert")
+        self.use_unified_index = use_unified_index
+        self.unified_overfetch = unified_overfetch  # Candidates per result, to absorb category re-weighting
+        self._unified_ready = self._unified_in_sync()
+        if use_unified_index and not self._unified_ready and self.text_collection.count() > 0:
+            self.logger.info("Unified index is incomplete - run rebuild_unified_index() to enable single-pass search")
+        
+        # BM25 index over the same records, for exact tokens embeddings handle badly
+        self.lexical_index = LexicalIndex("./data/embeddings/lexical/radbert")
+        self.hybrid_candidates = hybrid_candidates  # Candidates per result taken from each ranker
+        self.rrf_k = rrf_k
+        
+        # Padded tokens per encoding batch (RadBERT batches are built by length, not count)
+        self.max_batch_tokens = max_batch_tokens
+        
+        # Multi-process encoder pool, only started for bulk ingestion runs
+        self.encoding_pool = None
     
-    def _load_best_medical_model(self, preference: str):
-        """Load the best available medical model"""
+    def _load_best_medical_model(self, preference: str, refresh: bool = False):
+        """Load the best available medical model
+        
+        The model recorded in the model manifest is loaded straight from disk; the probe chain
+        only runs when there is no usable entry, or on refresh.
+        """
         models_to_try = self.model_options.get(preference, self.model_options["radiology_optimized"])
+        registry = get_model_registry()
+        
+        if not refresh:
+            model = self._load_from_manifest(registry, preference, models_to_try)
+            if model is not None:
+                return model
         
         for i, model_name in enumerate(models_to_try):
             try:
@@ -53,22 +106,87 @@ class RadBERTEmbeddingSystem:
                 if "RadBERT" in model_name:
                     self.logger.info("🏥 Loading RadBERT - specialized for radiology!")
                     
-                model = SentenceTransformer(model_name)
+                model = self._load_encoder(registry, model_name)
+                self.embedding_model_name = model_name
                 self.logger.info(f"✅ Successfully loaded: {model_name}")
                 
                 # Test the model
                 test_embedding = model.encode(["radiology test"], show_progress_bar=False)
                 self.logger.info(f"📊 Model dimension: {len(test_embedding[0])}")
                 
+                self._record_resolved_model(preference, model_name, len(test_embedding[0]))
                 return model
                 
             except Exception as e:
                 self.logger.warning(f"❌ Failed to load {model_name}: {e}")
                 if i == len(models_to_try) - 1:
                     self.logger.error("All models failed! Using basic fallback.")
-                    return SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+                    self.embedding_model_name = 'sentence-transformers/all-MiniLM-L6-v2'
+                    return self._load_encoder(registry, self.embedding_model_name)
                 continue
     
+    def _load_from_manifest(self, registry, preference: str, models_to_try: List[str]):
+        """The manifest's model for preference, loaded from its local files (None if unusable)"""
+        entry = self.model_manifest.resolve(preference)
+        if entry is None or entry['model_name'] not in models_to_try:
+            return None
+        
+        try:
+            model = self._load_encoder(registry, entry['model_name'], local_path=entry['path'])
+        except Exception as e:
+            self.logger.warning(f"❌ Failed to load {entry['model_name']} from {entry['path']}: {e}")
+            return None
+        
+        if model.get_sentence_embedding_dimension() != entry['dimension']:
+            self.logger.warning(f"⚠️ {entry['model_name']} no longer has dimension {entry['dimension']}, re-resolving")
+            return None
+        
+        self.embedding_model_name = entry['model_name']
+        self.logger.info(f"✅ Loaded {entry['model_name']} from model manifest "
+                         f"({entry['path']}, dimension {entry['dimension']})")
+        return model
+    
+    def _record_resolved_model(self, preference: str, model_name: str, dimension: int):
+        try:
+            if self.model_manifest.record(preference, model_name, dimension):
+                self.model_manifest.save()
+        except Exception as e:
+            self.logger.warning(f"Could not update model manifest: {e}")
+    
+    def _load_encoder(self, registry, model_name: str, local_path: Optional[str] = None):
+        """Encoder for model_name on the configured backend, falling back to PyTorch"""
+        if self.backend != "torch":
+            try:
+                return registry.get_embedding_encoder(model_name, self.backend, local_path=local_path)
+            except Exception as e:
+                self.logger.warning(f"⚠️ {self.backend} backend unavailable for {model_name}, using PyTorch: {e}")
+                self.backend = "torch"
+        return registry.get_sentence_transformer(model_name, local_path=local_path)
+    
+    def start_encoding_pool(self, workers: Optional[int] = None, threads_per_worker: Optional[int] = None):
+        """Shard chunk encoding across pinned worker processes until stop_encoding_pool()"""
+        if self.encoding_pool is None:
+            from embeddings.encoding_pool import EncodingPool
+            from embeddings.model_manifest import local_model_path
+            
+            self.encoding_pool = EncodingPool(self.embedding_model_name, workers=workers,
+                                              threads_per_worker=threads_per_worker,
+                                              local_path=local_model_path(self.embedding_model_name),
+                                              backend=self.backend)
+        return self.encoding_pool
+    
+    def stop_encoding_pool(self):
+        if self.encoding_pool is not None:
+            self.encoding_pool.shutdown()
+            self.encoding_pool = None
+    
+    @property
+    def embedding_key(self) -> str:
+        """Embedding cache namespace; quantized vectors are kept apart from fp32 ones"""
+        if self.backend == "torch":
+            return self.embedding_model_name
+        return f"{self.embedding_model_name}#{self.backend}"
+    
     def _get_or_create_collection(self, name: str):
         """Create specialized medical collections"""
         return self.chroma_client.get_or_create_collection(
@@ -97,13 +215,17 @@ class RadBERTEmbeddingSystem:
         except ImportError as e:
             self.logger.warning(f"Medical optimizer not available: {e}")
 
-        # Separate text and image chunks
+        # Separate text, lecture transcript and image chunks
         text_chunks = []
+        transcript_chunks = []
         image_chunks = []
 
         for chunk in chunks:
-            if chunk.get('metadata', {}).get('chunk_type') == 'image' or 'image_data' in chunk:
+            chunk_type = chunk.get('metadata', {}).get('chunk_type')
+            if chunk_type == 'image' or 'image_data' in chunk:
                 image_chunks.append(chunk)
+            elif chunk_type == 'lecture_segment':
+                transcript_chunks.append(chunk)
             else:
                 text_chunks.append(chunk)
         
@@ -123,44 +245,43 @@ class RadBERTEmbeddingSystem:
         
         # Add to appropriate collections
         if general_chunks:
-            self._add_to_collection(general_chunks, self.text_collection)
+            self._add_to_collection(general_chunks, self.text_collection, "general")
         if case_chunks:
-            self._add_to_collection(case_chunks, self.cases_collection)
+            self._add_to_collection(case_chunks, self.cases_collection, "case")
         if physics_chunks:
-            self._add_to_collection(physics_chunks, self.physics_collection)
+            self._add_to_collection(physics_chunks, self.physics_collection, "physics")
+        
+        if transcript_chunks:
+            self._add_transcript_segments(transcript_chunks)
         
         # Process image chunks
         if image_chunks:
             self._add_image_chunks(image_chunks)
         
-        self.logger.info(f"📚 Added: {len(general_chunks)} general, {len(case_chunks)} cases, {len(physics_chunks)} physics, {len(image_chunks)} images")
+        # Publish this ingest's lexical postings as one segment
+        self.lexical_index.flush()
+        
+        self.logger.info(f"📚 Added: {len(general_chunks)} general, {len(case_chunks)} cases, {len(physics_chunks)} physics, "
+                         f"{len(transcript_chunks)} lecture segments, {len(image_chunks)} images")
+        cache_stats = get_embedding_cache().get_stats()
+        self.logger.info(f"💾 Embedding cache: {cache_stats['hit_rate']:.0%} hit rate, "
+                         f"{cache_stats['entries']} vectors ({cache_stats['size_mb']} MB)")
     
     def _categorize_medical_content(self, chunk: Dict) -> str:
         """Categorize medical content using RadBERT understanding"""
-        text = chunk.get('text', '').lower()
+        annotation = get_medical_annotator().annotate(chunk.get('text', ''))
         
         # Physics indicators (high priority for CORE)
-        physics_terms = [
-            'radiation dose', 'kvp', 'mas', 'ct number', 'hounsfield', 
-            'signal intensity', 'magnetic field', 'frequency', 'wavelength',
-            'attenuation', 'beam hardening', 'scatter', 'collimation'
-        ]
-        
-        if any(term in text for term in physics_terms):
+        if annotation.has('physics_content'):
             return "physics"
         
         # Case study indicators
-        case_terms = [
-            'patient presents', 'year old', 'clinical history', 'case study',
-            'findings show', 'differential diagnosis', 'impression:', 'recommendation:'
-        ]
-        
-        if any(term in text for term in case_terms):
+        if annotation.has('case_content'):
             return "case"
         
         return "general"
     
-    def _add_to_collection(self, chunks: List[Dict], collection):
+    def _add_to_collection(self, chunks: List[Dict], collection, category: str = "general"):
         """Add chunks to collection with RadBERT embeddings"""
         if not chunks:
             return
@@ -173,36 +294,74 @@ class RadBERTEmbeddingSystem:
             if chunk.get('metadata', {}).get('chunk_type') in ['text', 'slide']:
                 texts.append(chunk['text'])
                 metadatas.append(chunk['metadata'])
-                ids.append(str(uuid.uuid4()))
+                ids.append(chunk.get('id') or make_chunk_id(chunk['text'], chunk['metadata']))
+        
+        # Stable IDs make re-ingestion an in-place upsert
+        ids, texts, metadatas = dedupe_by_id(ids, texts, metadatas)
         
         if texts:
-            # Generate embeddings in batches
-            batch_size = 16  # Smaller batches for RadBERT
-            for i in range(0, len(texts), batch_size):
-                batch_texts = texts[i:i + batch_size]
-                batch_metadatas = metadatas[i:i + batch_size]
-                batch_ids = ids[i:i + batch_size]
-                
-                self.logger.info(f"🧠 Generating RadBERT embeddings for batch {i//batch_size + 1}")
-                embeddings = self.embedding_model.encode(
-                    batch_texts, 
-                    show_progress_bar=True,
-                    convert_to_numpy=True
-                )
-                
-                collection.add(
-                    embeddings=embeddings.tolist(),
-                    documents=batch_texts,
-                    metadatas=batch_metadatas,
-                    ids=batch_ids
-                )
+            self.logger.info(f"🧠 Generating RadBERT embeddings for {len(texts)} chunks")
+            self._encode_and_upsert(collection, ids, texts, metadatas, category)
+    
+    def _encode_and_upsert(self, collection, ids: List[str], texts: List[str], metadatas: List[Dict],
+                           category: str, write_batch_size: int = 256):
+        """Embed texts and write them to collection, the unified collection and the lexical index"""
+        # One scheduling pass: similar-length texts share batches, sized by token budget
+        all_embeddings = get_embedding_cache().encode(
+            self.embedding_model,
+            self.embedding_key,
+            texts,
+            max_batch_tokens=self.max_batch_tokens,
+            pool=self.encoding_pool
+        )
+        
+        for i in range(0, len(texts), write_batch_size):
+            batch_texts = texts[i:i + write_batch_size]
+            batch_metadatas = metadatas[i:i + write_batch_size]
+            batch_ids = ids[i:i + write_batch_size]
+            embeddings = all_embeddings[i:i + write_batch_size]
+            
+            collection.upsert(
+                embeddings=embeddings.tolist(),
+                documents=batch_texts,
+                metadatas=batch_metadatas,
+                ids=batch_ids
+            )
+            self._add_to_unified(embeddings.tolist(), batch_texts, batch_metadatas, batch_ids, category)
+            self.lexical_index.add(batch_ids, batch_texts, collection.name)
+    
+    def _add_transcript_segments(self, chunks: List[Dict]):
+        """Add lecture segments to the transcript collection, keeping their timing and speaker fields"""
+        texts = []
+        metadatas = []
+        ids = []
+        
+        for chunk in chunks:
+            text = chunk.get('text', '').strip()
+            if text:
+                texts.append(text)
+                metadatas.append(flatten_metadata(chunk.get('metadata', {})))
+                ids.append(chunk.get('id') or make_chunk_id(text, chunk.get('metadata', {})))
+        
+        ids, texts, metadatas = dedupe_by_id(ids, texts, metadatas)
+        
+        if texts:
+            self.logger.info(f"🎙️ Generating RadBERT embeddings for {len(texts)} lecture segments")
+            self._encode_and_upsert(self.transcript_collection, ids, texts, metadatas, "lecture")
     
     def _add_image_chunks(self, image_chunks: List[Dict]):
-        """Add image chunks with appropriate tagging and metadata"""
-        for chunk in image_chunks:
+        """Add image chunks with appropriate tagging and metadata
+        
+        Descriptions go through the same batched encode-and-upsert path as text.
+        """
+        descriptions = [chunk.get('text', 'Medical image') for chunk in image_chunks]
+        all_tags = self._generate_medical_image_tags_batch(descriptions)
+        
+        ids = []
+        documents = []
+        metadatas = []
+        for chunk, description, tags in zip(image_chunks, descriptions, all_tags):
             try:
-                # Extract image metadata and description
-                description = chunk.get('text', 'Medical image')
                 image_data = chunk.get('image_data', '')
                 metadata = chunk.get('metadata', {})
                 
@@ -214,54 +373,132 @@ class RadBERTEmbeddingSystem:
                     'has_image_data': bool(image_data),
                     'slide_number': metadata.get('slide_number', 0),
                     'source_document': metadata.get('source', 'unknown'),
-                    'medical_tags': ', '.join(self._generate_medical_image_tags(description))  # Convert list to string
+                    'medical_tags': ', '.join(tags)  # Convert list to string
                 }
                 
                 # Use description for embedding (since RadBERT is text-based)
                 enhanced_description = self._enhance_image_description(description, metadata)
                 
-                # Generate embedding for the enhanced description
-                embedding = self.embedding_model.encode([enhanced_description], show_progress_bar=False)
-                
-                # Add to image collection
-                self.image_collection.add(
-                    embeddings=embedding.tolist(),
-                    documents=[enhanced_description],
-                    metadatas=[enhanced_metadata],
-                    ids=[str(uuid.uuid4())]
-                )
-                
-                self.logger.info(f"🖼️  Added image: {metadata.get('slide_title', 'Untitled')} from slide {metadata.get('slide_number', '?')}")
+                ids.append(chunk.get('id') or make_chunk_id(description, metadata, kind="image"))
+                documents.append(enhanced_description)
+                metadatas.append(enhanced_metadata)
                 
             except Exception as e:
                 self.logger.error(f"Failed to process image chunk: {e}")
+        
+        ids, documents, metadatas = dedupe_by_id(ids, documents, metadatas)
+        if not documents:
+            return
+        
+        try:
+            self._encode_and_upsert(self.image_collection, ids, documents, metadatas, "image")
+            self.logger.info(f"🖼️  Added {len(documents)} images from "
+                             f"{len({metadata.get('source_document') for metadata in metadatas})} documents")
+        except Exception as e:
+            self.logger.error(f"Failed to add {len(documents)} image chunks: {e}")
     
-    def _generate_medical_image_tags(self, description: str) -> List[str]:
-        """Generate relevant medical tags for images"""
-        text = description.lower()
-        tags = []
+    def _add_to_unified(self, embeddings: List, documents: List[str], metadatas: List[Dict],
+                        ids: List[str], category: str):
+        """Mirror records into the unified collection with their category"""
+        if not self.use_unified_index:
+            return
         
-        # Anatomy tags
-        anatomy_terms = [
-            'chest', 'abdomen', 'pelvis', 'head', 'brain', 'heart', 'lung', 'liver',
-            'kidney', 'spine', 'bone', 'joint', 'muscle', 'vessel', 'artery', 'vein'
-        ]
+        self.unified_collection.upsert(
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=[{**metadata, 'category': category} for metadata in metadatas],
+            ids=ids
+        )
+        # New records alone don't make the unified collection complete; it must hold the backfill too
+        if not self._unified_ready:
+            self._unified_ready = self._unified_in_sync()
+    
+    def _unified_in_sync(self) -> bool:
+        """True when the unified collection holds every record of the specialized collections"""
+        unified_count = self.unified_collection.count()
+        if unified_count == 0:
+            return False
+        return unified_count >= sum(collection.count() for collection in self._collections_by_category().values())
+    
+    def rebuild_unified_index(self, page_size: int = 500) -> Dict[str, int]:
+        """Copy stored vectors from the specialized collections into the unified collection
         
-        # Imaging modality tags  
-        modality_terms = [
-            'ct', 'mri', 'x-ray', 'ultrasound', 'nuclear', 'pet', 'mammography',
-            'fluoroscopy', 'angiography', 'radiograph'
-        ]
+        Reuses the stored embeddings, so no re-encoding happens. Safe to re-run:
+        records keep their ids and are upserted.
+        """
+        copied = {}
+        for category, collection in self._collections_by_category().items():
+            copied[category] = 0
+            offset = 0
+            while True:
+                page = collection.get(
+                    include=['embeddings', 'documents', 'metadatas'],
+                    limit=page_size,
+                    offset=offset
+                )
+                if not page['ids']:
+                    break
+                
+                self.unified_collection.upsert(
+                    embeddings=np.asarray(page['embeddings']).tolist(),
+                    documents=page['documents'],
+                    metadatas=[{**(metadata or {}), 'category': category} for metadata in page['metadatas']],
+                    ids=page['ids']
+                )
+                copied[category] += len(page['ids'])
+                offset += len(page['ids'])
+            
+            self.logger.info(f"🔗 Unified index: copied {copied[category]} {category} records")
         
-        # Pathology tags
-        pathology_terms = [
-            'mass', 'lesion', 'tumor', 'fracture', 'inflammation', 'infection',
-            'stenosis', 'occlusion', 'hemorrhage', 'edema', 'ischemia'
-        ]
+        self._unified_ready = self._unified_in_sync()
+        return copied
+    
+    def delete_chunks(self, ids: List[str]):
+        """Remove chunks by ID from every collection and the lexical index"""
+        if not ids:
+            return
+        ids = list(ids)
+        for collection in [*self._collections_by_category().values(), self.unified_collection]:
+            collection.delete(ids=ids)
+        self.lexical_index.delete(ids)
+        self.lexical_index.flush()
+        self._unified_ready = self._unified_in_sync()
+    
+    def rebuild_lexical_index(self, page_size: int = 500) -> Dict[str, int]:
+        """Index every stored document in the BM25 index (for content ingested before it existed)"""
+        indexed = {}
+        for category, collection in self._collections_by_category().items():
+            indexed[category] = 0
+            offset = 0
+            while True:
+                page = collection.get(include=['documents'], limit=page_size, offset=offset)
+                if not page['ids']:
+                    break
+                
+                self.lexical_index.add(page['ids'], page['documents'], collection.name)
+                indexed[category] += len(page['ids'])
+                offset += len(page['ids'])
+            
+            self.logger.info(f"🔤 Lexical index: indexed {indexed[category]} {category} records")
         
-        for term in anatomy_terms + modality_terms + pathology_terms:
-            if term in text:
-                tags.append(term)
+        self.lexical_index.flush()
+        self.lexical_index.compact()
+        return indexed
+    
+    def _generate_medical_image_tags(self, description: str) -> List[str]:
+        """Generate relevant medical tags for images"""
+        return self._tags_from_annotation(get_medical_annotator().annotate(description))
+    
+    def _generate_medical_image_tags_batch(self, descriptions: List[str]) -> List[List[str]]:
+        """Tags for many descriptions; repeated captions are annotated once"""
+        return [self._tags_from_annotation(annotation)
+                for annotation in get_medical_annotator().annotate_many(descriptions)]
+    
+    @staticmethod
+    def _tags_from_annotation(annotation) -> List[str]:
+        # Anatomy, imaging modality and pathology tags
+        tags = [term for category in ('image_anatomy', 'image_modality', 'image_pathology')
+                for term in annotation.matched(category)]
                 
         return tags if tags else ['medical_image']
     
@@ -289,13 +526,105 @@ class RadBERTEmbeddingSystem:
         return enhanced
     
     def search_similar_texts(self, query: str, n_results: int = 5, search_type: str = "comprehensive") -> Dict:
-        """Enhanced search with medical routing"""
+        """Enhanced search with medical routing
+        
+        search_type "hybrid" fuses dense and BM25 rankings; any other value is dense-only.
+        """
+        if search_type == "hybrid":
+            return self._search_hybrid(query, n_results)
+        return self._search_dense(query, n_results, search_type)
+    
+    def search_lectures(self, query: str, n_results: int = 5, speaker: Optional[str] = None,
+                        lecture: Optional[str] = None, start_seconds: Optional[int] = None,
+                        end_seconds: Optional[int] = None) -> List[Dict]:
+        """Lecture segments for query, each with a 'citation' like "Lecture title at 12:34"
+        
+        speaker and lecture (transcript filename) match exactly; start_seconds / end_seconds keep
+        segments that overlap that stretch of the recording.
+        """
+        conditions = []
+        if speaker:
+            conditions.append({'speaker': {'$eq': speaker}})
+        if lecture:
+            conditions.append({'filename': {'$eq': lecture}})
+        if start_seconds is not None:
+            conditions.append({'segment_end_seconds': {'$gte': start_seconds}})
+        if end_seconds is not None:
+            conditions.append({'timestamp_seconds': {'$lte': end_seconds}})
+        
+        query_kwargs = {}
+        if conditions:
+            query_kwargs['where'] = conditions[0] if len(conditions) == 1 else {'$and': conditions}
+        
+        results = self.transcript_collection.query(
+            query_embeddings=self.embed_query(query).reshape(1, -1).tolist(),
+            n_results=n_results,
+            include=['documents', 'metadatas', 'distances'],
+            **query_kwargs
+        )
+        
+        hits = []
+        for doc_id, document, metadata, distance in zip(
+                results['ids'][0], results['documents'][0], results['metadatas'][0], results['distances'][0]):
+            title = metadata.get('lecture_title') or metadata.get('filename', 'Lecture')
+            hits.append({
+                'id': doc_id,
+                'text': document,
+                'lecture': title,
+                'filename': metadata.get('filename'),
+                'timestamp': metadata.get('timestamp'),
+                'timestamp_seconds': metadata.get('timestamp_seconds'),
+                'speaker': metadata.get('speaker'),
+                'distance': distance,
+                'citation': f"{title} at {metadata['timestamp']}" if metadata.get('timestamp') else title,
+                'metadata': metadata
+            })
+        return hits
+    
+    def _search_hybrid(self, query: str, n_results: int) -> Dict:
+        """Reciprocal-rank fusion of dense and lexical candidates"""
+        candidates = n_results * self.hybrid_candidates
+        dense_results = self._search_dense(query, candidates, "comprehensive")
+        
+        try:
+            lexical_hits = self.lexical_index.search(query, candidates)
+        except Exception as e:
+            self.logger.warning(f"Lexical search failed, using dense results only: {e}")
+            lexical_hits = []
+        
+        if not lexical_hits:
+            return {key: [values[0][:n_results]] for key, values in dense_results.items()}
+        
+        return fuse_dense_and_lexical(dense_results, lexical_hits, n_results,
+                                      self._fetch_records, k=self.rrf_k)
+    
+    def _fetch_records(self, collection_name: str, ids: List[str]) -> Dict[str, tuple]:
+        """Documents and metadata for ids stored in one of this system's collections"""
+        collections = {collection.name: collection for collection in self._collections_by_category().values()}
+        collection = collections.get(collection_name) or self.chroma_client.get_collection(collection_name)
+        
+        records = collection.get(ids=ids, include=['documents', 'metadatas'])
+        return {
+            doc_id: (document, metadata)
+            for doc_id, document, metadata in zip(records['ids'], records['documents'], records['metadatas'])
+        }
+    
+    def _search_dense(self, query: str, n_results: int, search_type: str) -> Dict:
+        """Embedding search over the unified collection, or each routed collection"""
+        
+        query_embedding = self.embed_query(query).reshape(1, -1)
+        
+        # Single ANN pass over the unified collection once it mirrors every specialized collection
+        if self.use_unified_index and self._unified_ready and search_type != "per_collection":
+            try:
+                return self._search_unified(query, query_embedding, n_results)
+            except Exception as e:
+                self.logger.warning(f"Unified search failed, falling back to per-collection search: {e}")
         
         # Determine search strategy
         collections_to_search = self._get_search_collections(query, search_type)
         
-        query_embedding = self.embedding_model.encode([query])
-        all_results = {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+        all_results = {'ids': [[]], 'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
         
         # Search across relevant collections
         for collection, weight in collections_to_search:
@@ -310,6 +639,7 @@ class RadBERTEmbeddingSystem:
                     # Apply collection weighting
                     weighted_distances = [d * weight for d in results['distances'][0]]
                     
+                    all_results['ids'][0].extend(results['ids'][0])
                     all_results['documents'][0].extend(results['documents'][0])
                     all_results['metadatas'][0].extend(results['metadatas'][0])
                     all_results['distances'][0].extend(weighted_distances)
@@ -322,7 +652,8 @@ class RadBERTEmbeddingSystem:
             combined = list(zip(
                 all_results['documents'][0],
                 all_results['metadatas'][0], 
-                all_results['distances'][0]
+                all_results['distances'][0],
+                all_results['ids'][0]
             ))
             combined.sort(key=lambda x: x[2])  # Sort by distance (lower = more similar)
             combined = combined[:n_results]
@@ -330,69 +661,93 @@ class RadBERTEmbeddingSystem:
             all_results['documents'][0] = [x[0] for x in combined]
             all_results['metadatas'][0] = [x[1] for x in combined]
             all_results['distances'][0] = [x[2] for x in combined]
+            all_results['ids'][0] = [x[3] for x in combined]
         
         return all_results
     
-    def _get_search_collections(self, query: str, search_type: str) -> List[tuple]:
-        """Smart collection selection based on query with image support"""
+    def embed_query(self, query: str) -> np.ndarray:
+        """Query embedding, served from the shared LRU cache when the query was seen before"""
+        return get_query_embedding_cache().encode(self.embedding_model, self.embedding_key, query)
+    
+    def _search_unified(self, query: str, query_embedding: np.ndarray, n_results: int) -> Dict:
+        """Global top-k from one query against the unified collection, ranked by category-weighted distance"""
+        category_weights = self._get_category_weights(query)
+        
+        query_kwargs = {}
+        if len(category_weights) < len(self._collections_by_category()):
+            query_kwargs['where'] = {'category': {'$in': list(category_weights)}}
+        
+        results = self.unified_collection.query(
+            query_embeddings=query_embedding.tolist(),
+            n_results=n_results * self.unified_overfetch,
+            include=['documents', 'metadatas', 'distances'],
+            **query_kwargs
+        )
+        
+        combined = [
+            (document, metadata, distance * category_weights.get(metadata.get('category'), 1.0), doc_id)
+            for document, metadata, distance, doc_id in zip(
+                results['documents'][0], results['metadatas'][0], results['distances'][0], results['ids'][0]
+            )
+        ]
+        combined.sort(key=lambda x: x[2])  # Sort by weighted distance (lower = more similar)
+        combined = combined[:n_results]
+        
+        return {
+            'ids': [[x[3] for x in combined]],
+            'documents': [[x[0] for x in combined]],
+            'metadatas': [[x[1] for x in combined]],
+            'distances': [[x[2] for x in combined]]
+        }
+    
+    def _collections_by_category(self) -> Dict:
+        return {
+            'general': self.text_collection,
+            'case': self.cases_collection,
+            'physics': self.physics_collection,
+            'image': self.image_collection,
+            'lecture': self.transcript_collection
+        }
+    
+    def _get_category_weights(self, query: str) -> Dict[str, float]:
+        """Distance multipliers per content category, routed on the query (lower = preferred)"""
         query_lower = query.lower()
-        collections = []
+        
+        # Questions about what was said in a lecture get transcript priority, other
+        # content stays searchable behind it (checked first: "lecture" contains "ct")
+        if LECTURE_QUERY_PATTERN.search(query_lower):
+            return {'lecture': 0.7, 'general': 1.1, 'case': 1.2, 'physics': 1.25, 'image': 1.3}
         
         # Image-related queries get image collection priority
-        if any(term in query_lower for term in ['image', 'picture', 'figure', 'slide', 'diagram', 'scan', 'x-ray', 'ct', 'mri']):
-            collections.append((self.image_collection, 0.7))  # Highest priority for images
-            collections.append((self.text_collection, 1.1))
+        elif any(term in query_lower for term in ['image', 'picture', 'figure', 'slide', 'diagram', 'scan', 'x-ray', 'ct', 'mri']):
+            return {'image': 0.7, 'general': 1.1}  # Highest priority for images
             
         # Physics queries get physics collection priority
         elif any(term in query_lower for term in ['physics', 'dose', 'kvp', 'technique', 'radiation']):
-            collections.append((self.physics_collection, 0.8))  # Higher priority
-            collections.append((self.text_collection, 1.2))
-            collections.append((self.image_collection, 1.3))  # Include images for physics
+            return {'physics': 0.8, 'general': 1.2, 'image': 1.3}  # Include images for physics
             
         # Case-based queries get cases priority  
         elif any(term in query_lower for term in ['case', 'patient', 'diagnosis', 'findings']):
-            collections.append((self.cases_collection, 0.8))
-            collections.append((self.text_collection, 1.1))
-            collections.append((self.image_collection, 1.2))  # Include images for cases
+            return {'case': 0.8, 'general': 1.1, 'image': 1.2}  # Include images for cases
             
         # Comprehensive search (default)
-        else:
-            collections.append((self.text_collection, 1.0))
-            collections.append((self.cases_collection, 1.1))
-            collections.append((self.physics_collection, 1.2))
-            collections.append((self.image_collection, 1.3))  # Include all collections
-        
-        return collections
+        return {'general': 1.0, 'case': 1.1, 'lecture': 1.15, 'physics': 1.2, 'image': 1.3}
+    
+    def _get_search_collections(self, query: str, search_type: str) -> List[tuple]:
+        """Smart collection selection based on query with image support"""
+        collections_by_category = self._collections_by_category()
+        return [(collections_by_category[category], weight)
+                for category, weight in self._get_category_weights(query).items()]
     
     def add_medical_keywords_boost(self, chunks: List[Dict]) -> List[Dict]:
         """Enhanced medical keyword boosting with CORE focus"""
-        
-        core_exam_keywords = [
-            # High-yield CORE terms
-            'differential diagnosis', 'first-line imaging', 'contraindication',
-            'radiation dose', 'contrast reaction', 'patient safety',
-            'bi-rads', 'lung-rads', 'pi-rads', 'ti-rads', 'acr appropriateness',
-            
-            # Critical findings
-            'acute', 'emergent', 'malignant', 'pathognomonic',
-            'consolidation', 'ground glass', 'mass effect', 'midline shift',
-            
-            # Modalities
-            'ct angiography', 'mr angiography', 'pet-ct', 'dual energy',
-            'contrast enhanced', 'non-contrast', 'arterial phase', 'portal venous'
-        ]
+        annotator = get_medical_annotator()
         
         for chunk in chunks:
-            boost_score = 0
-            text_lower = chunk.get('text', '').lower()
-            
-            # CORE keyword boosting
-            for keyword in core_exam_keywords:
-                if keyword in text_lower:
-                    boost_score += text_lower.count(keyword) * 5  # High boost for CORE terms
+            annotation = annotator.annotate(chunk.get('text', ''))
             
             chunk['metadata'] = chunk.get('metadata', {})
-            chunk['metadata']['radbert_relevance_score'] = boost_score
+            chunk['metadata']['radbert_relevance_score'] = annotation.count('core_exam') * 5  # High boost for CORE terms
             chunk['metadata']['embedding_model'] = str(self.embedding_model)
         
         return chunks
@@ -410,11 +765,16 @@ class RadBERTEmbeddingSystem:
             'embedding_dimension': self.embedding_model.get_sentence_embedding_dimension(),
             'max_sequence_length': getattr(self.embedding_model, 'max_seq_length', 512),
             'device': str(getattr(self.embedding_model, 'device', 'cpu')),
+            'backend': self.backend,
             'collections': {
                 'general': self.text_collection.count() if hasattr(self.text_collection, 'count') else 0,
                 'cases': self.cases_collection.count() if hasattr(self.cases_collection, 'count') else 0,
-                'physics': self.physics_collection.count() if hasattr(self.physics_collection, 'count') else 0
-            }
+                'physics': self.physics_collection.count() if hasattr(self.physics_collection, 'count') else 0,
+                'lectures': self.transcript_collection.count() if hasattr(self.transcript_collection, 'count') else 0,
+                'unified': self.unified_collection.count() if hasattr(self.unified_collection, 'count') else 0
+            },
+            'query_embedding_cache': get_query_embedding_cache().get_stats(),
+            'embedding_cache': get_embedding_cache().get_stats()
         }
 
 
@@ -7,13 +7,16 @@ Creates high-quality, board-style questions with detailed explanations
 import ollama
 import random
 import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
 
+from llm.llm_dispatcher import LLMDispatcher, chat_request
+
 class AdvancedBoardQuestionGenerator:
     def __init__(self, llm_model: str = "llama3.1:8b"):
         self.llm_model = llm_model
         self.client = ollama.Client()
+        self.dispatcher = LLMDispatcher(llm_model)
         self.logger = logging.getLogger(__name__)
 
         # Board-style question templates with clinical vignettes
@@ -115,59 +118,139 @@ class AdvancedBoardQuestionGenerator:
         """Generate comprehensive board-style question"""
 
         try:
-            # Select appropriate template
-            section_templates = self.clinical_templates.get(section.lower(), {})
-            if not section_templates:
+            plan = self.plan_question(section, difficulty, question_type)
+            if plan is None:
                 return self.generate_generic_question(section, difficulty)
 
-            # Select random topic within section
-            topic = random.choice(list(section_templates.keys()))
-            template = random.choice(section_templates[topic])
-
-            # Generate clinical vignette
-            vignette = self.populate_clinical_template(template, section, topic, difficulty)
-
-            # Generate question stem
-            question_stem = self.generate_question_stem(section, topic, question_type)
-
             # Generate answer choices
-            answer_choices = self.generate_answer_choices(section, topic, question_type, difficulty)
-
-            # Create complete question
-            question_text = f"{vignette}\n\n{question_stem}"
-
-            # Select correct answer
-            correct_answer = random.choice(['A', 'B', 'C', 'D'])
+            answer_choices = self.generate_answer_choices(section, plan['topic'], question_type, difficulty)
 
             # Generate explanation
             explanation = self.generate_detailed_explanation(
-                section, topic, vignette, question_stem, answer_choices, correct_answer
+                section, plan['topic'], plan['vignette'], plan['question_stem'],
+                answer_choices, plan['correct_answer']
             )
 
-            return {
-                'question': question_text,
-                'options': {
-                    'A': answer_choices[0],
-                    'B': answer_choices[1],
-                    'C': answer_choices[2],
-                    'D': answer_choices[3]
-                },
-                'correct_answer': correct_answer,
-                'explanation': explanation,
-                'section': section,
-                'topic': topic,
-                'difficulty': difficulty,
-                'question_type': question_type,
-                'success': True
-            }
+            return self.assemble_question(plan, answer_choices, explanation)
 
         except Exception as e:
             self.logger.error(f"Error generating question: {e}")
-            return {
-                'question': f"Error generating question: {str(e)}",
-                'success': False,
-                'error': str(e)
-            }
+            return self._error_result(e)
+
+    def generate_comprehensive_questions(self, specs: List[Tuple[str, str]],
+                                         question_type: str = "diagnosis") -> List[Dict]:
+        """Generate one question per (section, difficulty) spec, in spec order
+
+        The LLM calls run concurrently through the dispatcher in two rounds: answer choices
+        (and whole generic questions), then the explanations that depend on those choices.
+        """
+        results: List[Optional[Dict]] = [None] * len(specs)
+        plans: Dict[int, Dict] = {}
+        first_round: Dict[int, Dict] = {}
+
+        for position, (section, difficulty) in enumerate(specs):
+            try:
+                plan = self.plan_question(section, difficulty, question_type)
+            except Exception as e:
+                self.logger.error(f"Error generating question: {e}")
+                results[position] = self._error_result(e)
+                continue
+            if plan is None:
+                first_round[position] = self._generic_request(section, difficulty)
+            else:
+                plans[position] = plan
+                first_round[position] = self._choices_request(section, plan['topic'], question_type, difficulty)
+
+        positions = list(first_round)
+        choices: Dict[int, List[str]] = {}
+        for position, result in zip(positions, self.dispatcher.chat_many([first_round[p] for p in positions])):
+            section, difficulty = specs[position]
+            if position not in plans:
+                results[position] = (self._generic_result(section, difficulty, result['content'])
+                                     if result['error'] is None else self._error_result(result['error']))
+            elif result['error'] is None:
+                choices[position] = self._choices_from_response(result['content'], section,
+                                                                plans[position]['topic'], question_type)
+            else:
+                self.logger.error(f"Error generating answer choices: {result['error']}")
+                choices[position] = self.generate_fallback_choices(section, plans[position]['topic'], question_type)
+
+        positions = list(choices)
+        explanation_requests = [
+            self._explanation_request(specs[p][0], plans[p]['topic'], plans[p]['vignette'],
+                                      plans[p]['question_stem'], choices[p], plans[p]['correct_answer'])
+            for p in positions
+        ]
+        for position, result in zip(positions, self.dispatcher.chat_many(explanation_requests)):
+            plan = plans[position]
+            if result['error'] is None:
+                explanation = result['content']
+            else:
+                self.logger.error(f"Error generating explanation: {result['error']}")
+                explanation = self._fallback_explanation(specs[position][0], plan['topic'], plan['correct_answer'])
+            results[position] = self.assemble_question(plan, choices[position], explanation)
+
+        return results
+
+    def plan_question(self, section: str, difficulty: str, question_type: str) -> Optional[Dict]:
+        """Vignette, stem and answer letter for a templated question (None if the section has no templates)"""
+
+        # Select appropriate template
+        section_templates = self.clinical_templates.get(section.lower(), {})
+        if not section_templates:
+            return None
+
+        # Select random topic within section
+        topic = random.choice(list(section_templates.keys()))
+        template = random.choice(section_templates[topic])
+
+        return {
+            'section': section,
+            'topic': topic,
+            'difficulty': difficulty,
+            'question_type': question_type,
+            # Generate clinical vignette
+            'vignette': self.populate_clinical_template(template, section, topic, difficulty),
+            # Generate question stem
+            'question_stem': self.generate_question_stem(section, topic, question_type),
+            # Select correct answer
+            'correct_answer': random.choice(['A', 'B', 'C', 'D'])
+        }
+
+    def assemble_question(self, plan: Dict, answer_choices: List[str], explanation: str) -> Dict:
+        """Complete question from its plan, answer choices and explanation"""
+        return {
+            'question': f"{plan['vignette']}\n\n{plan['question_stem']}",
+            'options': {
+                'A': answer_choices[0],
+                'B': answer_choices[1],
+                'C': answer_choices[2],
+                'D': answer_choices[3]
+            },
+            'correct_answer': plan['correct_answer'],
+            'explanation': explanation,
+            'section': plan['section'],
+            'topic': plan['topic'],
+            'difficulty': plan['difficulty'],
+            'question_type': plan['question_type'],
+            'success': True
+        }
+
+    def _error_result(self, error) -> Dict:
+        return {
+            'question': f"Error generating question: {str(error)}",
+            'success': False,
+            'error': str(error)
+        }
+
+    def _chat(self, request: Dict) -> str:
+        """Run one dispatcher-style request on the blocking client"""
+        response = self.client.chat(
+            model=self.llm_model,
+            messages=request['messages'],
+            options=request['options']
+        )
+        return response['message']['content']
 
     def populate_clinical_template(self, template: str, section: str, topic: str, difficulty: str) -> str:
         """Fill in clinical template with realistic values"""
@@ -284,10 +367,7 @@ class AdvancedBoardQuestionGenerator:
 
         return random.choice(stems.get(question_type, stems['diagnosis']))
 
-    def generate_answer_choices(self, section: str, topic: str, question_type: str, difficulty: str) -> List[str]:
-        """Generate realistic answer choices"""
-
-        # Use LLM to generate contextually appropriate choices
+    def _choices_request(self, section: str, topic: str, question_type: str, difficulty: str) -> Dict:
         prompt = f"""Generate 4 realistic answer choices for a {difficulty} level radiology board question about {topic} in {section}.
 
 Question type: {question_type}
@@ -301,28 +381,32 @@ Requirements:
 
 Format: Return only the 4 answer choices as a simple list."""
 
-        try:
-            response = self.client.chat(
-                model=self.llm_model,
-                messages=[
-                    {"role": "system", "content": "You are a radiology attending creating board exam questions."},
-                    {"role": "user", "content": prompt}
-                ],
-                options={
-                    "temperature": 0.7,
-                    "num_predict": 400
-                }
-            )
+        return chat_request(
+            "You are a radiology attending creating board exam questions.",
+            prompt,
+            options={
+                "temperature": 0.7,
+                "num_predict": 400
+            }
+        )
 
-            # Parse response into choices
-            answer_text = response['message']['content']
-            choices = self.parse_answer_choices(answer_text)
+    def _choices_from_response(self, answer_text: str, section: str, topic: str, question_type: str) -> List[str]:
+        # Parse response into choices
+        choices = self.parse_answer_choices(answer_text)
 
-            if len(choices) == 4:
-                return choices
-            else:
-                # Fallback to generic choices
-                return self.generate_fallback_choices(section, topic, question_type)
+        if len(choices) == 4:
+            return choices
+        else:
+            # Fallback to generic choices
+            return self.generate_fallback_choices(section, topic, question_type)
+
+    def generate_answer_choices(self, section: str, topic: str, question_type: str, difficulty: str) -> List[str]:
+        """Generate realistic answer choices"""
+
+        # Use LLM to generate contextually appropriate choices
+        try:
+            answer_text = self._chat(self._choices_request(section, topic, question_type, difficulty))
+            return self._choices_from_response(answer_text, section, topic, question_type)
 
         except Exception as e:
             self.logger.error(f"Error generating answer choices: {e}")
@@ -379,11 +463,9 @@ Format: Return only the 4 answer choices as a simple list."""
             "Option D - Unlikely diagnosis"
         ])
 
-    def generate_detailed_explanation(self, section: str, topic: str, vignette: str,
-                                    question_stem: str, answer_choices: List[str],
-                                    correct_answer: str) -> str:
-        """Generate comprehensive explanation"""
-
+    def _explanation_request(self, section: str, topic: str, vignette: str,
+                             question_stem: str, answer_choices: List[str],
+                             correct_answer: str) -> Dict:
         explanation_prompt = f"""Create a detailed explanation for this radiology board question:
 
 Clinical Vignette: {vignette}
@@ -407,28 +489,33 @@ Provide a comprehensive explanation including:
 
 Keep explanation focused and educational for board preparation."""
 
-        try:
-            response = self.client.chat(
-                model=self.llm_model,
-                messages=[
-                    {"role": "system", "content": "You are a radiology attending providing detailed explanations for board questions."},
-                    {"role": "user", "content": explanation_prompt}
-                ],
-                options={
-                    "temperature": 0.3,
-                    "num_predict": 800
-                }
-            )
+        return chat_request(
+            "You are a radiology attending providing detailed explanations for board questions.",
+            explanation_prompt,
+            options={
+                "temperature": 0.3,
+                "num_predict": 800
+            }
+        )
+
+    def _fallback_explanation(self, section: str, topic: str, correct_answer: str) -> str:
+        return f"The correct answer is {correct_answer}. This question tests knowledge of {topic} in {section}."
+
+    def generate_detailed_explanation(self, section: str, topic: str, vignette: str,
+                                    question_stem: str, answer_choices: List[str],
+                                    correct_answer: str) -> str:
+        """Generate comprehensive explanation"""
 
-            return response['message']['content']
+        try:
+            return self._chat(self._explanation_request(
+                section, topic, vignette, question_stem, answer_choices, correct_answer
+            ))
 
         except Exception as e:
             self.logger.error(f"Error generating explanation: {e}")
-            return f"The correct answer is {correct_answer}. This question tests knowledge of {topic} in {section}."
-
-    def generate_generic_question(self, section: str, difficulty: str) -> Dict:
-        """Generate generic question when specific templates not available"""
+            return self._fallback_explanation(section, topic, correct_answer)
 
+    def _generic_request(self, section: str, difficulty: str) -> Dict:
         generic_prompt = f"""Create a {difficulty} level radiology board question for {section}.
 
 Requirements:
@@ -440,30 +527,29 @@ Requirements:
 
 Format your response as a complete question with options A-D."""
 
-        try:
-            response = self.client.chat(
-                model=self.llm_model,
-                messages=[
-                    {"role": "system", "content": "You are creating radiology board exam questions."},
-                    {"role": "user", "content": generic_prompt}
-                ],
-                options={
-                    "temperature": 0.7,
-                    "num_predict": 1000
-                }
-            )
-
-            return {
-                'question': response['message']['content'],
-                'section': section,
-                'difficulty': difficulty,
-                'success': True,
-                'type': 'generic'
+        return chat_request(
+            "You are creating radiology board exam questions.",
+            generic_prompt,
+            options={
+                "temperature": 0.7,
+                "num_predict": 1000
             }
+        )
+
+    def _generic_result(self, section: str, difficulty: str, content: str) -> Dict:
+        return {
+            'question': content,
+            'section': section,
+            'difficulty': difficulty,
+            'success': True,
+            'type': 'generic'
+        }
+
+    def generate_generic_question(self, section: str, difficulty: str) -> Dict:
+        """Generate generic question when specific templates not available"""
+
+        try:
+            return self._generic_result(section, difficulty, self._chat(self._generic_request(section, difficulty)))
 
         except Exception as e:
-            return {
-                'question': f"Error generating question: {str(e)}",
-                'success': False,
-                'error': str(e)
-            }
\ No newline at end of file
+            return self._error_result(e)
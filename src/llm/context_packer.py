@@ -0,0 +1,96 @@
+# src/llm/context_packer.py
+"""
+Token-budgeted context packing for LLM prompts
+Drops sentences repeated across overlapping chunks and keeps the leading chunks that fit the budget
+"""
+
+from typing import Dict, List, Tuple
+import re
+
+# Same sentence boundary PDFProcessor._split_with_overlap chunks on
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+')
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate Llama-family token count (about 4 characters per token for English)"""
+    return (len(text) + 3) // 4
+
+
+class ContextPacker:
+    """Deduplicate and trim retrieved chunks to a token budget"""
+
+    def __init__(self, max_tokens: int = 2000, duplicate_threshold: float = 0.85,
+                 min_partial_tokens: int = 60):
+        self.max_tokens = max_tokens
+        self.duplicate_threshold = duplicate_threshold  # Word-set Jaccard at which sentences count as repeats
+        self.min_partial_tokens = min_partial_tokens    # Smallest useful leading slice of a chunk that doesn't fit
+
+    def _is_duplicate(self, words: frozenset, seen: List[frozenset]) -> bool:
+        for other in seen:
+            overlap = len(words & other)
+            if overlap and overlap / len(words | other) >= self.duplicate_threshold:
+                return True
+        return False
+
+    def pack(self, chunks: List[Dict]) -> Tuple[List[Dict], Dict]:
+        """Return (packed chunks, stats); chunk text is rewritten, other keys are kept
+
+        Chunks are taken in the order given, so pass them best first. Distances and
+        scores from different retrieval sources aren't comparable, so the packer
+        doesn't re-rank them.
+        """
+        tokens_before = sum(estimate_tokens(chunk.get('text', '')) for chunk in chunks)
+
+        packed = []
+        seen_sentences: List[frozenset] = []
+        used_tokens = 0
+        duplicates_removed = 0
+        chunks_dropped = 0
+        chunks_truncated = 0
+
+        for chunk in chunks:
+            sentences = []
+            for sentence in SENTENCE_PATTERN.split(chunk.get('text', '').strip()):
+                words = frozenset(WORD_PATTERN.findall(sentence.lower()))
+                if not words:
+                    continue
+                if self._is_duplicate(words, seen_sentences):
+                    duplicates_removed += 1
+                    continue
+                sentences.append((sentence, words))
+
+            if not sentences:
+                chunks_dropped += 1
+                continue
+
+            # Keep whole sentences while they fit in what is left of the budget
+            kept = []
+            chunk_tokens = 0
+            for sentence, words in sentences:
+                sentence_tokens = estimate_tokens(sentence) + 1
+                if used_tokens + chunk_tokens + sentence_tokens > self.max_tokens:
+                    break
+                kept.append((sentence, words))
+                chunk_tokens += sentence_tokens
+
+            if len(kept) < len(sentences):
+                if chunk_tokens < self.min_partial_tokens:
+                    chunks_dropped += 1
+                    continue
+                chunks_truncated += 1
+
+            seen_sentences.extend(words for _, words in kept)
+            used_tokens += chunk_tokens
+            packed.append({**chunk, 'text': " ".join(sentence for sentence, _ in kept)})
+
+        stats = {
+            'token_budget': self.max_tokens,
+            'tokens_before': tokens_before,
+            'tokens_after': used_tokens,
+            'tokens_saved': max(0, tokens_before - used_tokens),
+            'duplicate_sentences_removed': duplicates_removed,
+            'chunks_dropped': chunks_dropped,
+            'chunks_truncated': chunks_truncated
+        }
+        return packed, stats
@@ -0,0 +1,164 @@
+# src/llm/llm_dispatcher.py
+"""
+Bounded-concurrency dispatcher for batches of Ollama chat requests
+Runs a batch on ollama.AsyncClient with at most max_concurrency requests in flight
+(match the server's OLLAMA_NUM_PARALLEL), a per-request timeout, retries with backoff
+and cancellation, and hands each result to a callback as soon as it finishes
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import asyncio
+import logging
+import os
+import threading
+import time
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT_SECONDS = 120.0
+
+
+def default_concurrency() -> int:
+    """models.llm.parallel_requests in config.yaml, else OLLAMA_NUM_PARALLEL, else 4"""
+    try:
+        from config.settings import get_setting
+        configured = (get_setting('models', 'llm') or {}).get('parallel_requests')
+    except ImportError:
+        configured = None
+    try:
+        return max(1, int(configured or os.environ.get("OLLAMA_NUM_PARALLEL") or DEFAULT_CONCURRENCY))
+    except ValueError:
+        return DEFAULT_CONCURRENCY
+
+
+def chat_request(system: str, prompt: str, options: Optional[Dict] = None,
+                 model: Optional[str] = None, format: Optional[str] = None) -> Dict:
+    """A request for LLMDispatcher.chat_many from a system message and a user prompt"""
+    return {
+        'messages': [{"role": "system", "content": system}, {"role": "user", "content": prompt}],
+        'options': options or {},
+        'model': model,
+        'format': format
+    }
+
+
+class LLMDispatcher:
+    """Send many chat requests to Ollama concurrently from synchronous code
+
+    Each request is a dict with 'messages' and optional 'options', 'model' and 'format'.
+    Each result is {'index', 'content', 'error', 'attempts', 'seconds'}; 'error' is None on success.
+    """
+
+    def __init__(self, model: str, max_concurrency: Optional[int] = None,
+                 timeout: float = DEFAULT_TIMEOUT_SECONDS, retries: int = 2,
+                 retry_backoff: float = 1.0, host: Optional[str] = None,
+                 client_factory: Optional[Callable] = None):
+        self.logger = logging.getLogger(__name__)
+        self.model = model
+        self.max_concurrency = max_concurrency or default_concurrency()
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.host = host
+        self.client_factory = client_factory or self._ollama_client
+
+        # Batches in flight, so cancel() can reach them from another thread
+        self._lock = threading.Lock()
+        self._running: List[tuple] = []
+
+    def _ollama_client(self):
+        import ollama
+        return ollama.AsyncClient(host=self.host)
+
+    # ------------------------------------------------------------------ async core
+
+    def _result(self, index: int, start: float, attempts: int, content: Optional[str] = None,
+                error: Optional[str] = None) -> Dict:
+        return {'index': index, 'content': content, 'error': error, 'attempts': attempts,
+                'seconds': round(time.perf_counter() - start, 3)}
+
+    async def _chat_one(self, client, semaphore: asyncio.Semaphore, index: int, request: Dict) -> Dict:
+        start = time.perf_counter()
+        attempts = 0
+        error = None
+        kwargs = {'model': request.get('model') or self.model,
+                  'messages': request['messages'],
+                  'options': request.get('options') or {}}
+        if request.get('format'):
+            kwargs['format'] = request['format']
+
+        try:
+            async with semaphore:
+                while attempts <= self.retries:
+                    attempts += 1
+                    try:
+                        response = await asyncio.wait_for(client.chat(**kwargs), self.timeout)
+                        return self._result(index, start, attempts, content=response['message']['content'])
+                    except asyncio.TimeoutError:
+                        error = f"timed out after {self.timeout:.0f}s"
+                    except Exception as e:
+                        error = str(e) or type(e).__name__
+                    if attempts <= self.retries:
+                        self.logger.debug(f"LLM request {index} failed ({error}), retrying")
+                        await asyncio.sleep(self.retry_backoff * 2 ** (attempts - 1))
+        except asyncio.CancelledError:
+            # Reported as a result; a cancelled batch still returns what finished
+            return self._result(index, start, attempts, error="cancelled")
+
+        self.logger.warning(f"LLM request {index} failed after {attempts} attempts: {error}")
+        return self._result(index, start, attempts, error=error)
+
+    async def chat_many_async(self, requests: List[Dict],
+                              on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Results in request order; on_result sees each one in completion order"""
+        if not requests:
+            return []
+
+        client = self.client_factory()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = [asyncio.ensure_future(self._chat_one(client, semaphore, index, request))
+                 for index, request in enumerate(requests)]
+        batch = (asyncio.get_running_loop(), tasks)
+        with self._lock:
+            self._running.append(batch)
+
+        results: List[Optional[Dict]] = [None] * len(requests)
+        try:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                results[result['index']] = result
+                if on_result is not None:
+                    on_result(result)
+        finally:
+            for task in tasks:
+                task.cancel()
+            with self._lock:
+                self._running.remove(batch)
+
+        return results
+
+    # ------------------------------------------------------------------ sync entry points
+
+    def chat_many(self, requests: List[Dict],
+                  on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Run a batch to completion (or cancellation) and return results in request order"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.chat_many_async(requests, on_result))
+
+        # Called from inside an event loop (e.g. a notebook): run the batch on its own loop
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.chat_many_async(requests, on_result)).result()
+
+    def chat_contents(self, requests: List[Dict]) -> List[Optional[str]]:
+        """Response text per request (None where the request failed or was cancelled)"""
+        return [result['content'] for result in self.chat_many(requests)]
+
+    def cancel(self):
+        """Cancel every request still pending or in flight; safe to call from any thread"""
+        with self._lock:
+            running = list(self._running)
+        for loop, tasks in running:
+            for task in tasks:
+                loop.call_soon_threadsafe(task.cancel)
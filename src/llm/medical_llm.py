@@ -5,17 +5,33 @@ Enhanced with medical knowledge and specialized prompting
 """
 
 import ollama
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
 import json
 import logging
+import time
 from datetime import datetime
 
+from llm.context_packer import ContextPacker
+
 class MedicalLLMManager:
-    def __init__(self, model_name: str = "llama3.1:8b"):
+    GENERATION_OPTIONS = {
+        "temperature": 0.1,  # Low for medical accuracy
+        "top_p": 0.85,      # Conservative sampling
+        "num_predict": 1200, # Longer for detailed medical explanations
+        "repeat_penalty": 1.1,
+        "stop": ["</answer>"]
+    }
+    # Exchanges of conversation history included in the prompt (answer caching keys on the same window)
+    HISTORY_TURNS = 3
+    
+    def __init__(self, model_name: str = "llama3.1:8b", context_token_budget: int = 2000):
         self.model_name = model_name
         self.client = ollama.Client()
         self.logger = logging.getLogger(__name__)
         
+        # Retrieved context is packed to this many tokens (prompt + answer must fit num_ctx)
+        self.context_packer = ContextPacker(max_tokens=context_token_budget)
+        
         # Medical specialization settings
         self.medical_context = {
             "specialty": "diagnostic_radiology",
@@ -36,50 +52,112 @@ class MedicalLLMManager:
                          conversation_history: List[Dict] = None) -> Dict:
         """Generate medically-focused response with CORE exam orientation"""
         
-        # Prepare medical context
-        context = self._format_medical_context(context_chunks)
-        
-        # Enhanced medical system prompt
-        system_prompt = self._get_medical_system_prompt()
-        
-        # Construct medical user prompt
-        user_prompt = self._construct_medical_prompt(query, context, conversation_history)
+        messages, context_chunks, packing_stats = self._build_medical_messages(
+            query, context_chunks, conversation_history
+        )
         
         try:
             response = self.client.chat(
                 model=self.model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                options={
-                    "temperature": 0.1,  # Low for medical accuracy
-                    "top_p": 0.85,      # Conservative sampling
-                    "num_predict": 1200, # Longer for detailed medical explanations
-                    "repeat_penalty": 1.1,
-                    "stop": ["</answer>"]
-                }
+                messages=messages,
+                options=self.GENERATION_OPTIONS
             )
             
-            return {
-                "answer": response['message']['content'],
-                "sources": self._extract_medical_sources(context_chunks),
-                "medical_context": self.medical_context,
-                "model_used": self.model_name,
-                "success": True,
-                "response_type": "medical_educational",
-                "timestamp": datetime.now().isoformat()
-            }
+            return self._medical_response(response['message']['content'], context_chunks, packing_stats)
             
         except Exception as e:
             self.logger.error(f"Medical LLM generation error: {e}")
-            return {
-                "answer": f"Medical AI response error: {str(e)}. Please try rephrasing your question.",
-                "sources": [],
-                "model_used": self.model_name,
-                "success": False,
-                "error": str(e)
-            }
+            return self._error_response(e)
+    
+    def generate_response_stream(self, query: str, context_chunks: List[Dict],
+                                 conversation_history: List[Dict] = None) -> Iterator[Dict]:
+        """Stream a medical response as Ollama produces it
+        
+        Yields {'type': 'token', 'content': str} per chunk, then a final
+        {'type': 'done', 'response': {...}} shaped like generate_response's result,
+        with time_to_first_token_ms and generation_ms added.
+        """
+        messages, context_chunks, packing_stats = self._build_medical_messages(
+            query, context_chunks, conversation_history
+        )
+        
+        start = time.perf_counter()
+        first_token_ms = None
+        parts = []
+        
+        try:
+            for chunk in self.client.chat(
+                model=self.model_name,
+                messages=messages,
+                options=self.GENERATION_OPTIONS,
+                stream=True
+            ):
+                content = chunk['message']['content']
+                if not content:
+                    continue
+                if first_token_ms is None:
+                    first_token_ms = round((time.perf_counter() - start) * 1000, 1)
+                parts.append(content)
+                yield {'type': 'token', 'content': content}
+            
+            response = self._medical_response("".join(parts), context_chunks, packing_stats)
+            
+        except Exception as e:
+            self.logger.error(f"Medical LLM streaming error: {e}")
+            response = self._error_response(e)
+            if parts:
+                response['partial_answer'] = "".join(parts)
+        
+        response['time_to_first_token_ms'] = first_token_ms
+        response['generation_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        yield {'type': 'done', 'response': response}
+    
+    def _build_medical_messages(self, query: str, context_chunks: List[Dict],
+                                conversation_history: List[Dict] = None) -> Tuple[List[Dict], List[Dict], Dict]:
+        """System and user messages for a context-grounded medical answer
+        
+        Returns (messages, packed context chunks, packing stats).
+        """
+        
+        # Prepare medical context within the token budget
+        context_chunks, packing_stats = self.context_packer.pack(context_chunks)
+        context = self._format_medical_context(context_chunks)
+        if packing_stats['tokens_saved']:
+            self.logger.info(f"Context packed to {packing_stats['tokens_after']} tokens "
+                             f"({packing_stats['tokens_saved']} saved)")
+        
+        # Enhanced medical system prompt
+        system_prompt = self._get_medical_system_prompt()
+        
+        # Construct medical user prompt
+        user_prompt = self._construct_medical_prompt(query, context, conversation_history)
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        return messages, context_chunks, packing_stats
+    
+    def _medical_response(self, answer: str, context_chunks: List[Dict], packing_stats: Dict) -> Dict:
+        return {
+            "answer": answer,
+            "sources": self._extract_medical_sources(context_chunks),
+            "context_packing": packing_stats,
+            "medical_context": self.medical_context,
+            "model_used": self.model_name,
+            "success": True,
+            "response_type": "medical_educational",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def _error_response(self, error: Exception) -> Dict:
+        return {
+            "answer": f"Medical AI response error: {str(error)}. Please try rephrasing your question.",
+            "sources": [],
+            "model_used": self.model_name,
+            "success": False,
+            "error": str(error)
+        }
     
     def _get_medical_system_prompt(self) -> str:
         """Enhanced medical system prompt for radiology CORE preparation"""
@@ -117,7 +195,7 @@ Your goal is to help medical professionals excel in diagnostic radiology through
         # Add conversation history if available
         history_text = ""
         if history:
-            recent_history = history[-3:]  # Last 3 exchanges
+            recent_history = history[-self.HISTORY_TURNS:]
             history_parts = []
             for item in recent_history:
                 history_parts.append(f"Previous Q: {item.get('question', '')}")
@@ -38,6 +38,8 @@ except ImportError:
     CLIP_AVAILABLE = False
     logging.warning("CLIP not available - visual embeddings will be disabled")
 
+from embeddings.model_registry import get_model_registry
+
 @dataclass
 class RadiologyImage:
     """Represents a radiology image with metadata and embeddings"""
@@ -96,17 +98,15 @@ class ImageProcessor:
         self.thumbnails_dir = self.data_dir / "thumbnails"
         self.thumbnails_dir.mkdir(exist_ok=True)
 
-        # Initialize CLIP model if available
+        # Initialize CLIP model if available (shared across all processors in this process)
         self.clip_model = None
         self.clip_processor = None
         if CLIP_AVAILABLE:
             try:
-                self.clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
-                self.clip_processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
-                logging.info("✅ CLIP model loaded for visual embeddings")
+                self.clip_model, self.clip_processor = get_model_registry().get_clip("openai/clip-vit-base-patch32")
+                logging.info("✅ CLIP model ready for visual embeddings")
             except Exception as e:
                 logging.warning(f"⚠️ Failed to load CLIP model: {e}")
-                CLIP_AVAILABLE = False
 
     def process_image(self, image_path: str, source_doc: str = "", page_num: int = -1) -> Optional[RadiologyImage]:
         """Process a single image file and extract metadata"""
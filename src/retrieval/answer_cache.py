@@ -0,0 +1,247 @@
+# src/retrieval/answer_cache.py
+"""
+Semantic answer cache for RAG queries
+Serves a stored answer when a new question embeds close to one already answered
+"""
+
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+
+DEFAULT_CORPUS_VERSION_FILE = "./data/embeddings/corpus_version.json"
+
+
+def read_corpus_version(version_file: str = DEFAULT_CORPUS_VERSION_FILE) -> str:
+    """Current version tag of the indexed corpus ('' if nothing was ever recorded)"""
+    try:
+        with open(version_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get('version', '')
+    except (OSError, ValueError):
+        return ""
+
+
+def bump_corpus_version(version_file: str = DEFAULT_CORPUS_VERSION_FILE) -> str:
+    """Record that the indexed corpus changed; invalidates answer caches in every process"""
+    version = uuid.uuid4().hex
+    Path(version_file).parent.mkdir(parents=True, exist_ok=True)
+
+    temp_file = f"{version_file}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'updated': datetime.now().isoformat()}, f)
+    os.replace(temp_file, version_file)
+    return version
+
+
+def history_cache_key(history: Optional[List[Dict]], turns: int) -> str:
+    """Key for the last `turns` exchanges of a conversation, as the LLM prompt sees them ('' for none)"""
+    if not history or turns <= 0:
+        return ""
+    recent = []
+    for item in history[-turns:]:
+        answer = item.get('answer', '')
+        if isinstance(answer, dict):
+            answer = answer.get('answer', '')
+        recent.append([item.get('question', ''), str(answer)[:200]])
+    return hashlib.sha256(json.dumps(recent, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class SemanticAnswerCache:
+    """LRU/TTL cache of RAG responses keyed by normalized query embedding
+
+    Entries also carry a context key (see history_cache_key); a lookup only matches
+    entries stored under the same context, so follow-ups reuse answers from the same
+    conversation state only.
+    """
+
+    def __init__(self, cache_dir: str = "data/cache",
+                 similarity_threshold: float = 0.95,
+                 max_entries: int = 500,
+                 ttl_seconds: float = 7 * 24 * 3600,
+                 corpus_version_file: str = DEFAULT_CORPUS_VERSION_FILE):
+        self.logger = logging.getLogger(__name__)
+
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.entries_file = self.cache_dir / "answer_cache.json"
+        self.vectors_file = self.cache_dir / "answer_cache.npy"
+
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.corpus_version_file = corpus_version_file
+
+        # key -> {'question', 'context_key', 'response', 'created', 'last_used'}; order is LRU (oldest first)
+        self.entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self.vectors: Dict[str, np.ndarray] = {}
+        self.corpus_version = read_corpus_version(corpus_version_file)
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+
+        self._load()
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _load(self):
+        """Load persisted entries, discarding them if the corpus changed since they were written"""
+        if not self.entries_file.exists() or not self.vectors_file.exists():
+            return
+
+        try:
+            with open(self.entries_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            vectors = np.load(self.vectors_file)
+
+            if data.get('corpus_version', '') != self.corpus_version:
+                self.logger.info("Answer cache is from an older corpus, starting empty")
+                return
+
+            for row, entry in enumerate(data.get('entries', [])):
+                key = entry.pop('key')
+                self.entries[key] = entry
+                self.vectors[key] = vectors[row]
+
+            self._evict_expired()
+            self.logger.info(f"Loaded {len(self.entries)} cached answers")
+
+        except Exception as e:
+            self.logger.warning(f"Could not load answer cache: {e}")
+            self.entries.clear()
+            self.vectors.clear()
+
+    def _save(self):
+        """Write entries and their vectors atomically"""
+        try:
+            keys = list(self.entries.keys())
+            data = {
+                'corpus_version': self.corpus_version,
+                'entries': [{'key': key, **self.entries[key]} for key in keys]
+            }
+            dimension = len(next(iter(self.vectors.values()))) if self.vectors else 0
+            vectors = (np.stack([self.vectors[key] for key in keys])
+                       if keys else np.zeros((0, dimension), dtype=np.float32))
+
+            temp_entries = self.entries_file.with_suffix('.json.tmp')
+            with open(temp_entries, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+
+            temp_vectors = self.vectors_file.with_suffix('.tmp.npy')
+            np.save(temp_vectors, vectors)
+
+            os.replace(temp_vectors, self.vectors_file)
+            os.replace(temp_entries, self.entries_file)
+
+        except Exception as e:
+            self.logger.warning(f"Could not save answer cache: {e}")
+
+    def _check_corpus_version(self):
+        """Drop every entry when another process re-indexed the corpus"""
+        current = read_corpus_version(self.corpus_version_file)
+        if current != self.corpus_version:
+            self.logger.info("Indexed corpus changed, clearing answer cache")
+            self.entries.clear()
+            self.vectors.clear()
+            self.corpus_version = current
+            self._save()
+
+    def _evict_expired(self):
+        cutoff = time.time() - self.ttl_seconds
+        expired = [key for key, entry in self.entries.items() if entry['created'] < cutoff]
+        for key in expired:
+            del self.entries[key]
+            del self.vectors[key]
+
+    def lookup(self, query_embedding, context_key: str = "") -> Optional[Tuple[Dict, float, str]]:
+        """Return (response, similarity, cached question) for the closest cached query within threshold"""
+        query_vector = self._normalize(query_embedding)
+
+        with self._lock:
+            self._check_corpus_version()
+            self._evict_expired()
+
+            keys = [key for key, entry in self.entries.items() if entry.get('context_key', "") == context_key]
+            if not keys:
+                self.misses += 1
+                return None
+
+            matrix = np.stack([self.vectors[key] for key in keys])
+            if matrix.shape[1] != query_vector.shape[0]:
+                # Embedding model changed; cached vectors are not comparable
+                self.misses += 1
+                return None
+
+            similarities = matrix @ query_vector
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+
+            if similarity < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            key = keys[best]
+            entry = self.entries[key]
+            entry['last_used'] = time.time()
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+            return copy.deepcopy(entry['response']), similarity, entry['question']
+
+    def store(self, question: str, query_embedding, response: Dict, context_key: str = ""):
+        """Cache a response for a question, evicting least recently used entries past capacity"""
+        with self._lock:
+            self._check_corpus_version()
+
+            vector = self._normalize(query_embedding)
+            if self.vectors and len(next(iter(self.vectors.values()))) != len(vector):
+                # Embedding model changed; older vectors can't be compared with new ones
+                self.entries.clear()
+                self.vectors.clear()
+
+            key = uuid.uuid4().hex
+            now = time.time()
+            self.entries[key] = {
+                'question': question,
+                'context_key': context_key,
+                'response': copy.deepcopy(response),
+                'created': now,
+                'last_used': now
+            }
+            self.vectors[key] = vector
+
+            while len(self.entries) > self.max_entries:
+                oldest, _ = self.entries.popitem(last=False)
+                del self.vectors[oldest]
+
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.vectors.clear()
+            self._save()
+
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'similarity_threshold': self.similarity_threshold
+        }
@@ -3,14 +3,34 @@
 Clean RAG system without circular import issues
 """
 
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from contextlib import contextmanager
+import hashlib
 import logging
 import os
 import re
+import threading
+import time
 
 class RadiologyRAGSystem:
+    # Seconds each retrieval source may take before it is dropped from the context
+    DEFAULT_SOURCE_TIMEOUTS = {
+        'documents': 15.0,
+        'flashcards': 2.0,
+        'images': 3.0
+    }
+
     def __init__(self, embedding_model: str = "all-MiniLM-L6-v2", 
-                 llm_model: str = "llama3.1:8b"):
+                 llm_model: str = "llama3.1:8b",
+                 source_timeouts: Dict[str, float] = None,
+                 max_retrieval_workers: int = 6,
+                 enable_answer_cache: bool = True,
+                 answer_cache_threshold: float = 0.95,
+                 search_type: str = "hybrid",
+                 rerank: Optional[bool] = None,
+                 rerank_threshold: Optional[float] = None,
+                 rerank_model: Optional[str] = None):
         
         # Configure logging
         logging.basicConfig(level=logging.INFO)
@@ -20,9 +40,34 @@ class RadiologyRAGSystem:
         self.embedding_system = None
         self.llm_manager = None
         self.question_generator = None  # Add question generator
+        self.image_manager = None
+        self._image_db_mtime = None
         self.embedding_model_name = embedding_model
         self.llm_model_name = llm_model
         
+        # Concurrent retrieval settings; the pool is bounded and shared across queries
+        self.source_timeouts = {**self.DEFAULT_SOURCE_TIMEOUTS, **(source_timeouts or {})}
+        self.search_type = search_type  # "hybrid" fuses BM25 with dense search
+        self.max_retrieval_workers = max_retrieval_workers
+        self._retrieval_executor = None
+        self._executor_lock = threading.Lock()
+        
+        # Semantic answer cache (near-duplicate questions reuse a stored answer)
+        self.enable_answer_cache = enable_answer_cache
+        self.answer_cache_threshold = answer_cache_threshold
+        self.answer_cache = None
+        
+        # Cross-encoder rerank stage; defaults come from config.yaml's retrieval section
+        from config.settings import get_setting
+        self.enable_rerank = get_setting('retrieval', 'rerank', False) if rerank is None else rerank
+        self.rerank_threshold = (get_setting('retrieval', 'similarity_threshold', 0.7)
+                                 if rerank_threshold is None else rerank_threshold)
+        self.rerank_model_name = rerank_model
+        self.reranker = None
+        
+        # Incremental ingestion manifest (skips files that haven't changed since last ingest)
+        self.ingestion_manifest = None
+        
         self.logger.info(f"RadiologyRAGSystem initialized with models: {embedding_model}, {llm_model}")
     
     def _init_embedding_system(self):
@@ -94,7 +139,9 @@ class RadiologyRAGSystem:
             sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
             
             from llm.medical_llm import MedicalLLMManager
-            self.llm_manager = MedicalLLMManager(self.llm_model_name)
+            from config.settings import get_setting
+            context_tokens = (get_setting('models', 'llm') or {}).get('context_tokens', 2000)
+            self.llm_manager = MedicalLLMManager(self.llm_model_name, context_token_budget=context_tokens)
             self.logger.info("✅ LLM manager initialized")
             return self.llm_manager
             
@@ -123,8 +170,88 @@ class RadiologyRAGSystem:
                 self.llm_manager = "failed"
                 return None
     
-    def process_documents(self, document_paths: List[str]) -> Dict:
-        """Process and index all documents"""
+    def _init_answer_cache(self):
+        """Lazy initialization of the semantic answer cache"""
+        if not self.enable_answer_cache:
+            return None
+        if self.answer_cache is not None:
+            return self.answer_cache if self.answer_cache != "unavailable" else None
+
+        try:
+            from retrieval.answer_cache import SemanticAnswerCache
+            self.answer_cache = SemanticAnswerCache(similarity_threshold=self.answer_cache_threshold)
+            return self.answer_cache
+        except Exception as e:
+            self.logger.warning(f"⚠️ Answer cache unavailable: {e}")
+            self.answer_cache = "unavailable"
+            return None
+
+    def _init_manifest(self):
+        """Lazy initialization of the incremental ingestion manifest"""
+        if self.ingestion_manifest is not None:
+            return self.ingestion_manifest if self.ingestion_manifest != "unavailable" else None
+
+        try:
+            from document_processor.ingestion_manifest import IngestionManifest
+            self.ingestion_manifest = IngestionManifest()
+            return self.ingestion_manifest
+        except Exception as e:
+            self.logger.warning(f"⚠️ Ingestion manifest unavailable, every file will be processed: {e}")
+            self.ingestion_manifest = "unavailable"
+            return None
+
+    def _init_reranker(self):
+        """Lazy initialization of the cross-encoder reranker"""
+        if not self.enable_rerank:
+            return None
+        if self.reranker is not None:
+            return self.reranker if self.reranker != "unavailable" else None
+
+        try:
+            from retrieval.reranker import CrossEncoderReranker, DEFAULT_RERANK_MODEL
+            self.reranker = CrossEncoderReranker(self.rerank_model_name or DEFAULT_RERANK_MODEL)
+            return self.reranker
+        except Exception as e:
+            self.logger.warning(f"⚠️ Reranker unavailable, using first-stage ranking: {e}")
+            self.reranker = "unavailable"
+            return None
+
+    def _rerank_chunks(self, reranker, question: str, context_chunks: List[Dict],
+                       n_results: int) -> Tuple[List[Dict], Dict]:
+        """Rerank text chunks with the cross-encoder; images pass through unscored"""
+        text_chunks = [chunk for chunk in context_chunks if chunk['source_type'] != 'image']
+        image_chunks = [chunk for chunk in context_chunks if chunk['source_type'] == 'image']
+
+        try:
+            kept, stats = reranker.rerank(question, text_chunks, self.rerank_threshold, top_k=n_results)
+        except Exception as e:
+            self.logger.warning(f"Rerank failed, using first-stage ranking: {e}")
+            documents = [chunk for chunk in text_chunks if chunk['source_type'] == 'document'][:n_results]
+            others = [chunk for chunk in text_chunks if chunk['source_type'] != 'document']
+            return documents + others + image_chunks, {'rerank_failed': True}
+
+        return kept + image_chunks, stats
+
+    def _embed_query(self, embedding_system, question: str):
+        """Embed a question with the active embedding model (None on failure)"""
+        try:
+            # Shares the query embedding cache with search_similar_texts, so this costs no extra forward pass
+            if hasattr(embedding_system, 'embed_query'):
+                return embedding_system.embed_query(question)
+            return embedding_system.embedding_model.encode([question], show_progress_bar=False)[0]
+        except Exception as e:
+            self.logger.warning(f"Could not embed query for answer cache: {e}")
+            return None
+
+    def process_documents(self, document_paths: List[str], max_workers: Optional[int] = None,
+                          progress_callback=None, force: bool = False) -> Dict:
+        """Process and index all documents
+        
+        Parsing runs in a process pool and chunks are written in batches as documents
+        finish, so one bad file only fails itself. Per-document outcomes are returned
+        under 'documents'. Files the ingestion manifest shows as unchanged are skipped
+        unless force is set; chunks a re-ingested file no longer produces are deleted.
+        """
         
         # Initialize embedding system
         embedding_system = self._init_embedding_system()
@@ -139,288 +266,526 @@ class RadiologyRAGSystem:
             import os
             sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
             
-            from document_processor.pdf_processor import PDFProcessor
-            from document_processor.ppt_processor import PPTProcessor
-            from document_processor.transcript_processor import LectureTranscriptProcessor
+            from document_processor.ingestion_pipeline import IngestionPipeline
             
         except ImportError as e:
             error_msg = f"Document processors not available: {e}"
             self.logger.error(f"❌ {error_msg}")
             return {"error": error_msg, "processed": 0, "success": False}
         
-        # Process documents
-        pdf_processor = PDFProcessor()
-        ppt_processor = PPTProcessor()
-        transcript_processor = LectureTranscriptProcessor()
+        manifest = self._init_manifest()
+        skipped = {}
+        if manifest is not None and not force:
+            to_process = []
+            for path in document_paths:
+                needed, reason = manifest.check(path)
+                if needed:
+                    to_process.append(path)
+                else:
+                    skipped[path] = {'status': 'skipped', 'chunks': 0, 'chunk_ids': [], 'error': reason}
+            if skipped:
+                self.logger.info(f"⏭️ Skipping {len(skipped)} unchanged documents")
+        else:
+            to_process = list(document_paths)
         
-        all_chunks = []
-        processed_count = 0
-        errors = []
-        transcript_count = 0
+        pipeline = IngestionPipeline(
+            embedding_system,
+            chunk_transform=self._add_medical_boost,
+            max_workers=max_workers
+        )
         
-        for doc_path in document_paths:
-            self.logger.info(f"Processing: {os.path.basename(doc_path)}")
-            
-            try:
-                if doc_path.lower().endswith('.pdf'):
-                    content = pdf_processor.extract_text_and_metadata(doc_path)
-                    chunks = pdf_processor.semantic_chunking(content['text'], content['metadata'])
-                    
-                elif doc_path.lower().endswith(('.ppt', '.pptx')):
-                    content = ppt_processor.extract_content(doc_path)
-                    chunks = ppt_processor.create_chunks(content)
-                    
-                elif doc_path.lower().endswith('.txt'):
-                    # Check if it's a lecture transcript
-                    with open(doc_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        sample = f.read(1000)
-                    
-                    # Heuristic: if it has timestamps or speaker patterns, treat as transcript
-                    if (re.search(r'\d{1,2}:\d{2}', sample) or 
-                        re.search(r'^[A-Z][a-z]+\s*:', sample, re.MULTILINE) or
-                        'transcript' in os.path.basename(doc_path).lower()):
-                        
-                        self.logger.info(f"📺 Processing as lecture transcript")
-                        transcript_data = transcript_processor.process_transcript(doc_path)
-                        chunks = transcript_processor.create_chunks(transcript_data)
-                        transcript_count += 1
-                        
-                        # Add transcript stats to metadata
-                        stats = transcript_data.get('processing_stats', {})
-                        self.logger.info(f"📊 Transcript stats: {stats.get('total_segments', 0)} segments, "
-                                       f"estimated {stats.get('estimated_duration', 'unknown')} duration")
-                    else:
-                        # Regular text file
-                        self.logger.info(f"📄 Processing as regular text file")
-                        with open(doc_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        
-                        chunks = [{
-                            'text': content,
-                            'metadata': {
-                                'source': doc_path,
-                                'chunk_type': 'text_file',
-                                'file_type': 'plain_text'
-                            }
-                        }]
-                else:
-                    self.logger.warning(f"Unsupported file type: {doc_path}")
-                    continue
-                
-                # Add medical keyword boosting
-                chunks = self._add_medical_boost(chunks)
-                all_chunks.extend(chunks)
-                processed_count += 1
-                
-            except Exception as e:
-                error_msg = f"Error processing {os.path.basename(doc_path)}: {str(e)}"
-                self.logger.error(error_msg)
-                errors.append(error_msg)
+        # Even a partial write changes what queries can retrieve; a run the manifest
+        # skipped entirely leaves the corpus (and the answer cache) as it was
+        corpus_changed = bool(to_process)
+        try:
+            result = pipeline.run(to_process, progress_callback=progress_callback)
+            removed = 0
+            if manifest is not None:
+                removed = self._update_manifest(manifest, embedding_system, result['documents'])
+            corpus_changed = bool(result['processed'] or removed)
+        finally:
+            if corpus_changed:
+                self._mark_corpus_changed()
         
-        # Add to vector store
-        if all_chunks:
-            try:
-                embedding_system.add_text_chunks(all_chunks)
-                self.logger.info(f"✅ Processed {len(all_chunks)} chunks from {processed_count} documents")
-            except Exception as e:
-                error_msg = f"Vector store error: {e}"
-                self.logger.error(f"❌ {error_msg}")
-                return {"error": error_msg, "processed": processed_count, "success": False}
+        result['documents'].update(skipped)
+        
+        errors = [
+            f"Error processing {os.path.basename(path)}: {outcome['error']}"
+            for path, outcome in result['documents'].items()
+            if outcome['status'] == 'failed'
+        ]
+        self.logger.info(f"✅ Processed {result['total_chunks']} chunks from {result['processed']} documents "
+                         f"in {result['elapsed_seconds']}s ({result['workers']} parser workers)")
         
         return {
-            "processed": processed_count,
-            "total_chunks": len(all_chunks),
-            "transcript_count": transcript_count,
+            "processed": result['processed'],
+            "total_chunks": result['total_chunks'],
+            "transcript_count": result['transcript_count'],
             "errors": errors,
+            "skipped": len(skipped),
+            "documents": result['documents'],
+            "elapsed_seconds": result['elapsed_seconds'],
             "success": True
         }
     
+    @contextmanager
+    def bulk_encoding(self, workers: Optional[int] = None, threads_per_worker: Optional[int] = None):
+        """Encode chunks in a pool of core-pinned worker processes for the duration of the block
+        
+        For long CPU ingestion runs; yields the pool, or None when chunks are encoded in-process
+        (workers=1, a GPU model, or no pool support). The pool is shut down on exit.
+        """
+        embedding_system = self._init_embedding_system()
+        pool = None
+        if embedding_system is None or not hasattr(embedding_system, 'start_encoding_pool'):
+            self.logger.info("Bulk encoding unavailable, encoding in-process")
+        elif workers == 1:
+            pass
+        elif str(getattr(embedding_system.embedding_model, 'device', 'cpu')).startswith('cuda'):
+            self.logger.info("Embedding model is on the GPU, encoding in-process")
+        else:
+            try:
+                pool = embedding_system.start_encoding_pool(workers, threads_per_worker)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Could not start encoding pool, encoding in-process: {e}")
+        
+        try:
+            yield pool
+        finally:
+            if pool is not None:
+                embedding_system.stop_encoding_pool()
+    
+    def _update_manifest(self, manifest, embedding_system, documents: Dict) -> int:
+        """Record ingest outcomes and drop chunks that re-ingested files no longer produce
+        
+        Returns the number of stale chunks removed.
+        """
+        removed = 0
+        for path, outcome in documents.items():
+            if outcome['status'] == 'indexed':
+                stale = set(manifest.chunk_ids(path)) - set(outcome['chunk_ids'])
+                if stale and hasattr(embedding_system, 'delete_chunks'):
+                    try:
+                        embedding_system.delete_chunks(sorted(stale))
+                        removed += len(stale)
+                        self.logger.info(f"🧹 Removed {len(stale)} stale chunks from {os.path.basename(path)}")
+                    except Exception as e:
+                        self.logger.warning(f"Could not remove stale chunks from {os.path.basename(path)}: {e}")
+                manifest.record(path, 'indexed', outcome['chunk_ids'])
+            elif outcome['status'] == 'failed':
+                manifest.record(path, 'failed', manifest.chunk_ids(path), error=outcome['error'])
+        
+        try:
+            manifest.save()
+        except OSError as e:
+            self.logger.warning(f"Could not save ingestion manifest: {e}")
+        return removed
+    
+    def _mark_corpus_changed(self):
+        """Invalidate cached answers in every process after the indexed corpus changed"""
+        try:
+            from retrieval.answer_cache import bump_corpus_version
+            bump_corpus_version()
+        except Exception as e:
+            self.logger.warning(f"Could not record corpus change: {e}")
+
     def _add_medical_boost(self, chunks: List[Dict]) -> List[Dict]:
         """Add medical keyword boosting to chunks"""
-        medical_keywords = [
-            'radiology', 'imaging', 'ct', 'mri', 'x-ray', 'ultrasound', 'pet', 'spect',
-            'diagnosis', 'findings', 'pathology', 'clinical', 'patient', 'case',
-            'contrast', 'enhancement', 'lesion', 'mass', 'nodule', 'tumor',
-            'pneumonia', 'fracture', 'hemorrhage', 'stroke', 'cancer', 'benign',
-            'malignant', 'acute', 'chronic', 'bilateral', 'unilateral',
-            'dose', 'radiation', 'safety', 'protocol', 'technique', 'quality'
-        ]
+        from embeddings.medical_terms import get_medical_annotator
+        annotator = get_medical_annotator()
         
         for chunk in chunks:
-            boost_score = 0
-            text_lower = chunk.get('text', '').lower()
-            
-            for keyword in medical_keywords:
-                if keyword in text_lower:
-                    boost_score += text_lower.count(keyword)
+            annotation = annotator.annotate(chunk.get('text', ''))
             
             if 'metadata' not in chunk:
                 chunk['metadata'] = {}
-            chunk['metadata']['medical_relevance_score'] = boost_score
+            chunk['metadata']['medical_relevance_score'] = annotation.count('medical_boost')
         
         return chunks
     
     def query(self, question: str, n_results: int = 5, 
-              conversation_history: List[Dict] = None) -> Dict:
+              conversation_history: List[Dict] = None, use_cache: bool = True) -> Dict:
         """Main query interface"""
+        try:
+            prepared = self._prepare_query(question, n_results, use_cache, conversation_history)
+            if 'response' in prepared:
+                return prepared['response']
+
+            context_chunks = prepared['context_chunks']
+            response = prepared['llm_manager'].generate_response(
+                query=question,
+                context_chunks=context_chunks,
+                conversation_history=conversation_history or []
+            )
+            
+            # Step 4: Add retrieval info and sources
+            self._attach_retrieval(prepared, response)
+
+            self._store_answer(prepared, question, response)
+            return response
+            
+        except Exception as e:
+            return self._query_error(e)
+
+    def query_stream(self, question: str, n_results: int = 5,
+                     conversation_history: List[Dict] = None, use_cache: bool = True) -> Iterator[Dict]:
+        """Streaming query interface
+
+        Yields events in order:
+            {'type': 'meta', 'sources': [...], 'retrieval_info': {...}}  before generation starts
+            {'type': 'token', 'content': str}                            as the LLM produces text
+            {'type': 'done', 'response': {...}}                          same shape query() returns
+
+        retrieval_info['time_to_first_token_ms'] on the final response is measured from
+        the call, so it includes retrieval; the LLM's own figure excludes it.
+        """
+        start = time.perf_counter()
+        try:
+            prepared = self._prepare_query(question, n_results, use_cache, conversation_history)
+        except Exception as e:
+            prepared = {'response': self._query_error(e)}
+
+        if 'response' in prepared:
+            # Cache hits, errors and empty retrievals arrive complete
+            response = prepared['response']
+            yield {'type': 'meta', 'sources': response.get('sources', []),
+                   'retrieval_info': response.get('retrieval_info', {})}
+            yield {'type': 'token', 'content': response.get('answer', '')}
+            yield {'type': 'done', 'response': response}
+            return
+
+        yield {'type': 'meta', 'sources': prepared['sources'], 'retrieval_info': prepared['retrieval_info']}
+
+        llm_manager = prepared['llm_manager']
+        response = None
+        first_token_ms = None
+        try:
+            if hasattr(llm_manager, 'generate_response_stream'):
+                events = llm_manager.generate_response_stream(
+                    query=question,
+                    context_chunks=prepared['context_chunks'],
+                    conversation_history=conversation_history or []
+                )
+            else:
+                # Managers without streaming (e.g. FallbackLLMManager) answer in one piece
+                answer = llm_manager.generate_response(
+                    query=question,
+                    context_chunks=prepared['context_chunks'],
+                    conversation_history=conversation_history or []
+                )
+                events = [{'type': 'token', 'content': answer.get('answer', '')},
+                          {'type': 'done', 'response': answer}]
+
+            for event in events:
+                if event['type'] == 'token':
+                    if first_token_ms is None:
+                        first_token_ms = round((time.perf_counter() - start) * 1000, 1)
+                    yield event
+                elif event['type'] == 'done':
+                    response = event['response']
+
+            if response is None:
+                raise RuntimeError("LLM stream ended without a final response")
+        except Exception as e:
+            yield {'type': 'done', 'response': self._query_error(e)}
+            return
+
+        self._attach_retrieval(prepared, response)
+        response['retrieval_info']['time_to_first_token_ms'] = first_token_ms
+
+        self._store_answer(prepared, question, response)
+        yield {'type': 'done', 'response': response}
+
+    def _prepare_query(self, question: str, n_results: int, use_cache: bool,
+                       conversation_history: List[Dict] = None) -> Dict:
+        """Everything before generation: cache lookup, retrieval, rerank and source list
+
+        Returns {'response': ...} when the query is answered without the LLM, otherwise
+        {'llm_manager', 'context_chunks', 'sources', 'retrieval_info', 'context_packing',
+        'answer_cache', 'query_embedding', 'cache_context'}.
+        """
         
         # Initialize systems
         embedding_system = self._init_embedding_system()
         llm_manager = self._init_llm_manager()
         
         if embedding_system is None:
-            return {
+            return {'response': {
                 "answer": "❌ Embedding system not available. Please check the setup.",
                 "sources": [],
                 "success": False,
                 "error": "Missing embedding system"
-            }
+            }}
             
         if llm_manager is None:
-            return {
+            return {'response': {
                 "answer": "❌ LLM manager not available. Please check Ollama installation and model.",
                 "sources": [],
                 "success": False,
                 "error": "Missing LLM manager"
-            }
+            }}
         
-        try:
-            # Step 1: Retrieve relevant chunks from documents
-            search_results = embedding_system.search_similar_texts(question, n_results)
-
-            # Step 2: Search relevant flashcards
-            flashcard_results = self._search_flashcards(question, n_results=3)
-
-            # Step 3: Search relevant images
-            image_results = self._search_images(question, n_results=2)
-
-            # Step 4: Prepare context chunks
-            context_chunks = []
-
-            # Add document results
-            if (search_results and
-                search_results.get('documents') and
-                search_results['documents'] and
-                search_results['documents'][0]):
-
-                docs = search_results['documents'][0]
-                metadatas = search_results.get('metadatas', [[{}] * len(docs)])[0]
-                distances = search_results.get('distances', [[0] * len(docs)])[0]
-
-                for i in range(len(docs)):
-                    context_chunks.append({
-                        'text': docs[i],
-                        'metadata': metadatas[i] if i < len(metadatas) else {},
-                        'distance': distances[i] if i < len(distances) else 0,
-                        'source_type': 'document'
-                    })
-
-            # Add flashcard results
-            if flashcard_results:
-                for card in flashcard_results:
-                    context_chunks.append({
-                        'text': f"Q: {card['front']}\nA: {card['back']}",
-                        'metadata': {
-                            'source': f"Flashcard: {card['deck_name']}",
-                            'card_id': card['card_id'],
-                            'tags': card.get('tags', [])
-                        },
-                        'distance': 0,  # Flashcards are always relevant if found
-                        'source_type': 'flashcard'
-                    })
-
-            # Add image results
-            if image_results:
-                for image in image_results:
-                    image_description = f"Medical Image: {image.get('modality', 'Unknown')} of {image.get('body_part', 'Unknown')}"
-                    if image.get('extracted_text'):
-                        image_description += f"\nContext: {image['extracted_text']}"
-
-                    context_chunks.append({
-                        'text': image_description,
-                        'metadata': {
-                            'source': f"Image: {image.get('file_path', '')}",
-                            'image_id': image.get('image_id'),
-                            'modality': image.get('modality', ''),
-                            'body_part': image.get('body_part', ''),
-                            'tags': image.get('tags', [])
-                        },
-                        'distance': 0,  # Images are always relevant if found
-                        'source_type': 'image'
-                    })
-            
-            # Step 3: Generate response
-            if not context_chunks:
-                return {
-                    "answer": "I couldn't find relevant information in your documents for this question. Try uploading more materials or rephrasing your question.",
-                    "sources": [],
-                    "success": True,
-                    "retrieval_info": {
-                        "chunks_retrieved": 0,
-                        "search_query": question
-                    }
+        # Step 0: Answer near-duplicates of earlier questions from the cache
+        # (keyed on the question plus the conversation history the prompt will include)
+        answer_cache = self._init_answer_cache() if use_cache else None
+        query_embedding = None
+        cache_context = ""
+        if answer_cache is not None:
+            lookup_start = time.perf_counter()
+            from retrieval.answer_cache import history_cache_key
+            cache_context = history_cache_key(conversation_history, getattr(llm_manager, 'HISTORY_TURNS', 0))
+            query_embedding = self._embed_query(embedding_system, question)
+            cached = (answer_cache.lookup(query_embedding, cache_context)
+                      if query_embedding is not None else None)
+            if cached:
+                response, similarity, cached_question = cached
+                response.setdefault('retrieval_info', {}).update({
+                    'cache_hit': True,
+                    'cache_similarity': round(similarity, 4),
+                    'cached_question': cached_question,
+                    'cache_lookup_ms': round((time.perf_counter() - lookup_start) * 1000, 1)
+                })
+                return {'response': response}
+
+        # Steps 1-3: Search documents, flashcards and images concurrently
+        # (over-fetch documents when a reranker will pick the best of them)
+        reranker = self._init_reranker()
+        n_candidates = min(n_results * 3, reranker.max_candidates) if reranker else n_results
+        retrieved, retrieval_timing = self._retrieve_sources(embedding_system, question, max(n_candidates, n_results))
+        search_results = retrieved.get('documents')
+        flashcard_results = retrieved.get('flashcards')
+        image_results = retrieved.get('images')
+
+        # Step 4: Prepare context chunks
+        context_chunks = []
+
+        # Add document results
+        if (search_results and
+            search_results.get('documents') and
+            search_results['documents'] and
+            search_results['documents'][0]):
+
+            docs = search_results['documents'][0]
+            metadatas = search_results.get('metadatas', [[{}] * len(docs)])[0]
+            distances = search_results.get('distances', [[0] * len(docs)])[0]
+            ids = search_results.get('ids', [[]])[0]
+
+            for i in range(len(docs)):
+                context_chunks.append({
+                    'chunk_id': ids[i] if i < len(ids) else hashlib.sha1(docs[i].encode('utf-8')).hexdigest(),
+                    'text': docs[i],
+                    'metadata': metadatas[i] if i < len(metadatas) else {},
+                    'distance': distances[i] if i < len(distances) else 0,
+                    'source_type': 'document'
+                })
+
+        # Add flashcard results
+        if flashcard_results:
+            for card in flashcard_results:
+                context_chunks.append({
+                    'chunk_id': f"flashcard:{card['card_id']}",
+                    'text': f"Q: {card['front']}\nA: {card['back']}",
+                    'metadata': {
+                        'source': f"Flashcard: {card['deck_name']}",
+                        'card_id': card['card_id'],
+                        'tags': card.get('tags', [])
+                    },
+                    'distance': 0,  # Flashcards are always relevant if found
+                    'source_type': 'flashcard'
+                })
+
+        # Add image results
+        if image_results:
+            for image in image_results:
+                image_description = f"Medical Image: {image.get('modality', 'Unknown')} of {image.get('body_part', 'Unknown')}"
+                if image.get('extracted_text'):
+                    image_description += f"\nContext: {image['extracted_text']}"
+
+                context_chunks.append({
+                    'text': image_description,
+                    'metadata': {
+                        'source': f"Image: {image.get('file_path', '')}",
+                        'image_id': image.get('image_id'),
+                        'modality': image.get('modality', ''),
+                        'body_part': image.get('body_part', ''),
+                        'tags': image.get('tags', [])
+                    },
+                    'distance': 0,  # Images are always relevant if found
+                    'source_type': 'image'
+                })
+
+        # Step 4b: Keep only chunks the cross-encoder judges relevant
+        if reranker is not None and context_chunks:
+            context_chunks, rerank_stats = self._rerank_chunks(reranker, question, context_chunks, n_results)
+            retrieval_timing.update(rerank_stats)
+        
+        if not context_chunks:
+            return {'response': {
+                "answer": "I couldn't find relevant information in your documents for this question. Try uploading more materials or rephrasing your question.",
+                "sources": [],
+                "success": True,
+                "retrieval_info": {
+                    "chunks_retrieved": 0,
+                    "search_query": question,
+                    **retrieval_timing
                 }
-            
-            response = llm_manager.generate_response(
-                query=question,
-                context_chunks=context_chunks,
-                conversation_history=conversation_history or []
-            )
-            
-            # Step 4: Add retrieval info and sources
-            if 'retrieval_info' not in response:
-                response['retrieval_info'] = {}
+            }}
+
+        # Step 5: Pack to the LLM's token budget here, so sources cite only the context it sees
+        chunks_retrieved = len(context_chunks)
+        context_packing = None
+        context_packer = getattr(llm_manager, 'context_packer', None)
+        if context_packer is not None:
+            packed, context_packing = context_packer.pack(context_chunks)
+            if packed:
+                context_chunks = packed
 
-            response['retrieval_info'].update({
-                'chunks_retrieved': len(context_chunks),
+        return {
+            'llm_manager': llm_manager,
+            'context_chunks': context_chunks,
+            'sources': self._build_sources(context_chunks),
+            'retrieval_info': {
+                'chunks_retrieved': chunks_retrieved,
+                'chunks_in_context': len(context_chunks),
                 'search_query': question,
-                'avg_distance': sum(chunk['distance'] for chunk in context_chunks) / len(context_chunks) if context_chunks else 0
-            })
-
-            # Step 5: Build sources list including flashcards and images
-            sources = []
-            for chunk in context_chunks:
-                if chunk.get('source_type') == 'flashcard':
-                    sources.append({
-                        'type': 'flashcard',
-                        'title': f"Flashcard: {chunk['metadata'].get('source', 'Unknown')}",
-                        'card_id': chunk['metadata'].get('card_id'),
-                        'deck_name': chunk['metadata'].get('source', '').replace('Flashcard: ', ''),
-                        'content': chunk['text'][:100] + "..." if len(chunk['text']) > 100 else chunk['text'],
-                        'tags': chunk['metadata'].get('tags', [])
-                    })
-                elif chunk.get('source_type') == 'image':
-                    sources.append({
-                        'type': 'image',
-                        'title': f"Image: {chunk['metadata'].get('modality', 'Medical')} - {chunk['metadata'].get('body_part', 'Unknown')}",
-                        'image_id': chunk['metadata'].get('image_id'),
-                        'file_path': chunk['metadata'].get('source', '').replace('Image: ', ''),
-                        'modality': chunk['metadata'].get('modality', ''),
-                        'body_part': chunk['metadata'].get('body_part', ''),
-                        'tags': chunk['metadata'].get('tags', [])
-                    })
-                else:
-                    # Regular document source
-                    sources.append({
-                        'type': 'document',
-                        'filename': chunk['metadata'].get('filename', 'Document'),
-                        'section': chunk['metadata'].get('section', ''),
-                        'medical_relevance': chunk['metadata'].get('medical_relevance', 3)
-                    })
-
-            response['sources'] = sources
-            return response
-            
-        except Exception as e:
-            error_msg = f"Query processing error: {str(e)}"
-            self.logger.error(f"❌ {error_msg}")
-            return {
-                "answer": f"❌ Error processing your question: {str(e)}",
-                "sources": [],
-                "success": False,
-                "error": error_msg
-            }
+                'avg_distance': sum(chunk['distance'] for chunk in context_chunks) / len(context_chunks),
+                **retrieval_timing
+            },
+            'context_packing': context_packing,
+            'answer_cache': answer_cache,
+            'query_embedding': query_embedding,
+            'cache_context': cache_context
+        }
+
+    def _build_sources(self, context_chunks: List[Dict]) -> List[Dict]:
+        """Sources list for the UI, including flashcards and images"""
+        sources = []
+        for chunk in context_chunks:
+            if chunk.get('source_type') == 'flashcard':
+                sources.append({
+                    'type': 'flashcard',
+                    'title': f"Flashcard: {chunk['metadata'].get('source', 'Unknown')}",
+                    'card_id': chunk['metadata'].get('card_id'),
+                    'deck_name': chunk['metadata'].get('source', '').replace('Flashcard: ', ''),
+                    'content': chunk['text'][:100] + "..." if len(chunk['text']) > 100 else chunk['text'],
+                    'tags': chunk['metadata'].get('tags', [])
+                })
+            elif chunk.get('source_type') == 'image':
+                sources.append({
+                    'type': 'image',
+                    'title': f"Image: {chunk['metadata'].get('modality', 'Medical')} - {chunk['metadata'].get('body_part', 'Unknown')}",
+                    'image_id': chunk['metadata'].get('image_id'),
+                    'file_path': chunk['metadata'].get('source', '').replace('Image: ', ''),
+                    'modality': chunk['metadata'].get('modality', ''),
+                    'body_part': chunk['metadata'].get('body_part', ''),
+                    'tags': chunk['metadata'].get('tags', [])
+                })
+            elif chunk['metadata'].get('chunk_type') == 'lecture_segment':
+                sources.append({
+                    'type': 'document',
+                    'filename': chunk['metadata'].get('filename', 'Lecture'),
+                    'section': (f"{chunk['metadata'].get('lecture_title', 'Lecture')} at {chunk['metadata']['timestamp']}"
+                                if chunk['metadata'].get('timestamp') else chunk['metadata'].get('lecture_title', '')),
+                    'timestamp_seconds': chunk['metadata'].get('timestamp_seconds'),
+                    'medical_relevance': chunk['metadata'].get('medical_relevance', 3)
+                })
+            else:
+                # Regular document source
+                sources.append({
+                    'type': 'document',
+                    'filename': chunk['metadata'].get('filename', 'Document'),
+                    'section': chunk['metadata'].get('section', ''),
+                    'medical_relevance': chunk['metadata'].get('medical_relevance', 3)
+                })
+        return sources
+
+    def _attach_retrieval(self, prepared: Dict, response: Dict):
+        """Add retrieval info, sources and packing stats to a generated response"""
+        response.setdefault('retrieval_info', {}).update(prepared['retrieval_info'])
+        response['sources'] = prepared['sources']
+        if prepared.get('context_packing'):
+            # The LLM re-packs already packed chunks, so its own stats show nothing saved
+            response['context_packing'] = prepared['context_packing']
+
+    def _store_answer(self, prepared: Dict, question: str, response: Dict):
+        """Cache a successful generated answer for near-duplicate questions"""
+        answer_cache = prepared.get('answer_cache')
+        query_embedding = prepared.get('query_embedding')
+        if answer_cache is not None and query_embedding is not None and response.get('success'):
+            answer_cache.store(question, query_embedding, response, prepared.get('cache_context', ""))
+
+    def _query_error(self, error: Exception) -> Dict:
+        error_msg = f"Query processing error: {str(error)}"
+        self.logger.error(f"❌ {error_msg}")
+        return {
+            "answer": f"❌ Error processing your question: {str(error)}",
+            "sources": [],
+            "success": False,
+            "error": error_msg
+        }
     
+    def _get_retrieval_executor(self) -> ThreadPoolExecutor:
+        """Bounded thread pool shared by all queries on this instance"""
+        with self._executor_lock:
+            if self._retrieval_executor is None:
+                self._retrieval_executor = ThreadPoolExecutor(
+                    max_workers=self.max_retrieval_workers,
+                    thread_name_prefix="rag-retrieval"
+                )
+            return self._retrieval_executor
+
+    def _retrieve_sources(self, embedding_system, question: str, n_results: int) -> Tuple[Dict, Dict]:
+        """Fan out to every retrieval source and collect what finishes within its deadline
+
+        Returns (results, timing). A source that times out or fails maps to None in
+        results; timing holds per-source latency and the list of dropped sources.
+        """
+        def timed(search):
+            start = time.perf_counter()
+            result = search()
+            return result, time.perf_counter() - start
+
+        searches = {
+            'documents': lambda: embedding_system.search_similar_texts(question, n_results, search_type=self.search_type),
+            'flashcards': lambda: self._search_flashcards(question, n_results=3),
+            'images': lambda: self._search_images(question, n_results=2)
+        }
+
+        executor = self._get_retrieval_executor()
+        started = time.perf_counter()
+        futures = {name: executor.submit(timed, search) for name, search in searches.items()}
+
+        results = {}
+        latencies = {}
+        timed_out = []
+        failed = []
+
+        for name, future in futures.items():
+            # Deadlines run from fan-out start, so waiting on one source doesn't extend another
+            remaining = started + self.source_timeouts.get(name, 5.0) - time.perf_counter()
+            try:
+                results[name], elapsed = future.result(timeout=max(0.0, remaining))
+                latencies[name] = round(elapsed * 1000, 1)
+            except FuturesTimeoutError:
+                future.cancel()
+                results[name] = None
+                latencies[name] = None
+                timed_out.append(name)
+                self.logger.warning(f"⏱️ {name} retrieval exceeded {self.source_timeouts.get(name, 5.0)}s, dropping from context")
+            except Exception as e:
+                results[name] = None
+                latencies[name] = None
+                failed.append(name)
+                self.logger.warning(f"Error in {name} retrieval: {e}")
+
+        timing = {
+            'source_latency_ms': latencies,
+            'timed_out_sources': timed_out,
+            'failed_sources': failed,
+            'retrieval_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+        return results, timing
+
     def generate_practice_question(self, core_area: str = None, difficulty: str = "intermediate") -> Dict:
         """Generate CORE exam practice questions"""
         question_generator = self._init_question_generator()
@@ -490,63 +855,67 @@ class RadiologyRAGSystem:
             'models': {
                 'embedding_model': self.embedding_model_name,
                 'llm_model': self.llm_model_name
-            }
+            },
+            'loaded_models': self._get_loaded_model_stats(),
+            'answer_cache': (self.answer_cache.get_stats()
+                             if self.answer_cache not in (None, "unavailable") else None),
+            'reranker': (self.reranker.get_stats()
+                         if self.reranker not in (None, "unavailable") else None)
         }
 
+    def _get_loaded_model_stats(self) -> Dict:
+        """Load time and memory of models shared through the model registry"""
+        try:
+            from embeddings.model_registry import get_model_registry
+            return get_model_registry().get_stats()
+        except ImportError:
+            return {}
+
     def _search_flashcards(self, query: str, n_results: int = 3) -> List[Dict]:
         """Search for relevant flashcards based on query"""
         try:
-            # Import flashcard system
+            # Import flashcard index
             import sys
             import os
             sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-            from study.flashcard_system import FlashcardManager
-            flashcard_manager = FlashcardManager()
-
-            # Simple keyword-based search in flashcard content
-            relevant_cards = []
-            query_words = query.lower().split()
-
-            for card_id, card in flashcard_manager.cards.items():
-                # Search in front, back, and tags
-                searchable_text = f"{card.front} {card.back} {' '.join(card.tags)}".lower()
-
-                # Check if any query words are in the card content
-                relevance_score = 0
-                for word in query_words:
-                    if word in searchable_text:
-                        relevance_score += 1
-
-                # Include cards with at least some relevance
-                if relevance_score > 0:
-                    relevant_cards.append({
-                        'card_id': card.card_id,
-                        'deck_name': card.deck_name,
-                        'front': card.front,
-                        'back': card.back,
-                        'tags': card.tags,
-                        'relevance_score': relevance_score
-                    })
-
-            # Sort by relevance and return top results
-            relevant_cards.sort(key=lambda x: x['relevance_score'], reverse=True)
-            return relevant_cards[:n_results]
+            from study.flashcard_index import get_flashcard_index
+
+            # Shared BM25 index, built once per process and updated on import/dedup
+            flashcard_index = get_flashcard_index()
+            return flashcard_index.search(query, n_results=n_results)
 
         except Exception as e:
             self.logger.warning(f"Error searching flashcards: {e}")
             return []
 
-    def _search_images(self, query: str, n_results: int = 2) -> List[Dict]:
-        """Search for relevant images based on query"""
-        try:
+    def _init_image_manager(self):
+        """Lazy initialization of the image manager, reloading its database when it changes on disk"""
+        if self.image_manager is None:
             # Import image processor
             import sys
             import os
             sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
             from multimedia.image_processor import RadiologyImageManager
-            image_manager = RadiologyImageManager()
+            self.image_manager = RadiologyImageManager()
+
+        database = self.image_manager.database
+        try:
+            db_mtime = os.path.getmtime(database.db_file)
+        except OSError:
+            db_mtime = None
+
+        if self._image_db_mtime is not None and db_mtime != self._image_db_mtime:
+            database.images = database._load_database()
+        self._image_db_mtime = db_mtime
+
+        return self.image_manager
+
+    def _search_images(self, query: str, n_results: int = 2) -> List[Dict]:
+        """Search for relevant images based on query"""
+        try:
+            image_manager = self._init_image_manager()
 
             # Use the image manager's search functionality
             results = image_manager.search_images(query, limit=n_results)
@@ -0,0 +1,150 @@
+# src/retrieval/reranker.py
+"""
+Cross-encoder rerank stage for RAG retrieval
+Scores (question, chunk) pairs jointly so only chunks that actually answer the question reach the LLM
+"""
+
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import inspect
+import logging
+import math
+import threading
+import time
+
+from embeddings.model_registry import get_model_registry
+from embeddings.query_embedding_cache import normalize_query
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+def _identity(logits):
+    return logits
+
+
+def _raw_logit_kwargs(model) -> Dict:
+    """predict() kwargs that make a CrossEncoder return raw logits, whatever its default activation
+
+    sentence-transformers names the argument activation_fct before v4 and activation_fn from v4.
+    """
+    try:
+        parameters = inspect.signature(model.predict).parameters
+    except (TypeError, ValueError):
+        return {}
+    try:
+        import torch
+        identity = torch.nn.Identity()
+    except ImportError:
+        identity = _identity
+    for name in ('activation_fn', 'activation_fct'):
+        if name in parameters:
+            return {name: identity}
+    return {}
+
+
+def _sigmoid(logit: float) -> float:
+    """Map a raw cross-encoder logit into [0, 1] without overflowing on large magnitudes"""
+    if logit >= 0:
+        return 1.0 / (1.0 + math.exp(-logit))
+    exp = math.exp(logit)
+    return exp / (1.0 + exp)
+
+
+class CrossEncoderReranker:
+    """Batched cross-encoder scoring with a per-(query, chunk id) score cache"""
+
+    def __init__(self, model_name: str = DEFAULT_RERANK_MODEL,
+                 max_candidates: int = 20,
+                 batch_size: int = 32,
+                 max_cached_scores: int = 10000,
+                 min_kept: int = 3):
+        self.logger = logging.getLogger(__name__)
+        self.model_name = model_name
+        self.max_candidates = max_candidates
+        self.batch_size = batch_size
+        self.max_cached_scores = max_cached_scores
+        self.min_kept = min_kept  # Best chunks kept even when none reach the threshold
+
+        self.model = get_model_registry().get_cross_encoder(model_name)
+        self._predict_kwargs = _raw_logit_kwargs(self.model)
+
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def score(self, query: str, candidates: List[Tuple[str, str]]) -> List[float]:
+        """Relevance in [0, 1] for each (chunk id, text); uncached pairs go through one forward pass
+
+        predict() is asked for raw logits (overriding any default activation the model
+        config sets), and those pass through a sigmoid exactly once.
+        """
+        normalized = normalize_query(query)
+        scores: List[Optional[float]] = []
+        to_score = []
+
+        with self._lock:
+            for position, (chunk_id, _) in enumerate(candidates):
+                key = (normalized, chunk_id)
+                cached = self._scores.get(key)
+                if cached is not None:
+                    self._scores.move_to_end(key)
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                    to_score.append(position)
+                scores.append(cached)
+
+        if to_score:
+            pairs = [(normalized, candidates[position][1]) for position in to_score]
+            predicted = self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False,
+                                           **self._predict_kwargs)
+
+            with self._lock:
+                for position, value in zip(to_score, predicted):
+                    scores[position] = _sigmoid(float(value))
+                    self._scores[(normalized, candidates[position][0])] = scores[position]
+                while len(self._scores) > self.max_cached_scores:
+                    self._scores.popitem(last=False)
+
+        return scores
+
+    def rerank(self, query: str, chunks: List[Dict], threshold: float,
+               top_k: Optional[int] = None) -> Tuple[List[Dict], Dict]:
+        """Keep chunks scoring at least threshold, best first
+
+        Each chunk needs 'chunk_id' and 'text'. Only the first max_candidates chunks
+        are scored; the rest are dropped. When no chunk reaches the threshold the best
+        min_kept are kept anyway, so the LLM never loses all text context. Returns
+        (kept chunks, stats).
+        """
+        start = time.perf_counter()
+        candidates = chunks[:self.max_candidates]
+        scores = self.score(query, [(chunk['chunk_id'], chunk['text']) for chunk in candidates])
+
+        ranked = sorted(zip(candidates, scores), key=lambda pair: pair[1], reverse=True)
+        passing = sum(1 for _, score in ranked if score >= threshold)
+        kept = [{**chunk, 'rerank_score': round(score, 4)}
+                for chunk, score in ranked[:passing or self.min_kept]]
+        if top_k is not None:
+            kept = kept[:top_k]
+
+        stats = {
+            'rerank_candidates': len(candidates),
+            'rerank_kept': len(kept),
+            'rerank_threshold': threshold,
+            'rerank_below_threshold': bool(candidates) and not passing,
+            'rerank_ms': round((time.perf_counter() - start) * 1000, 1)
+        }
+        return kept, stats
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'model': self.model_name,
+                'cached_scores': len(self._scores),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
@@ -11,8 +11,17 @@ from typing import Dict, List, Optional, Tuple
 import pandas as pd
 from pathlib import Path
 import logging
+import math
 import numpy as np
 
+from study.question_pool import QuestionPool, DIFFICULTIES
+
+# Ready questions kept per (section, difficulty): enough for a full exam simulation at the
+# exam's difficulty mix, and never fewer than one session's worth
+POOL_SESSION_DEPTH = 5
+POOL_EXAM_LENGTH = 200
+EXAM_DIFFICULTY_WEIGHTS = {'easy': 0.3, 'intermediate': 0.5, 'hard': 0.2}
+
 class BoardStudySystem:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
@@ -99,9 +108,16 @@ class BoardStudySystem:
 
         # Load or initialize study data
         self.study_history = self.load_study_history()
-        self.question_bank = self.load_question_bank()
         self.weak_areas = self.load_weak_areas()
 
+        # Pre-generated questions (question_bank.json), refilled by start_question_pool()
+        self._question_generator = None
+        self.question_pool = QuestionPool(
+            str(self.data_dir / "question_bank.json"),
+            self.generate_pool_question,
+            self.pool_targets()
+        )
+
     def load_study_history(self) -> Dict:
         """Load study session history"""
         history_file = self.data_dir / "study_history.json"
@@ -119,12 +135,59 @@ class BoardStudySystem:
         }
 
     def load_question_bank(self) -> Dict:
-        """Load generated question bank"""
-        qbank_file = self.data_dir / "question_bank.json"
-        if qbank_file.exists():
-            with open(qbank_file, 'r') as f:
-                return json.load(f)
-        return {'questions': [], 'last_updated': None}
+        """Current contents of the generated question bank"""
+        return self.question_pool.to_bank()
+
+    def pool_targets(self) -> Dict[Tuple[str, str], int]:
+        """Target depth of the question pool per (section, difficulty)"""
+        return {
+            (section, difficulty): max(POOL_SESSION_DEPTH,
+                                       math.ceil(POOL_EXAM_LENGTH * data['weight'] * EXAM_DIFFICULTY_WEIGHTS[difficulty]))
+            for section, data in self.core_sections.items()
+            for difficulty in DIFFICULTIES
+        }
+
+    def get_question_generator(self):
+        """Shared AdvancedBoardQuestionGenerator, created on first use"""
+        if self._question_generator is None:
+            import sys
+            sys.path.append(str(Path(__file__).parent.parent))
+            from llm.advanced_question_generator import AdvancedBoardQuestionGenerator
+
+            self._question_generator = AdvancedBoardQuestionGenerator()
+        return self._question_generator
+
+    def generate_pool_question(self, section: str, difficulty: str) -> Optional[Dict]:
+        """Generate one question for the pool; None if generation failed"""
+        question_data = self.get_question_generator().generate_comprehensive_question(
+            section=section.lower(),
+            difficulty=difficulty
+        )
+        return question_data if question_data.get('success', False) else None
+
+    def start_question_pool(self):
+        """Keep the question pool topped up in the background"""
+        self.question_pool.start()
+
+    def stop_question_pool(self):
+        self.question_pool.stop()
+
+    def take_pooled_question(self, section: str, difficulty: str,
+                             any_difficulty: bool = False) -> Tuple[Optional[Dict], str]:
+        """(generated question, its difficulty) from the pool, or (None, difficulty) if none is ready
+
+        any_difficulty falls back to the section's other difficulties when the requested one is empty.
+        """
+        candidates = [difficulty]
+        if any_difficulty:
+            others = [d for d in DIFFICULTIES if d != difficulty]
+            candidates += random.sample(others, len(others))
+
+        for candidate in candidates:
+            generated = self.question_pool.take(section, candidate)
+            if generated is not None:
+                return generated, candidate
+        return None, difficulty
 
     def load_weak_areas(self) -> Dict:
         """Load identified weak areas for targeted study"""
@@ -142,9 +205,7 @@ class BoardStudySystem:
             json.dump(self.study_history, f, indent=2)
 
         # Save question bank
-        qbank_file = self.data_dir / "question_bank.json"
-        with open(qbank_file, 'w') as f:
-            json.dump(self.question_bank, f, indent=2)
+        self.question_pool.save()
 
         # Save weak areas
         weak_file = self.data_dir / "weak_areas.json"
@@ -184,64 +245,35 @@ class BoardStudySystem:
 
     def generate_section_questions(self, section: str, topics: List[str],
                                  count: int, difficulty: str) -> List[Dict]:
-        """Generate questions focused on specific section"""
-        questions = []
-
-        # Import question generator
-        try:
-            import sys
-            sys.path.append(str(Path(__file__).parent.parent))
-            from llm.advanced_question_generator import AdvancedBoardQuestionGenerator
+        """Generate questions focused on specific section
 
-            generator = AdvancedBoardQuestionGenerator()
+        Pre-generated questions are served from the pool; the shortfall is generated concurrently.
+        """
+        questions = []
 
-            for i in range(count):
-                # Select topic
-                topic = random.choice(topics)
+        for i in range(count):
+            # Select topic
+            topic = random.choice(topics)
 
-                # Adjust difficulty
-                if difficulty == "mixed":
-                    q_difficulty = random.choice(["easy", "intermediate", "hard"])
-                else:
-                    q_difficulty = difficulty
-
-                # Generate question
-                question_data = generator.generate_comprehensive_question(
-                    section=section.lower(),
-                    difficulty=q_difficulty
-                )
-
-                if question_data.get('success', False):
-                    questions.append({
-                        'id': f"{section}_{i+1}",
-                        'section': section,
-                        'topic': topic,
-                        'difficulty': q_difficulty,
-                        'question_text': question_data['question'],
-                        'user_answer': None,
-                        'correct': None,
-                        'time_spent': 0,
-                        'explanation_viewed': False
-                    })
+            # Adjust difficulty
+            if difficulty == "mixed":
+                q_difficulty = random.choice(["easy", "intermediate", "hard"])
+            else:
+                q_difficulty = difficulty
 
-        except Exception as e:
-            self.logger.error(f"Error generating questions: {e}")
-            # Fallback to basic questions
-            questions = []
-            for i in range(count):
-                questions.append({
-                    'id': f"fallback_{i+1}",
-                    'section': section,
-                    'topic': 'general',
-                    'difficulty': difficulty,
-                    'question_text': f"Sample question {i+1} for {section}",
-                    'user_answer': None,
-                    'correct': None,
-                    'time_spent': 0,
-                    'explanation_viewed': False
-                })
+            questions.append(self.attach_pooled_content({
+                'id': f"{section}_{i+1}",
+                'section': section,
+                'topic': topic,
+                'difficulty': q_difficulty,
+                'question_text': f"Sample question {i+1} for {section}",
+                'user_answer': None,
+                'correct': None,
+                'time_spent': 0,
+                'explanation_viewed': False
+            }))
 
-        return questions
+        return self.generate_missing_content(questions)
 
     def generate_weak_area_questions(self, count: int, difficulty: str) -> List[Dict]:
         """Generate questions targeting identified weak areas"""
@@ -263,7 +295,7 @@ class BoardStudySystem:
 
             # Generate targeted question
             # Implementation would connect to question generator
-            questions.append({
+            questions.append(self.attach_pooled_content({
                 'id': f"weak_{i+1}",
                 'section': area,
                 'topic': 'targeted_review',
@@ -273,9 +305,9 @@ class BoardStudySystem:
                 'correct': None,
                 'time_spent': 0,
                 'explanation_viewed': False
-            })
+            }))
 
-        return questions
+        return self.generate_missing_content(questions)
 
     def generate_comprehensive_questions(self, count: int, difficulty: str) -> List[Dict]:
         """Generate mixed questions across all sections"""
@@ -291,7 +323,7 @@ class BoardStudySystem:
             topics = self.core_sections[section]['topics']
             topic = random.choice(topics)
 
-            questions.append({
+            questions.append(self.attach_pooled_content({
                 'id': f"comp_{i+1}",
                 'section': section,
                 'topic': topic,
@@ -301,8 +333,53 @@ class BoardStudySystem:
                 'correct': None,
                 'time_spent': 0,
                 'explanation_viewed': False
+            }))
+
+        return questions
+
+    def attach_pooled_content(self, question: Dict) -> Dict:
+        """Fill a question from the pool (any difficulty for "mixed"), leaving it as is if none is ready"""
+        generated, difficulty = self.take_pooled_question(
+            question['section'], question['difficulty'],
+            any_difficulty=question['difficulty'] not in DIFFICULTIES
+        )
+        if generated is not None:
+            question.update({
+                'difficulty': difficulty,
+                'question_text': generated['question'],
+                'generated_content': generated
             })
+        return question
+
+    def generate_missing_content(self, questions: List[Dict]) -> List[Dict]:
+        """Generate content for the questions the pool could not fill, all at once
+
+        The LLM calls run concurrently through the question generator's dispatcher; questions
+        whose generation fails keep their placeholder text (the study UI generates those on display).
+        """
+        missing = [question for question in questions if 'generated_content' not in question]
+        if not missing:
+            return questions
+
+        for question in missing:
+            if question['difficulty'] not in DIFFICULTIES:
+                question['difficulty'] = random.choice(DIFFICULTIES)
 
+        try:
+            generated = self.get_question_generator().generate_comprehensive_questions(
+                [(question['section'].lower(), question['difficulty']) for question in missing]
+            )
+        except Exception as e:
+            self.logger.error(f"Error generating questions: {e}")
+            return questions
+
+        for question, question_data in zip(missing, generated):
+            if question_data.get('success', False):
+                question['question_text'] = question_data['question']
+                question['generated_content'] = question_data
+
+        self.logger.info(f"Generated {sum('generated_content' in q for q in missing)}/{len(missing)} questions "
+                         f"the pool could not supply")
         return questions
 
     def weighted_random_choice(self, weighted_choices: List[Tuple[str, float]]) -> str:
@@ -679,17 +756,19 @@ class BoardStudySystem:
             for section in largest_sections[:exam_length - total_assigned]:
                 questions_per_section[section] += 1
 
-        # Generate questions for each section
+        # Serve pre-generated questions for each section, placeholders only where the pool ran dry
         question_id = 1
+        pooled = 0
         for section, count in questions_per_section.items():
             topics = self.core_sections[section]['topics']
 
             for i in range(count):
                 topic = random.choice(topics)
-                difficulty = random.choices(['easy', 'intermediate', 'hard'],
-                                          weights=[0.3, 0.5, 0.2])[0]
+                difficulty = random.choices(list(EXAM_DIFFICULTY_WEIGHTS),
+                                          weights=list(EXAM_DIFFICULTY_WEIGHTS.values()))[0]
 
-                simulation['questions'].append({
+                generated, difficulty = self.take_pooled_question(section, difficulty, any_difficulty=True)
+                question = {
                     'id': question_id,
                     'section': section,
                     'topic': topic,
@@ -701,9 +780,25 @@ class BoardStudySystem:
                     'correct': None,
                     'time_spent': 0,
                     'marked_for_review': False
-                })
+                }
+                if generated is not None:
+                    question.update({
+                        'question_text': generated['question'],
+                        'options': generated.get('options', question['options']),
+                        'correct_answer': generated.get('correct_answer', question['correct_answer']),
+                        'explanation': generated.get('explanation'),
+                        'generated_content': generated
+                    })
+                    pooled += 1
+
+                simulation['questions'].append(question)
                 question_id += 1
 
+        simulation['pooled_questions'] = pooled
+        if pooled < exam_length:
+            self.logger.warning(f"Question pool supplied {pooled}/{exam_length} exam questions; "
+                                f"the rest are placeholders until the pool refills")
+
         # Shuffle questions
         random.shuffle(simulation['questions'])
 
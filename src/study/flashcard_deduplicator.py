@@ -29,6 +29,7 @@ class FlashcardDeduplicator:
         self.cards_file = Path(cards_file)
         self.cards_data = {}
         self.duplicate_groups = []
+        self.removed_card_ids = []
 
         # Similarity thresholds
         self.EXACT_THRESHOLD = 1.0
@@ -229,6 +230,8 @@ class FlashcardDeduplicator:
                         del self.cards_data[dup_id]
                         removed_cards.append(dup_id)
 
+        self.removed_card_ids.extend(removed_cards)
+
         return {
             "removed": len(removed_cards),
             "groups_processed": len([g for g in self.duplicate_groups
@@ -254,11 +257,19 @@ class FlashcardDeduplicator:
             with open(self.cards_file, 'w', encoding='utf-8') as f:
                 json.dump(self.cards_data, f, indent=2, ensure_ascii=False)
             print(f"SUCCESS: Cleaned flashcards saved: {len(self.cards_data)} cards remaining")
-            return True
         except Exception as e:
             print(f"ERROR: Error saving cards: {e}")
             return False
 
+        # Drop removed cards from the shared search index if this process has one
+        try:
+            from study.flashcard_index import sync_flashcard_index
+            sync_flashcard_index(self.cards_file, removed_ids=self.removed_card_ids)
+            self.removed_card_ids = []
+        except ImportError:
+            pass
+        return True
+
 def main():
     """Main deduplication process"""
     print("ECHO Flashcard Deduplicator")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+In-memory BM25 search index over the flashcard collection
+Built once per process and kept in sync as cards are imported or deduplicated
+"""
+
+import math
+import heapq
+import logging
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from study.flashcard_system import FlashCard, FlashcardManager
+from embeddings.lexical_index import tokenize
+
+
+class FlashcardSearchIndex:
+    """Okapi BM25 inverted index over flashcard front, back and tags"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, front_weight: int = 2):
+        self.k1 = k1
+        self.b = b
+        self.front_weight = front_weight  # Term frequency multiplier for the question side
+
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.doc_lengths: Dict[str, int] = {}
+        self.cards: Dict[str, FlashCard] = {}
+        self.total_length = 0
+
+        # mtime of the cards file this index reflects; used to spot external edits
+        self.source_mtime: Optional[float] = None
+        self.built = False
+
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def _card_terms(self, card: FlashCard) -> Counter:
+        terms = Counter()
+        for token in tokenize(card.front):
+            terms[token] += self.front_weight
+        terms.update(tokenize(card.back))
+        terms.update(tokenize(' '.join(card.tags or [])))
+        return terms
+
+    def build(self, cards: Dict[str, FlashCard]):
+        """Rebuild the whole index from a card dictionary"""
+        with self._lock:
+            self.postings = defaultdict(dict)
+            self.doc_lengths = {}
+            self.cards = {}
+            self.total_length = 0
+            self._add(cards.values())
+            self.built = True
+        logging.info(f"Flashcard index built over {len(self.cards)} cards, {len(self.postings)} terms")
+
+    def add_cards(self, cards: Iterable[FlashCard]):
+        """Add or replace cards without rebuilding the index"""
+        with self._lock:
+            self._add(cards)
+
+    def remove_cards(self, card_ids: Iterable[str]):
+        """Drop cards from the index"""
+        with self._lock:
+            for card_id in card_ids:
+                self._remove(card_id)
+
+    def _add(self, cards: Iterable[FlashCard]):
+        for card in cards:
+            if card.card_id in self.cards:
+                self._remove(card.card_id)
+
+            terms = self._card_terms(card)
+            for term, frequency in terms.items():
+                self.postings[term][card.card_id] = frequency
+
+            length = sum(terms.values())
+            self.doc_lengths[card.card_id] = length
+            self.total_length += length
+            self.cards[card.card_id] = card
+
+    def _remove(self, card_id: str):
+        card = self.cards.pop(card_id, None)
+        if card is None:
+            return
+
+        for term in self._card_terms(card):
+            term_postings = self.postings.get(term)
+            if term_postings is not None:
+                term_postings.pop(card_id, None)
+                if not term_postings:
+                    del self.postings[term]
+
+        self.total_length -= self.doc_lengths.pop(card_id, 0)
+
+    def search(self, query: str, n_results: int = 3) -> List[Dict]:
+        """Return the top-scoring cards for a free-text query"""
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return []
+
+        with self._lock:
+            total_docs = len(self.cards)
+            if total_docs == 0:
+                return []
+            avg_length = self.total_length / total_docs
+
+            scores = defaultdict(float)
+            for term in query_terms:
+                term_postings = self.postings.get(term)
+                if not term_postings:
+                    continue
+
+                doc_freq = len(term_postings)
+                idf = math.log(1 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+                for card_id, frequency in term_postings.items():
+                    length_norm = 1 - self.b + self.b * self.doc_lengths[card_id] / avg_length
+                    scores[card_id] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+
+            top_hits = heapq.nlargest(n_results, scores.items(), key=lambda item: item[1])
+
+            results = []
+            for card_id, score in top_hits:
+                card = self.cards[card_id]
+                results.append({
+                    'card_id': card.card_id,
+                    'deck_name': card.deck_name,
+                    'front': card.front,
+                    'back': card.back,
+                    'tags': card.tags,
+                    'relevance_score': round(score, 4)
+                })
+            return results
+
+
+# Process-wide indexes keyed by resolved cards.json path
+_shared_indexes: Dict[str, FlashcardSearchIndex] = {}
+_shared_lock = threading.Lock()
+
+
+def _cards_file(data_dir: str) -> Path:
+    return (Path(data_dir) / "cards.json").resolve()
+
+
+def _file_mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def get_flashcard_index(data_dir: str = "data/flashcards") -> FlashcardSearchIndex:
+    """Get the shared index for a flashcard directory, building it on first use
+
+    The index is rebuilt only when cards.json was changed by something that did
+    not report the change through sync_flashcard_index (e.g. another process).
+    """
+    cards_file = _cards_file(data_dir)
+    key = str(cards_file)
+
+    with _shared_lock:
+        index = _shared_indexes.get(key)
+        if index is None:
+            index = FlashcardSearchIndex()
+            _shared_indexes[key] = index
+
+        current_mtime = _file_mtime(cards_file)
+        if not index.built or index.source_mtime != current_mtime:
+            index.build(FlashcardManager(data_dir).cards)
+            index.source_mtime = current_mtime
+
+    return index
+
+
+def sync_flashcard_index(cards_file, added: Iterable[FlashCard] = None,
+                         removed_ids: Iterable[str] = None):
+    """Apply an in-process change to cards.json to the shared index, if one is loaded"""
+    cards_file = Path(cards_file).resolve()
+
+    with _shared_lock:
+        index = _shared_indexes.get(str(cards_file))
+        if index is None:
+            return
+
+        if removed_ids:
+            index.remove_cards(removed_ids)
+        if added:
+            index.add_cards(added)
+        index.source_mtime = _file_mtime(cards_file)
@@ -320,7 +320,7 @@ class FlashcardManager:
             logging.error(f"Error loading cards: {e}")
             return {}
 
-    def _save_cards(self):
+    def _save_cards(self, added_cards: List[FlashCard] = None):
         """Save flashcards to file"""
         try:
             data = {card_id: card.to_dict() for card_id, card in self.cards.items()}
@@ -328,6 +328,14 @@ class FlashcardManager:
                 json.dump(data, f, indent=2, ensure_ascii=False)
         except Exception as e:
             logging.error(f"Error saving cards: {e}")
+            return
+
+        # Keep the shared search index current without a full rebuild
+        try:
+            from study.flashcard_index import sync_flashcard_index
+            sync_flashcard_index(self.cards_file, added=added_cards)
+        except ImportError:
+            pass
 
     def _load_sessions(self) -> List[ReviewSession]:
         """Load review sessions from file"""
@@ -355,13 +363,14 @@ class FlashcardManager:
         """Import an Anki deck and return number of cards imported"""
         cards, media_files = self.importer.import_apkg(apkg_path)
 
-        imported_count = 0
+        new_cards = []
         for card in cards:
             if card.card_id not in self.cards:
                 self.cards[card.card_id] = card
-                imported_count += 1
+                new_cards.append(card)
+        imported_count = len(new_cards)
 
-        self._save_cards()
+        self._save_cards(added_cards=new_cards)
         logging.info(f"Imported {imported_count} new cards from {Path(apkg_path).name}")
         return imported_count
 
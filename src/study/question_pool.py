@@ -0,0 +1,180 @@
+# src/study/question_pool.py
+"""
+Pre-generated question pool for board study sessions
+A background thread keeps a queue of ready questions per (section, difficulty) topped up
+to its target depth, persisted in question_bank.json; sessions take from the queues
+instantly instead of waiting on one LLM round trip per question
+"""
+
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Deque, Dict, Optional, Tuple
+import json
+import logging
+import os
+import threading
+
+DIFFICULTIES = ('easy', 'intermediate', 'hard')
+
+# Generated questions are flushed to disk after this many additions
+SAVE_EVERY = 5
+
+
+class QuestionPool:
+    """Per-(section, difficulty) queues of generated questions with a background refill worker
+
+    generate(section, difficulty) returns a generated question dict, or None on failure.
+    """
+
+    def __init__(self, bank_file: str, generate: Callable[[str, str], Optional[Dict]],
+                 targets: Dict[Tuple[str, str], int], retry_seconds: float = 30.0):
+        self.logger = logging.getLogger(__name__)
+        self.bank_file = Path(bank_file)
+        self.generate = generate
+        self.targets = dict(targets)
+        self.retry_seconds = retry_seconds
+        self.last_updated = None
+        self.queues: Dict[Tuple[str, str], Deque[Dict]] = {key: deque() for key in self.targets}
+
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._load()
+
+    # ------------------------------------------------------------------ persistence
+
+    def _load(self):
+        if not self.bank_file.exists():
+            return
+        try:
+            with open(self.bank_file, 'r', encoding='utf-8') as f:
+                bank = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Could not read question bank, starting empty: {e}")
+            return
+
+        self.last_updated = bank.get('last_updated')
+        for entry in bank.get('questions', []):
+            if not isinstance(entry, dict) or 'generated' not in entry:
+                continue  # Entries from before the pool carry no generated content
+            key = (entry.get('section'), entry.get('difficulty'))
+            self.queues.setdefault(key, deque()).append(entry)
+
+    def to_bank(self) -> Dict:
+        """question_bank.json contents: every pooled question, oldest first"""
+        with self._lock:
+            return {
+                'questions': [entry for queue in self.queues.values() for entry in queue],
+                'last_updated': self.last_updated
+            }
+
+    def save(self):
+        with self._lock:
+            bank = self.to_bank()
+            self.bank_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.bank_file.with_suffix('.json.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(bank, f, indent=2)
+            os.replace(temp_file, self.bank_file)
+
+    # ------------------------------------------------------------------ supply
+
+    def depth(self, section: str, difficulty: str) -> int:
+        with self._lock:
+            return len(self.queues.get((section, difficulty), ()))
+
+    def shortfall(self) -> Dict[Tuple[str, str], int]:
+        """Questions missing from each queue that is below its target"""
+        with self._lock:
+            return {key: target - len(self.queues.get(key, ()))
+                    for key, target in self.targets.items()
+                    if len(self.queues.get(key, ())) < target}
+
+    def add(self, section: str, difficulty: str, generated: Dict):
+        with self._lock:
+            self.queues.setdefault((section, difficulty), deque()).append({
+                'section': section,
+                'difficulty': difficulty,
+                'created': datetime.now().isoformat(),
+                'generated': generated
+            })
+            self.last_updated = datetime.now().isoformat()
+
+    def take(self, section: str, difficulty: str) -> Optional[Dict]:
+        """Oldest ready question for (section, difficulty), or None if that queue is empty"""
+        with self._lock:
+            queue = self.queues.get((section, difficulty))
+            entry = queue.popleft() if queue else None
+        if entry is not None:
+            self._wake.set()
+            return entry['generated']
+        return None
+
+    # ------------------------------------------------------------------ background refill
+
+    def refill_once(self) -> bool:
+        """Generate one question for the most depleted queue; False if nothing is needed or it failed"""
+        missing = self.shortfall()
+        if not missing:
+            return False
+
+        section, difficulty = max(missing, key=lambda key: missing[key] / self.targets[key])
+        try:
+            generated = self.generate(section, difficulty)
+        except Exception as e:
+            self.logger.warning(f"Question pool generation failed for {section} / {difficulty}: {e}")
+            generated = None
+        if not generated:
+            return False
+
+        self.add(section, difficulty, generated)
+        return True
+
+    def _run(self):
+        added = 0
+        while not self._stop.is_set():
+            # Cleared before checking the queues, so a take() from here on wakes the wait below
+            self._wake.clear()
+            if self.refill_once():
+                added += 1
+                if added % SAVE_EVERY == 0 or not self.shortfall():
+                    self.save()
+                continue
+
+            # Full (wait for a take) or failing (back off before retrying)
+            self._wake.wait(None if not self.shortfall() else self.retry_seconds)
+
+        if added:
+            self.save()
+
+    def start(self):
+        """Start the refill worker (no-op if it is already running)"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="question-pool", daemon=True)
+        self._worker.start()
+        self.logger.info(f"📚 Question pool worker started ({sum(self.targets.values())} question target)")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker after its current generation and save what it produced"""
+        if self._worker is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._worker.join(timeout)
+        self._worker = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    def status(self) -> Dict[str, Dict[str, str]]:
+        """Section -> difficulty -> "ready/target" for display"""
+        with self._lock:
+            status: Dict[str, Dict[str, str]] = {}
+            for (section, difficulty), target in self.targets.items():
+                status.setdefault(section, {})[difficulty] = f"{self.depth(section, difficulty)}/{target}"
+            return status
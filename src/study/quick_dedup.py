@@ -78,18 +78,26 @@ def quick_dedup():
             f.write(original_data)
 
         # Remove duplicates (keep first in each group)
-        removed_count = 0
+        removed_ids = []
         for group in duplicates:
             primary_id = group[0]  # Keep first
             for dup_id in group[1:]:  # Remove rest
                 if dup_id in cards_data:
                     del cards_data[dup_id]
-                    removed_count += 1
+                    removed_ids.append(dup_id)
+        removed_count = len(removed_ids)
 
         # Save cleaned data
         with open(cards_file, 'w', encoding='utf-8') as f:
             json.dump(cards_data, f, indent=2, ensure_ascii=False)
 
+        # Drop removed cards from the shared search index if this process has one
+        try:
+            from study.flashcard_index import sync_flashcard_index
+            sync_flashcard_index(cards_file, removed_ids=removed_ids)
+        except ImportError:
+            pass
+
         print(f"SUCCESS: Removed {removed_count} exact duplicates")
         print(f"Remaining cards: {len(cards_data)}")
 
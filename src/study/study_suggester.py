@@ -10,10 +10,27 @@ from typing import List, Dict, Optional
 from datetime import datetime
 import logging
 
+from llm.llm_dispatcher import LLMDispatcher, chat_request
+
+CONTENT_SYSTEM_PROMPT = """You are a radiology attending physician creating educational content using the three-question framework:
+                                     1. What is it? (Recognition and understanding)
+                                     2. What is the next step? (Clinical decision making)  
+                                     3. What is it associated with? (Comprehensive relationships)
+                                     
+                                     Provide accurate, clinically relevant information appropriate for medical education.
+                                     Focus on high-yield information relevant for radiology training and board exams.
+                                     Use clear, systematic explanations that build clinical reasoning skills."""
+
+# Shortest section text accepted from a structured (single JSON document) generation
+MIN_STRUCTURED_SECTION_CHARS = 40
+
 class RadiologyStudySuggester:
-    def __init__(self, llm_model: str = "llama3.1:8b"):
+    def __init__(self, llm_model: str = "llama3.1:8b", structured_content: bool = False):
         self.llm_model = llm_model
         self.client = ollama.Client()
+        self.dispatcher = LLMDispatcher(llm_model)
+        # Ask for all of a session's sections as one JSON document instead of one call per section
+        self.structured_content = structured_content
         self.logger = logging.getLogger(__name__)
         
         # Comprehensive radiology topic database
@@ -168,16 +185,39 @@ class RadiologyStudySuggester:
         return results[:10]
     
     def generate_study_session(self, topic: str, session_type: str = "comprehensive", 
-                             difficulty: str = "intermediate") -> Dict:
-        """Generate a complete interactive study session"""
+                             difficulty: str = "intermediate", structured: Optional[bool] = None) -> Dict:
+        """Generate a complete interactive study session
+
+        Section content and questions are generated concurrently in one dispatcher batch;
+        structured (default: self.structured_content) asks for all sections in a single call.
+        """
         
         template = self.session_templates.get(session_type, self.session_templates['comprehensive'])
+        sections = template['sections']
+        structured = self.structured_content if structured is None else structured
         
-        # Generate the study content
-        study_content = self._generate_topic_content(topic, template['sections'], difficulty)
+        # Study content requests (one structured request, or one per section)
+        if structured:
+            content_requests = [self._structured_content_request(topic, sections, difficulty)]
+        else:
+            content_requests = [self._section_request(topic, section, difficulty) for section in sections]
+        
+        # Interactive question requests
+        planned = self._plan_interactive_questions(template['question_count'])
+        question_requests = [self._interactive_question_request(topic, difficulty, q_type, core)
+                             for q_type, core in planned]
         
-        # Generate interactive questions
-        questions = self._generate_interactive_questions(topic, difficulty, template['question_count'])
+        results = self.dispatcher.chat_many(content_requests + question_requests)
+        content_results = results[:len(content_requests)]
+        question_results = results[len(content_requests):]
+        
+        if structured:
+            study_content = self._structured_content_with_fallback(topic, sections, difficulty, content_results[0])
+        else:
+            study_content = {section: self._section_result(topic, section, result['content'], result['error'])
+                             for section, result in zip(sections, content_results)}
+        
+        questions = self._interactive_questions_from_results(topic, difficulty, planned, question_results)
         
         session = {
             'topic': topic,
@@ -192,19 +232,94 @@ class RadiologyStudySuggester:
         
         return session
     
-    def _generate_topic_content(self, topic: str, sections: List[str], difficulty: str) -> Dict:
-        """Generate comprehensive content for a topic"""
+    def _generate_topic_content(self, topic: str, sections: List[str], difficulty: str,
+                                structured: bool = False) -> Dict:
+        """Generate comprehensive content for a topic (sections concurrently, or in one structured call)"""
+        
+        if structured:
+            result = self.dispatcher.chat_many([self._structured_content_request(topic, sections, difficulty)])[0]
+            return self._structured_content_with_fallback(topic, sections, difficulty, result)
+        
+        results = self.dispatcher.chat_many([self._section_request(topic, section, difficulty)
+                                             for section in sections])
+        return {section: self._section_result(topic, section, result['content'], result['error'])
+                for section, result in zip(sections, results)}
+    
+    def _structured_content_request(self, topic: str, sections: List[str], difficulty: str) -> Dict:
+        """One request for every section, answered as a JSON object keyed by section"""
+        
+        instructions = "\n\n".join(
+            f'"{section}": {" ".join(self._section_prompt(topic, section, difficulty).split())}'
+            for section in sections
+        )
+        prompt = f"""Create study content about {topic} for {difficulty} level radiology residents, covering every section below.
+
+Return a single JSON object with exactly these keys: {", ".join(sections)}
+Each value is that section's complete content as one string (bullets and line breaks allowed inside the string).
+
+Sections:
+{instructions}"""
+        
+        return chat_request(
+            CONTENT_SYSTEM_PROMPT,
+            prompt,
+            options={
+                "temperature": 0.3,
+                "top_p": 0.9,
+                "num_predict": 800 * len(sections)
+            },
+            format="json"
+        )
+    
+    def _parse_structured_content(self, text: Optional[str], sections: List[str]) -> Dict[str, str]:
+        """The sections of a structured generation that passed validation (others are left out)"""
+        if not text:
+            return {}
+        
+        text = text.strip()
+        if text.startswith("```"):
+            text = text.strip("`").strip()
+            if text.lower().startswith("json"):
+                text = text[4:]
+        try:
+            document = json.loads(text)
+        except ValueError as e:
+            self.logger.warning(f"Structured study content is not valid JSON: {e}")
+            return {}
+        if not isinstance(document, dict):
+            return {}
         
         content = {}
-        
         for section in sections:
-            section_content = self._generate_section_content(topic, section, difficulty)
-            content[section] = section_content
-        
+            value = document.get(section)
+            if isinstance(value, list) and all(isinstance(item, str) for item in value):
+                value = "\n".join(f"• {item.strip()}" for item in value)
+            if isinstance(value, str) and len(value.strip()) >= MIN_STRUCTURED_SECTION_CHARS:
+                content[section] = value.strip()
         return content
     
-    def _generate_section_content(self, topic: str, section: str, difficulty: str) -> str:
-        """Generate content for a specific section"""
+    def _structured_content_with_fallback(self, topic: str, sections: List[str], difficulty: str,
+                                          result: Dict) -> Dict:
+        """Validated structured sections, with per-section calls for any that are missing or invalid"""
+        
+        if result['error'] is not None:
+            self.logger.error(f"Error generating structured content for {topic}: {result['error']}")
+        content = self._parse_structured_content(result['content'], sections)
+        
+        missing = [section for section in sections if section not in content]
+        if missing:
+            self.logger.info(f"Structured content for {topic} lacked {', '.join(missing)}; generating per section")
+            results = self.dispatcher.chat_many([self._section_request(topic, section, difficulty)
+                                                 for section in missing])
+            for section, section_result in zip(missing, results):
+                content[section] = self._section_result(topic, section, section_result['content'],
+                                                        section_result['error'])
+        
+        # Keep the template's section order
+        return {section: content[section] for section in sections}
+    
+    def _section_prompt(self, topic: str, section: str, difficulty: str) -> str:
+        """Instructions for one section of study content"""
         
         section_prompts = {
             'what_is_it': f"""Answer "What is it?" for {topic} in radiology.
@@ -296,42 +411,54 @@ class RadiologyStudySuggester:
                             Format: Concise bullet points, exam-focused."""
         }
         
-        prompt = section_prompts.get(section, f"Provide information about {section} for {topic}")
+        return section_prompts.get(section, f"Provide information about {section} for {topic}")
+    
+    def _section_request(self, topic: str, section: str, difficulty: str) -> Dict:
+        return chat_request(
+            CONTENT_SYSTEM_PROMPT,
+            self._section_prompt(topic, section, difficulty),
+            options={
+                "temperature": 0.3,
+                "top_p": 0.9,
+                "num_predict": 800
+            }
+        )
+    
+    def _section_result(self, topic: str, section: str, content: Optional[str], error: Optional[str] = None) -> str:
+        if error is None:
+            return content
+        
+        self.logger.error(f"Error generating {section} content: {error}")
+        return f"Error generating {section} content for {topic}"
+    
+    def _generate_section_content(self, topic: str, section: str, difficulty: str) -> str:
+        """Generate content for a specific section"""
         
+        request = self._section_request(topic, section, difficulty)
         try:
             response = self.client.chat(
                 model=self.llm_model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": f"""You are a radiology attending physician creating educational content using the three-question framework:
-                                     1. What is it? (Recognition and understanding)
-                                     2. What is the next step? (Clinical decision making)  
-                                     3. What is it associated with? (Comprehensive relationships)
-                                     
-                                     Provide accurate, clinically relevant information appropriate for medical education.
-                                     Focus on high-yield information relevant for radiology training and board exams.
-                                     Use clear, systematic explanations that build clinical reasoning skills."""
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                options={
-                    "temperature": 0.3,
-                    "top_p": 0.9,
-                    "num_predict": 800
-                }
+                messages=request['messages'],
+                options=request['options']
             )
             
-            return response['message']['content']
+            return self._section_result(topic, section, response['message']['content'])
             
         except Exception as e:
-            self.logger.error(f"Error generating {section} content: {e}")
-            return f"Error generating {section} content for {topic}"
+            return self._section_result(topic, section, None, str(e))
     
     def _generate_interactive_questions(self, topic: str, difficulty: str, count: int) -> List[Dict]:
         """Generate interactive questions using the three-question framework"""
         
-        questions = []
+        planned = self._plan_interactive_questions(count)
+        
+        # All questions are generated concurrently through the dispatcher
+        results = self.dispatcher.chat_many([self._interactive_question_request(topic, difficulty, q_type, core)
+                                             for q_type, core in planned])
+        return self._interactive_questions_from_results(topic, difficulty, planned, results)
+    
+    def _plan_interactive_questions(self, count: int) -> List[tuple]:
+        """(question type, is core framework question) for each of count questions"""
         
         # Ensure we ask the three core questions
         core_question_types = [
@@ -347,23 +474,32 @@ class RadiologyStudySuggester:
             'image_interpretation'
         ]
         
-        # Generate core questions first
-        for i, q_type in enumerate(core_question_types[:count]):
-            question = self._generate_core_framework_question(topic, difficulty, q_type, i+1)
+        # Core questions first, then additional types if we need more questions
+        planned = [(q_type, True) for q_type in core_question_types[:count]]
+        planned += [(random.choice(additional_types), False) for _ in range(count - len(planned))]
+        return planned
+    
+    def _interactive_question_request(self, topic: str, difficulty: str, q_type: str, core: bool) -> Dict:
+        if core:
+            return self._core_framework_request(topic, difficulty, q_type)
+        return self._single_question_request(topic, difficulty, q_type)
+    
+    def _interactive_questions_from_results(self, topic: str, difficulty: str, planned: List[tuple],
+                                            results: List[Dict]) -> List[Dict]:
+        questions = []
+        for q_number, ((q_type, core), result) in enumerate(zip(planned, results), start=1):
+            if core:
+                question = self._core_framework_result(topic, difficulty, q_type, q_number,
+                                                       result['content'], result['error'])
+            else:
+                question = self._single_question_result(topic, difficulty, q_type, q_number,
+                                                        result['content'], result['error'])
             questions.append(question)
         
-        # Add additional questions if needed
-        remaining_count = count - len(questions)
-        if remaining_count > 0:
-            for i in range(remaining_count):
-                q_type = random.choice(additional_types)
-                question = self._generate_single_question(topic, difficulty, q_type, len(questions)+1)
-                questions.append(question)
-        
         return questions
     
-    def _generate_core_framework_question(self, topic: str, difficulty: str, question_type: str, q_number: int) -> Dict:
-        """Generate questions based on the three-question framework"""
+    def _core_framework_request(self, topic: str, difficulty: str, question_type: str) -> Dict:
+        """Dispatcher request for a three-question framework question"""
         
         framework_prompts = {
             'what_is_it_question': f"""Create a {difficulty} level question testing "What is it?" knowledge for {topic}.
@@ -425,55 +561,66 @@ class RadiologyStudySuggester:
         
         prompt = framework_prompts.get(question_type, framework_prompts['what_is_it_question'])
         
-        try:
-            response = self.client.chat(
-                model=self.llm_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are creating educational questions for radiology training using the three-question framework:
+        return chat_request(
+            """You are creating educational questions for radiology training using the three-question framework:
                                     1. What is it? - Tests recognition and understanding
                                     2. What is the next step? - Tests clinical decision making  
                                     3. What is it associated with? - Tests comprehensive knowledge
                                     
                                     Make questions clinically relevant, educational, and appropriate for board exam preparation.
-                                    Ensure explanations reinforce the framework and clinical reasoning."""
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                options={
-                    "temperature": 0.4,
-                    "top_p": 0.9,
-                    "num_predict": 600
-                }
-            )
-            
+                                    Ensure explanations reinforce the framework and clinical reasoning.""",
+            prompt,
+            options={
+                "temperature": 0.4,
+                "top_p": 0.9,
+                "num_predict": 600
+            }
+        )
+    
+    def _core_framework_result(self, topic: str, difficulty: str, question_type: str, q_number: int,
+                               content: Optional[str], error: Optional[str] = None) -> Dict:
+        if error is None:
             return {
                 'question_number': q_number,
                 'type': question_type,
                 'framework_type': question_type.replace('_question', ''),
-                'content': response['message']['content'],
+                'content': content,
                 'topic': topic,
                 'difficulty': difficulty,
                 'answered': False,
                 'user_answer': None,
                 'start_time': None
             }
+        
+        self.logger.error(f"Error generating {question_type} question {q_number}: {error}")
+        return {
+            'question_number': q_number,
+            'type': question_type,
+            'framework_type': question_type.replace('_question', ''),
+            'content': f"Error generating {question_type} about {topic}",
+            'topic': topic,
+            'difficulty': difficulty,
+            'error': str(error)
+        }
+    
+    def _generate_core_framework_question(self, topic: str, difficulty: str, question_type: str, q_number: int) -> Dict:
+        """Generate questions based on the three-question framework"""
+        
+        request = self._core_framework_request(topic, difficulty, question_type)
+        try:
+            response = self.client.chat(
+                model=self.llm_model,
+                messages=request['messages'],
+                options=request['options']
+            )
+            return self._core_framework_result(topic, difficulty, question_type, q_number,
+                                               response['message']['content'])
             
         except Exception as e:
-            self.logger.error(f"Error generating {question_type} question {q_number}: {e}")
-            return {
-                'question_number': q_number,
-                'type': question_type,
-                'framework_type': question_type.replace('_question', ''),
-                'content': f"Error generating {question_type} about {topic}",
-                'topic': topic,
-                'difficulty': difficulty,
-                'error': str(e)
-            }
+            return self._core_framework_result(topic, difficulty, question_type, q_number, None, str(e))
     
-    def _generate_single_question(self, topic: str, difficulty: str, q_type: str, q_number: int) -> Dict:
-        """Generate a single interactive question"""
+    def _single_question_request(self, topic: str, difficulty: str, q_type: str) -> Dict:
+        """Dispatcher request for a single interactive question"""
         
         type_prompts = {
             'multiple_choice': f"""Create a {difficulty} level multiple choice question about {topic}.
@@ -510,46 +657,57 @@ class RadiologyStudySuggester:
         
         prompt = type_prompts.get(q_type, type_prompts['multiple_choice'])
         
-        try:
-            response = self.client.chat(
-                model=self.llm_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are creating educational questions for radiology training.
+        return chat_request(
+            """You are creating educational questions for radiology training.
                                     Make questions clinically relevant, educational, and appropriate for board exam preparation.
-                                    Ensure explanations are thorough and educational."""
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                options={
-                    "temperature": 0.4,
-                    "top_p": 0.9,
-                    "num_predict": 600
-                }
-            )
-            
+                                    Ensure explanations are thorough and educational.""",
+            prompt,
+            options={
+                "temperature": 0.4,
+                "top_p": 0.9,
+                "num_predict": 600
+            }
+        )
+    
+    def _single_question_result(self, topic: str, difficulty: str, q_type: str, q_number: int,
+                                content: Optional[str], error: Optional[str] = None) -> Dict:
+        if error is None:
             return {
                 'question_number': q_number,
                 'type': q_type,
-                'content': response['message']['content'],
+                'content': content,
                 'topic': topic,
                 'difficulty': difficulty,
                 'answered': False,
                 'user_answer': None,
                 'start_time': None
             }
+        
+        self.logger.error(f"Error generating question {q_number}: {error}")
+        return {
+            'question_number': q_number,
+            'type': q_type,
+            'content': f"Error generating question about {topic}",
+            'topic': topic,
+            'difficulty': difficulty,
+            'error': str(error)
+        }
+    
+    def _generate_single_question(self, topic: str, difficulty: str, q_type: str, q_number: int) -> Dict:
+        """Generate a single interactive question"""
+        
+        request = self._single_question_request(topic, difficulty, q_type)
+        try:
+            response = self.client.chat(
+                model=self.llm_model,
+                messages=request['messages'],
+                options=request['options']
+            )
+            return self._single_question_result(topic, difficulty, q_type, q_number,
+                                                response['message']['content'])
             
         except Exception as e:
-            self.logger.error(f"Error generating question {q_number}: {e}")
-            return {
-                'question_number': q_number,
-                'type': q_type,
-                'content': f"Error generating question about {topic}",
-                'topic': topic,
-                'difficulty': difficulty,
-                'error': str(e)
-            }
+            return self._single_question_result(topic, difficulty, q_type, q_number, None, str(e))
     
     def get_suggested_topics(self, category: str = "all", difficulty: str = "all", 
                            limit: int = 10) -> List[Dict]:
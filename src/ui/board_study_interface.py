@@ -103,6 +103,7 @@ st.markdown("""
 def init_study_systems():
     try:
         study_system = BoardStudySystem()
+        study_system.start_question_pool()
         question_generator = AdvancedBoardQuestionGenerator()
         rag_system = RadiologyRAGSystem()
         return study_system, question_generator, rag_system
@@ -41,6 +41,7 @@ except ImportError:
     RadiologyImageManager = None
     RadiologyImage = None
 from study.flashcard_system import FlashcardManager, FlashCard, ReviewSession
+from embeddings.model_registry import get_model_registry
 from auth.user_system import StreamlitAuth, require_authentication, get_current_user, get_user_profile, update_user_study_progress
 
 # CORE Exam Configuration
@@ -365,7 +366,8 @@ def initialize_systems():
             'spaced_repetition': SpacedRepetitionSystem(),
             'video': VideoManager(),
             'audio': AudioNarrator(),
-            'flashcards': FlashcardManager()
+            'flashcards': FlashcardManager(),
+            'models': get_model_registry()
         }
         return systems
     except Exception as e:
@@ -562,6 +564,12 @@ def render_sidebar():
                 if st.session_state.systems['performance']:
                     metrics = st.session_state.systems['performance'].get_current_metrics()
                     st.info(f"🎯 {metrics.total_questions_answered} questions answered")
+
+                model_stats = st.session_state.systems['models'].get_stats()
+                if model_stats:
+                    with st.expander(f"🧠 {len(model_stats)} models loaded"):
+                        for model_key, stats in model_stats.items():
+                            st.caption(f"{model_key}: {stats['load_seconds']}s, {stats['resident_memory_mb']} MB")
             except:
                 pass
         else:
@@ -1277,6 +1285,61 @@ def render_dashboard():
             daily_tip = random.choice(tips)
             st.info(daily_tip)
 
+def render_response_sources(sources: List[Dict]):
+    """Render the sources list of a RAG response"""
+    for i, source in enumerate(sources[:5], 1):  # Show top 5 sources
+        if source.get('type') == 'flashcard':
+            # Display flashcard source with link
+            st.markdown(f"**{i}. 🃏 {source.get('title', 'Flashcard')}**")
+            st.markdown(f"   Content: {source.get('content', '')}")
+
+            # Tags display
+            tags = source.get('tags', [])
+            if tags:
+                tags_str = ', '.join(tags[:3])  # Show first 3 tags
+                st.markdown(f"   Tags: {tags_str}")
+
+            # Button to jump to flashcard mode
+            if st.button(f"🎯 Study this flashcard", key=f"flashcard_{i}", type="secondary"):
+                st.session_state.current_mode = "flashcards"
+                st.session_state.selected_flashcard = source.get('card_id')
+                st.rerun()
+        elif source.get('type') == 'image':
+            # Display image source with thumbnail
+            st.markdown(f"**{i}. 🖼️ {source.get('title', 'Medical Image')}**")
+
+            # Display image thumbnail if file exists
+            image_path = source.get('file_path', '')
+            if image_path and os.path.exists(image_path):
+                try:
+                    col1, col2 = st.columns([1, 3])
+                    with col1:
+                        st.image(image_path, width=100)
+                    with col2:
+                        st.markdown(f"   Modality: **{source.get('modality', 'Unknown')}**")
+                        st.markdown(f"   Body Part: **{source.get('body_part', 'Unknown')}**")
+
+                        # Tags display
+                        tags = source.get('tags', [])
+                        if tags:
+                            tags_str = ', '.join(tags[:3])  # Show first 3 tags
+                            st.markdown(f"   Tags: {tags_str}")
+                except Exception as e:
+                    st.markdown(f"   Image: {os.path.basename(image_path)} (preview unavailable)")
+                    st.markdown(f"   Modality: **{source.get('modality', 'Unknown')}**")
+                    st.markdown(f"   Body Part: **{source.get('body_part', 'Unknown')}**")
+            else:
+                st.markdown(f"   Image: {source.get('file_path', 'Unknown')}")
+                st.markdown(f"   Modality: **{source.get('modality', 'Unknown')}**")
+        else:
+            # Regular document source
+            st.markdown(f"**{i}.** {source.get('filename', 'Unknown source')}")
+            if source.get('section'):
+                st.markdown(f"   Section: {source['section']}")
+            if source.get('medical_relevance'):
+                st.markdown(f"   Relevance: {source['medical_relevance']}/5")
+
+
 def render_search_mode():
     """Render search and chat interface"""
     question = create_search_interface()
@@ -1288,112 +1351,68 @@ def render_search_mode():
 
         # Process question
         if st.session_state.systems and st.session_state.systems['rag']:
-            with st.spinner("ECHO is thinking..."):
-                try:
-                    response = st.session_state.systems['rag'].query(
-                        question=question,
-                        n_results=5,
-                        conversation_history=st.session_state.conversation_history
-                    )
-
-                    # Add to conversation history
-                    st.session_state.conversation_history.append({
-                        'question': question,
-                        'answer': response,
-                        'timestamp': datetime.now().isoformat(),
-                        'topic': 'General'  # Could be enhanced with topic detection
-                    })
-
-                    # Display response
-                    st.markdown('<div class="chat-message">', unsafe_allow_html=True)
-                    st.markdown(f"**Question:** {question}")
-
-                    # Format the response properly
-                    if isinstance(response, dict):
-                        # Extract the answer text
-                        answer = response.get('answer', 'No answer provided')
-                        st.markdown(f"**ECHO:** {answer}")
-
-                        # Show sources if available
-                        sources = response.get('sources', [])
-                        if sources:
-                            with st.expander("📚 Sources", expanded=False):
-                                for i, source in enumerate(sources[:5], 1):  # Show top 5 sources
-                                    if source.get('type') == 'flashcard':
-                                        # Display flashcard source with link
-                                        st.markdown(f"**{i}. 🃏 {source.get('title', 'Flashcard')}**")
-                                        st.markdown(f"   Content: {source.get('content', '')}")
-
-                                        # Tags display
-                                        tags = source.get('tags', [])
-                                        if tags:
-                                            tags_str = ', '.join(tags[:3])  # Show first 3 tags
-                                            st.markdown(f"   Tags: {tags_str}")
-
-                                        # Button to jump to flashcard mode
-                                        if st.button(f"🎯 Study this flashcard", key=f"flashcard_{i}", type="secondary"):
-                                            st.session_state.current_mode = "flashcards"
-                                            st.session_state.selected_flashcard = source.get('card_id')
-                                            st.rerun()
-                                    elif source.get('type') == 'image':
-                                        # Display image source with thumbnail
-                                        st.markdown(f"**{i}. 🖼️ {source.get('title', 'Medical Image')}**")
-
-                                        # Display image thumbnail if file exists
-                                        image_path = source.get('file_path', '')
-                                        if image_path and os.path.exists(image_path):
-                                            try:
-                                                col1, col2 = st.columns([1, 3])
-                                                with col1:
-                                                    st.image(image_path, width=100)
-                                                with col2:
-                                                    st.markdown(f"   Modality: **{source.get('modality', 'Unknown')}**")
-                                                    st.markdown(f"   Body Part: **{source.get('body_part', 'Unknown')}**")
-
-                                                    # Tags display
-                                                    tags = source.get('tags', [])
-                                                    if tags:
-                                                        tags_str = ', '.join(tags[:3])  # Show first 3 tags
-                                                        st.markdown(f"   Tags: {tags_str}")
-                                            except Exception as e:
-                                                st.markdown(f"   Image: {os.path.basename(image_path)} (preview unavailable)")
-                                                st.markdown(f"   Modality: **{source.get('modality', 'Unknown')}**")
-                                                st.markdown(f"   Body Part: **{source.get('body_part', 'Unknown')}**")
-                                        else:
-                                            st.markdown(f"   Image: {source.get('file_path', 'Unknown')}")
-                                            st.markdown(f"   Modality: **{source.get('modality', 'Unknown')}**")
-                                    else:
-                                        # Regular document source
-                                        st.markdown(f"**{i}.** {source.get('filename', 'Unknown source')}")
-                                        if source.get('section'):
-                                            st.markdown(f"   Section: {source['section']}")
-                                        if source.get('medical_relevance'):
-                                            st.markdown(f"   Relevance: {source['medical_relevance']}/5")
-                    else:
-                        # Fallback for string responses
-                        st.markdown(f"**ECHO:** {response}")
-
-                    st.markdown('</div>', unsafe_allow_html=True)
+            rag = st.session_state.systems['rag']
+            try:
+                st.markdown('<div class="chat-message">', unsafe_allow_html=True)
+                st.markdown(f"**Question:** {question}")
+                answer_placeholder = st.empty()
+                sources_container = st.container()
+
+                # Sources and retrieval info arrive before generation starts
+                events = rag.query_stream(
+                    question=question,
+                    n_results=5,
+                    conversation_history=st.session_state.conversation_history
+                )
+                with st.spinner("ECHO is searching your materials..."):
+                    meta = next(events)
+
+                sources = meta.get('sources', [])
+                if sources:
+                    with sources_container:
+                        with st.expander("📚 Sources", expanded=False):
+                            render_response_sources(sources)
+
+                # Render the answer as tokens arrive
+                response = None
+                answer_parts = []
+                for event in events:
+                    if event['type'] == 'token':
+                        answer_parts.append(event['content'])
+                        answer_placeholder.markdown(f"**ECHO:** {''.join(answer_parts)}▌")
+                    elif event['type'] == 'done':
+                        response = event['response']
+
+                answer = response.get('answer', 'No answer provided') if response else ''.join(answer_parts)
+                answer_placeholder.markdown(f"**ECHO:** {answer}")
+                first_token_ms = (response or {}).get('retrieval_info', {}).get('time_to_first_token_ms')
+                if first_token_ms is not None:
+                    st.caption(f"⚡ First token in {first_token_ms / 1000:.1f}s")
+
+                st.markdown('</div>', unsafe_allow_html=True)
+
+                # Add to conversation history
+                st.session_state.conversation_history.append({
+                    'question': question,
+                    'answer': response,
+                    'timestamp': datetime.now().isoformat(),
+                    'topic': 'General'  # Could be enhanced with topic detection
+                })
 
-                    # Audio playback option
-                    if st.session_state.get('audio_enabled', False):
-                        if st.button("🔊 Play Response", type="secondary"):
-                            try:
-                                # Extract text for audio
-                                audio_text = response
-                                if isinstance(response, dict):
-                                    audio_text = response.get('answer', str(response))
-
-                                audio_file = st.session_state.systems['audio'].generate_audio_file(
-                                    audio_text, "response_audio.mp3"
-                                )
-                                if audio_file:
-                                    st.audio(audio_file)
-                            except Exception as e:
-                                st.error(f"Audio generation failed: {e}")
+                # Audio playback option
+                if st.session_state.get('audio_enabled', False):
+                    if st.button("🔊 Play Response", type="secondary"):
+                        try:
+                            audio_file = st.session_state.systems['audio'].generate_audio_file(
+                                answer, "response_audio.mp3"
+                            )
+                            if audio_file:
+                                st.audio(audio_file)
+                        except Exception as e:
+                            st.error(f"Audio generation failed: {e}")
 
-                except Exception as e:
-                    st.error(f"Error processing question: {e}")
+            except Exception as e:
+                st.error(f"Error processing question: {e}")
 
     # Show conversation history
     if st.session_state.conversation_history:
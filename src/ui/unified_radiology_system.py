@@ -26,6 +26,7 @@ from study.performance_tracker import PerformanceTracker
 from study.spaced_repetition import SpacedRepetitionSystem
 from multimedia.video_manager import VideoManager
 from multimedia.audio_narrator import AudioNarrator
+from embeddings.model_registry import get_model_registry
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -101,7 +102,8 @@ def initialize_systems():
             'performance': performance_tracker,
             'spaced_repetition': spaced_repetition,
             'video': video_manager,
-            'audio': audio_narrator
+            'audio': audio_narrator,
+            'models': get_model_registry()
         }
     except Exception as e:
         st.error(f"Error initializing systems: {e}")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test the semantic answer cache used by RadiologyRAGSystem.query
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from retrieval.answer_cache import SemanticAnswerCache, bump_corpus_version, history_cache_key
+
+
+def make_cache(tmp_dir, **kwargs):
+    return SemanticAnswerCache(
+        cache_dir=str(Path(tmp_dir) / "cache"),
+        corpus_version_file=str(Path(tmp_dir) / "corpus_version.json"),
+        **kwargs
+    )
+
+
+def test_near_duplicate_hit_and_miss():
+    """Queries within the cosine threshold hit, others miss"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = make_cache(tmp_dir, similarity_threshold=0.95)
+        cache.store("What is VHL?", [1.0, 0.0, 0.0], {'answer': 'VHL answer', 'success': True})
+
+        hit = cache.lookup([0.99, 0.05, 0.0])
+        assert hit is not None
+        response, similarity, cached_question = hit
+        assert response['answer'] == 'VHL answer'
+        assert similarity > 0.95
+        assert cached_question == "What is VHL?"
+
+        assert cache.lookup([0.0, 1.0, 0.0]) is None
+        assert cache.get_stats()['hits'] == 1
+        assert cache.get_stats()['misses'] == 1
+
+
+def test_context_key_separates_conversations():
+    """The same question only hits entries stored under the same conversation context"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = make_cache(tmp_dir)
+        chest = history_cache_key([{'question': "Pneumothorax signs?", 'answer': "Deep sulcus"}], turns=3)
+        cache.store("What about in children?", [1.0, 0.0], {'answer': 'pediatric chest'}, context_key=chest)
+
+        assert cache.lookup([1.0, 0.0], context_key=chest)[0]['answer'] == 'pediatric chest'
+        assert cache.lookup([1.0, 0.0]) is None
+        assert cache.lookup([1.0, 0.0], context_key=history_cache_key(
+            [{'question': "Subdural signs?", 'answer': "Crescent"}], turns=3)) is None
+        assert history_cache_key([{'question': "q", 'answer': "a"}], turns=0) == ""
+
+
+def test_persistence_and_corpus_invalidation():
+    """Entries survive a restart and are dropped once the corpus changes"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = make_cache(tmp_dir)
+        cache.store("HIDA scan", [0.0, 1.0], {'answer': 'cholecystitis'})
+
+        reloaded = make_cache(tmp_dir)
+        assert reloaded.lookup([0.0, 1.0])[0]['answer'] == 'cholecystitis'
+
+        bump_corpus_version(str(Path(tmp_dir) / "corpus_version.json"))
+        assert reloaded.lookup([0.0, 1.0]) is None
+        assert make_cache(tmp_dir).lookup([0.0, 1.0]) is None
+
+
+def test_lru_and_ttl_eviction():
+    """Capacity evicts least recently used entries; old entries expire"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = make_cache(tmp_dir, max_entries=2)
+        cache.store("a", [1.0, 0.0, 0.0], {'answer': 'a'})
+        cache.store("b", [0.0, 1.0, 0.0], {'answer': 'b'})
+        cache.lookup([1.0, 0.0, 0.0])  # 'a' becomes most recently used
+        cache.store("c", [0.0, 0.0, 1.0], {'answer': 'c'})
+
+        assert cache.lookup([0.0, 1.0, 0.0]) is None
+        assert cache.lookup([1.0, 0.0, 0.0])[0]['answer'] == 'a'
+
+        cache.ttl_seconds = 0.01
+        time.sleep(0.02)
+        assert cache.lookup(np.array([1.0, 0.0, 0.0])) is None
+
+
+if __name__ == "__main__":
+    test_near_duplicate_hit_and_miss()
+    test_context_key_separates_conversations()
+    test_persistence_and_corpus_invalidation()
+    test_lru_and_ttl_eviction()
+    print("Answer cache tests passed!")
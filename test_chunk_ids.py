@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test deterministic chunk IDs
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from embeddings.chunk_ids import make_chunk_id, dedupe_by_id
+from embeddings.medical_parameter_optimizer import MedicalParameterOptimizer
+from document_processor.ingestion_pipeline import assign_chunk_ids
+
+
+def test_ids_are_stable_and_location_aware():
+    """Same chunk -> same ID; different page, text or file -> different ID"""
+    metadata = {'source': "data/raw/chest.pdf", 'section': "Findings", 'chunk_id': "Findings_0"}
+    chunk_id = make_chunk_id("Air bronchograms indicate consolidation.", metadata)
+
+    assert chunk_id == make_chunk_id("Air  bronchograms indicate consolidation. ", dict(metadata))
+    assert chunk_id == make_chunk_id("Air bronchograms indicate consolidation.",
+                                     {**metadata, 'source': os.path.abspath("data/raw/chest.pdf")})
+    assert chunk_id != make_chunk_id("Air bronchograms indicate pneumonia.", metadata)
+    assert chunk_id != make_chunk_id("Air bronchograms indicate consolidation.", {**metadata, 'chunk_id': "Findings_1"})
+    assert chunk_id != make_chunk_id("Air bronchograms indicate consolidation.", {**metadata, 'source': "abdomen.pdf"})
+    assert chunk_id != make_chunk_id("Air bronchograms indicate consolidation.", metadata, kind="image")
+
+
+def test_images_on_one_slide_get_distinct_ids():
+    """Two images with the same caption on the same slide (as PPTProcessor emits them) both survive dedupe"""
+    chunks = [
+        {'text': "Image from slide 3: Pneumothorax", 'image_data': "aGVsbG8=",
+         'metadata': {'source': "data/raw/chest.pptx", 'slide_number': 3, 'image_index': index, 'chunk_type': 'image'}}
+        for index in range(2)
+    ]
+    ids = assign_chunk_ids(chunks)
+
+    assert ids[0] != ids[1]
+    assert all(chunk_id.startswith("image-") for chunk_id in ids)
+    assert dedupe_by_id(ids, chunks)[0] == ids
+
+
+def test_optimizer_keeps_recorded_ids_and_image_data():
+    """IDs the manifest records at parse time are the ones the embedding system upserts"""
+    chunks = [
+        {'text': "Slide 3: Pneumothorax\nDeep sulcus sign on supine film",
+         'metadata': {'source': "data/raw/chest.pptx", 'slide_number': 3, 'chunk_type': 'slide'}},
+        {'text': "Image from slide 3: Pneumothorax", 'image_data': "aGVsbG8=",
+         'metadata': {'source': "data/raw/chest.pptx", 'slide_number': 3, 'image_index': 0, 'chunk_type': 'image'}}
+    ]
+    recorded = assign_chunk_ids(chunks)
+
+    optimized = MedicalParameterOptimizer().optimize_chunk_metadata(chunks)
+    image_chunk = next(chunk for chunk in optimized if chunk['metadata']['chunk_type'] == 'image')
+
+    assert sorted(chunk['id'] for chunk in optimized) == sorted(recorded)
+    assert image_chunk['image_data'] == "aGVsbG8="
+    assert image_chunk['id'] == make_chunk_id(image_chunk['text'], image_chunk['metadata'], kind="image")
+
+
+def test_dedupe_by_id_keeps_first():
+    ids, texts = dedupe_by_id(['a', 'b', 'a'], ["first", "second", "repeat"])
+    assert ids == ['a', 'b']
+    assert texts == ["first", "second"]
+
+
+if __name__ == "__main__":
+    test_ids_are_stable_and_location_aware()
+    test_images_on_one_slide_get_distinct_ids()
+    test_optimizer_keeps_recorded_ids_and_image_data()
+    test_dedupe_by_id_keeps_first()
+    print("Chunk ID tests passed!")
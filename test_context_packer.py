@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test token-budgeted context packing
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from llm.context_packer import ContextPacker, estimate_tokens
+
+
+def test_overlapping_sentences_are_removed():
+    """Sentences repeated by chunk overlap appear once, in the earlier chunk"""
+    chunks = [
+        {'text': "A visceral pleural line indicates pneumothorax. No lung markings are seen beyond it. "
+                 "Pneumothorax shows a visceral pleural line.", 'distance': 0.2},
+        {'text': "Pneumothorax shows a visceral pleural line. No lung markings are seen beyond it. "
+                 "The deep sulcus sign suggests pneumothorax on supine films.", 'distance': 0.4}
+    ]
+    packed, stats = ContextPacker(max_tokens=1000).pack(chunks)
+
+    assert packed[0]['distance'] == 0.2
+    assert "deep sulcus" in packed[1]['text']
+    assert "No lung markings" not in packed[1]['text']
+    assert stats['duplicate_sentences_removed'] == 2
+    assert stats['tokens_saved'] > 0
+
+
+def test_budget_is_respected():
+    """Packed context stays within budget, keeping the leading chunks"""
+    chunks = [{'text': f"Finding number {i} is described here in some detail. " * 10,
+               'rerank_score': i / 10} for i in reversed(range(6))]
+    packed, stats = ContextPacker(max_tokens=300, duplicate_threshold=1.01).pack(chunks)
+
+    assert sum(estimate_tokens(chunk['text']) for chunk in packed) <= 300
+    assert stats['tokens_after'] <= 300
+    assert packed[0]['rerank_score'] == 0.5
+    assert stats['chunks_dropped'] > 0
+    assert stats['tokens_saved'] == stats['tokens_before'] - stats['tokens_after']
+
+
+def test_retrieval_order_is_kept_across_sources():
+    """Flashcards with distance 0 don't jump ahead of the documents retrieved before them"""
+    chunks = [
+        {'text': "Deep sulcus sign of pneumothorax on a supine radiograph. " * 6,
+         'distance': 0.35, 'source_type': 'document'},
+        {'text': "Q: Sign of pneumothorax on supine film? A: Deep sulcus.",
+         'distance': 0, 'source_type': 'flashcard'}
+    ]
+    packed, stats = ContextPacker(max_tokens=100).pack(chunks)
+
+    assert [chunk['source_type'] for chunk in packed] == ['document']
+    assert stats['chunks_dropped'] == 1
+
+
+if __name__ == "__main__":
+    test_overlapping_sentences_are_removed()
+    test_budget_is_respected()
+    test_retrieval_order_is_kept_across_sources()
+    print("Context packer tests passed!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed on-disk embedding cache
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from embeddings.embedding_cache import EmbeddingCache
+
+
+class CountingModel:
+    """Stand-in encoder that records how many texts it embedded"""
+
+    def __init__(self, dimension=8):
+        self.dimension = dimension
+        self.encoded = []
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        self.encoded.extend(texts)
+        return np.array([[len(text) + i for i in range(self.dimension)] for text in texts], dtype=np.float32)
+
+
+def test_unchanged_text_is_not_reencoded():
+    """A second ingest of the same text, even in a new process, reads vectors from disk"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        model = CountingModel()
+        first = EmbeddingCache(temp_dir).encode(model, "radbert", ["pleural effusion", "pneumothorax"])
+
+        reopened = EmbeddingCache(temp_dir)
+        second = reopened.encode(model, "radbert", ["pneumothorax", "pleural  effusion", "atelectasis"])
+
+        assert sorted(model.encoded) == ["atelectasis", "pleural effusion", "pneumothorax"]
+        assert np.array_equal(second[0], first[1])
+        assert np.array_equal(second[1], first[0])
+        assert reopened.get_stats()['hits'] == 2
+        assert reopened.get_stats()['misses'] == 1
+
+
+def test_model_name_is_part_of_the_key():
+    """Vectors from one model are never served for another"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = EmbeddingCache(temp_dir)
+        model = CountingModel()
+        cache.encode(model, "radbert", ["hemangioblastoma"])
+        cache.encode(model, "minilm", ["hemangioblastoma"])
+
+        assert len(model.encoded) == 2
+
+
+def test_size_based_eviction():
+    """The cache stays near max_bytes by dropping least recently used vectors"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = EmbeddingCache(temp_dir, max_bytes=256 * 1024)
+        model = CountingModel(dimension=256)
+        for batch in range(20):
+            cache.encode(model, "radbert", [f"finding {batch}-{i}" for i in range(50)])
+
+        stats = cache.get_stats()
+        assert stats['entries'] < 1000
+        assert stats['size_mb'] <= 0.3
+
+
+if __name__ == "__main__":
+    test_unchanged_text_is_not_reencoded()
+    test_model_name_is_part_of_the_key()
+    test_size_based_eviction()
+    print("Embedding cache tests passed!")
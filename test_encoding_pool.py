@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test the multi-process encoding pool
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from embeddings.encoding_pool import EncodingPool, available_cores, core_sets, pin_to_cores
+
+
+class LengthModel:
+    """Stand-in encoder whose embedding is the text length"""
+
+    max_seq_length = 512
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, convert_to_numpy=True):
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+def load_length_model(model_name, local_path, threads):
+    """Module-level loader, so spawned workers can import it"""
+    return LengthModel()
+
+
+def test_core_sets_are_disjoint():
+    """Workers get contiguous, non-overlapping cores until the cores run out"""
+    assert core_sets(3, 2, cores=[0, 1, 2, 3, 4, 5, 6, 7]) == [[0, 1], [2, 3], [4, 5]]
+    assert core_sets(3, 2, cores=[0, 1, 2, 3]) == [[0, 1], [2, 3], [0, 1]]
+    assert all(len(cores) == 1 for cores in core_sets(4, 1))
+
+
+def test_pinning_to_available_cores():
+    assert pin_to_cores(available_cores())
+
+
+def test_broken_pool_falls_back_to_in_process():
+    """Workers that cannot load their model fail the pool, and encoding carries on in-process"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        texts = ["ct", "x" * 900, "mri", "us"]
+        with EncodingPool(str(Path(temp_dir) / "missing-model"), workers=2, threads_per_worker=1) as pool:
+            embeddings, stats = pool.encode_by_token_budget(LengthModel(), texts, max_batch_tokens=300)
+
+            assert pool.broken
+            assert [row[0] for row in embeddings] == [len(text) for text in texts]
+            assert 'workers' not in stats
+
+
+def test_working_pool_returns_rows_in_input_order():
+    """Batches encoded on the workers are reassembled in input order"""
+    texts = [f"finding {'x' * (number * 37 % 400)}" for number in range(40)]
+    with EncodingPool("length-model", workers=2, threads_per_worker=1, loader=load_length_model) as pool:
+        embeddings, stats = pool.encode_by_token_budget(LengthModel(), texts, max_batch_tokens=300)
+
+        assert not pool.broken
+        assert stats['workers'] == 2
+        assert stats['batches'] > 2
+        assert [row[0] for row in embeddings] == [len(text) for text in texts]
+
+
+def test_free_cores_exclude_pinned_workers():
+    """Cores left for parsers are the ones no encoder worker is pinned to"""
+    cores = available_cores()
+    with EncodingPool("length-model", workers=1, threads_per_worker=1, loader=load_length_model) as pool:
+        assert pool.free_cores == len(cores) - 1
+
+
+if __name__ == "__main__":
+    test_core_sets_are_disjoint()
+    test_pinning_to_available_cores()
+    test_broken_pool_falls_back_to_in_process()
+    test_working_pool_returns_rows_in_input_order()
+    test_free_cores_exclude_pinned_workers()
+    print("Encoding pool tests passed!")
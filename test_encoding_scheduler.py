@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test length-aware, token-budgeted encoding batches
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from embeddings.encoding_scheduler import encode_by_token_budget, plan_batches
+
+
+class LengthModel:
+    """Stand-in encoder whose embedding is the text length, recording batch sizes"""
+
+    max_seq_length = 512
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, convert_to_numpy=True):
+        self.batches.append(list(texts))
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_batches_respect_token_budget():
+    """Padded batch size (longest x count) never exceeds the budget"""
+    lengths = [10, 500, 12, 480, 11, 9, 300]
+    batches = plan_batches(lengths, max_batch_tokens=1000, max_batch_size=64)
+
+    for batch in batches:
+        assert max(lengths[p] for p in batch) * len(batch) <= 1000
+    assert sorted(p for batch in batches for p in batch) == list(range(len(lengths)))
+    assert set(batches[0]) == {0, 2, 4, 5}
+
+
+def test_original_order_is_restored():
+    """Short and long texts are batched apart but come back in input order"""
+    texts = ["ct", "x" * 1600, "mri", "y" * 1200, "us"]
+    model = LengthModel()
+    embeddings, stats = encode_by_token_budget(model, texts, max_batch_tokens=500)
+
+    assert [row[0] for row in embeddings] == [len(text) for text in texts]
+    assert any(set(batch) == {"ct", "mri", "us"} for batch in model.batches)
+    assert stats['tokens'] > 0
+    assert stats['batches'] == len(model.batches)
+
+
+if __name__ == "__main__":
+    test_batches_respect_token_budget()
+    test_original_order_is_restored()
+    print("Encoding scheduler tests passed!")
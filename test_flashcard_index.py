@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test the shared BM25 flashcard search index
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from study.flashcard_system import FlashCard, FlashcardManager
+from study.flashcard_index import FlashcardSearchIndex, get_flashcard_index, tokenize
+
+
+def make_card(card_id, front, back, tags=None):
+    return FlashCard(
+        card_id=card_id,
+        deck_name="Test Deck",
+        front=front,
+        back=back,
+        tags=tags or [],
+        created="2024-01-01T00:00:00",
+        modified="2024-01-01T00:00:00"
+    )
+
+
+def test_tokenize_keeps_radiology_terms():
+    """Hyphenated and slashed terms stay whole, stopwords and HTML are dropped"""
+    assert tokenize("What is <b>BI-RADS</b> 4 on the V/Q scan?") == ['bi-rads', '4', 'v/q', 'scan']
+
+
+def test_bm25_ranking():
+    """Cards matching rarer query terms rank above common-term matches"""
+    index = FlashcardSearchIndex()
+    index.build({
+        '1': make_card('1', "Imaging findings of VHL syndrome", "Hemangioblastomas, renal cell carcinoma"),
+        '2': make_card('2', "Common imaging findings", "Findings vary by modality"),
+        '3': make_card('3', "Pneumothorax on chest x-ray", "Visceral pleural line"),
+    })
+
+    results = index.search("VHL imaging findings", n_results=3)
+    assert [r['card_id'] for r in results][:2] == ['1', '2']
+    assert results[0]['relevance_score'] > results[1]['relevance_score']
+    assert index.search("the what", n_results=3) == []
+
+
+def test_incremental_updates():
+    """Added and removed cards are reflected without a rebuild"""
+    index = FlashcardSearchIndex()
+    index.build({'1': make_card('1', "Pneumothorax", "Pleural line")})
+
+    index.add_cards([make_card('2', "Intussusception", "Target sign", ['pediatric'])])
+    assert index.search("pediatric target", n_results=1)[0]['card_id'] == '2'
+
+    index.remove_cards(['2'])
+    assert index.search("intussusception", n_results=1) == []
+    assert len(index) == 1
+    assert index.total_length == index.doc_lengths['1']
+
+
+def test_shared_index_tracks_manager_saves():
+    """The shared index picks up cards saved through FlashcardManager"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = FlashcardManager(data_dir)
+        manager.cards['1'] = make_card('1', "Pneumothorax", "Pleural line")
+        manager._save_cards(added_cards=[manager.cards['1']])
+
+        index = get_flashcard_index(data_dir)
+        assert index is get_flashcard_index(data_dir)
+        assert len(index) == 1
+
+        new_card = make_card('2', "HIDA scan", "Acute cholecystitis")
+        manager.cards['2'] = new_card
+        manager._save_cards(added_cards=[new_card])
+
+        assert get_flashcard_index(data_dir) is index
+        assert index.search("hida", n_results=1)[0]['card_id'] == '2'
+
+
+if __name__ == "__main__":
+    test_tokenize_keeps_radiology_terms()
+    test_bm25_ranking()
+    test_incremental_updates()
+    test_shared_index_tracks_manager_saves()
+    print("Flashcard index tests passed!")
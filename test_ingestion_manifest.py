@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test the incremental ingestion manifest
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from document_processor.ingestion_manifest import IngestionManifest, hash_file
+from retrieval.rag_system import RadiologyRAGSystem
+
+
+def test_change_detection():
+    """New files need processing; unchanged and touched-but-identical files don't; edits do"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "notes.txt"
+        path.write_text("pulmonary embolism on CT angiography", encoding='utf-8')
+        manifest = IngestionManifest(str(Path(temp_dir) / "manifest.json"), legacy_file=None)
+
+        assert manifest.check(str(path)) == (True, "new")
+
+        manifest.record(str(path), 'indexed', ['a', 'b'])
+        manifest.save()
+        assert manifest.check(str(path)) == (False, "unchanged")
+
+        # Touching the file changes its mtime but not its contents
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+        assert manifest.check(str(path)) == (False, "unchanged (content)")
+        assert manifest.check(str(path)) == (False, "unchanged")
+
+        # Same size, different bytes
+        path.write_text("pulmonary embolism on MR angiography", encoding='utf-8')
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 9_000_000_000))
+        assert manifest.check(str(path)) == (True, "modified")
+
+        # Reloading from disk keeps the records
+        reloaded = IngestionManifest(str(Path(temp_dir) / "manifest.json"), legacy_file=None)
+        assert reloaded.chunk_ids(str(path)) == ['a', 'b']
+        assert reloaded.forget(str(path)) == ['a', 'b']
+        assert reloaded.check(str(path)) == (True, "new")
+
+
+def test_failed_documents_are_retried():
+    """A recorded failure never counts as processed"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "broken.pdf"
+        path.write_bytes(b"not really a pdf")
+        manifest = IngestionManifest(str(Path(temp_dir) / "manifest.json"), legacy_file=None)
+
+        manifest.record(str(path), 'failed', error="parse error")
+        assert manifest.check(str(path)) == (True, "previously failed")
+        assert manifest.get_stats()['failed'] == 1
+
+
+def test_legacy_tracker_files_are_imported():
+    """Both processed_documents.json schemes carry over without reprocessing"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        hashed = Path(temp_dir) / "hashed.txt"
+        hashed.write_text("hydronephrosis grading", encoding='utf-8')
+        stamped = Path(temp_dir) / "stamped.txt"
+        stamped.write_text("renal calculi", encoding='utf-8')
+
+        legacy_file = Path(temp_dir) / "processed_documents.json"
+        legacy_file.write_text(json.dumps({
+            str(hashed.resolve()): {'hash': hash_file(str(hashed)), 'result': {'success': True},
+                                    'file_size': hashed.stat().st_size},
+            f"{stamped}:{os.path.getmtime(stamped)}": {'processed_date': 0,
+                                                       'file_size': stamped.stat().st_size}
+        }), encoding='utf-8')
+
+        manifest = IngestionManifest(str(Path(temp_dir) / "manifest.json"), legacy_file=str(legacy_file))
+
+        assert len(manifest) == 2
+        assert manifest.check(str(hashed)) == (False, "unchanged (content)")
+        assert manifest.check(str(stamped)) == (False, "unchanged")
+        assert (Path(temp_dir) / "manifest.json").exists()
+
+
+class RecordingEmbeddingSystem:
+    """Stand-in vector store that records each write batch"""
+
+    def __init__(self):
+        self.batches = []
+
+    def add_text_chunks(self, chunks):
+        self.batches.append(chunks)
+
+
+def test_unchanged_rescan_keeps_answer_cache():
+    """Only a run that indexes or removes chunks counts as a corpus change"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "notes.txt"
+        path.write_text("pulmonary embolism on CT angiography", encoding='utf-8')
+
+        rag = RadiologyRAGSystem(enable_answer_cache=False, rerank=False)
+        rag.embedding_system = RecordingEmbeddingSystem()
+        rag.ingestion_manifest = IngestionManifest(str(Path(temp_dir) / "manifest.json"), legacy_file=None)
+        changes = []
+        rag._mark_corpus_changed = lambda: changes.append(True)
+
+        assert rag.process_documents([str(path)], max_workers=1)['processed'] == 1
+        assert len(changes) == 1
+
+        result = rag.process_documents([str(path)], max_workers=1)
+        assert result['skipped'] == 1
+        assert len(changes) == 1
+
+
+if __name__ == "__main__":
+    test_change_detection()
+    test_failed_documents_are_retried()
+    test_legacy_tracker_files_are_imported()
+    test_unchanged_rescan_keeps_answer_cache()
+    print("Ingestion manifest tests passed!")
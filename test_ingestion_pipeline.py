@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test the pipelined document ingestion engine
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from document_processor.ingestion_pipeline import IngestionPipeline
+
+
+class RecordingEmbeddingSystem:
+    """Stand-in vector store that records each write batch"""
+
+    def __init__(self, fail_on: str = None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    def add_text_chunks(self, chunks):
+        if self.fail_on and any(self.fail_on in chunk['text'] for chunk in chunks):
+            raise RuntimeError("disk full")
+        self.batches.append(chunks)
+
+
+def write_notes(directory: Path, count: int):
+    paths = []
+    for number in range(count):
+        path = directory / f"notes_{number}.txt"
+        path.write_text(f"study notes number {number} on chest radiographs", encoding='utf-8')
+        paths.append(str(path))
+    return paths
+
+
+def test_documents_are_parsed_in_parallel_and_written_in_batches():
+    """Every file is indexed, writes are batched, and bad files fail individually"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = write_notes(Path(temp_dir), 6)
+        paths.append(str(Path(temp_dir) / "missing.txt"))
+        paths.append(str(Path(temp_dir) / "slides.key"))
+
+        store = RecordingEmbeddingSystem()
+        pipeline = IngestionPipeline(store, max_workers=2, queue_size=2, write_batch_chunks=2)
+        result = pipeline.run(paths)
+
+        assert result['processed'] == 6
+        assert result['total_chunks'] == 6
+        assert len(store.batches) == 3
+        assert result['documents'][paths[6]]['status'] == 'failed'
+        assert result['documents'][paths[7]]['status'] == 'skipped'
+
+
+def test_write_failure_is_reported_per_document():
+    """A failed vector store write fails only the documents in that batch"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = write_notes(Path(temp_dir), 4)
+
+        store = RecordingEmbeddingSystem(fail_on="number 2")
+        pipeline = IngestionPipeline(store, max_workers=1, write_batch_chunks=1,
+                                     chunk_transform=lambda chunks: chunks)
+        result = pipeline.run(paths)
+
+        assert result['processed'] == 3
+        assert result['documents'][paths[2]]['status'] == 'failed'
+        assert "disk full" in result['documents'][paths[2]]['error']
+
+
+def test_documents_without_chunks_are_indexed():
+    """A document whose chunks are all filtered out is indexed, even with no batch after it"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = write_notes(Path(temp_dir), 3)
+
+        store = RecordingEmbeddingSystem()
+        pipeline = IngestionPipeline(store, max_workers=1, write_batch_chunks=1,
+                                     chunk_transform=lambda chunks: [chunk for chunk in chunks
+                                                                     if "number 2" not in chunk['text']])
+        result = pipeline.run(paths)
+
+        assert result['processed'] == 3
+        assert result['documents'][paths[2]] == {'status': 'indexed', 'chunks': 0, 'chunk_ids': [], 'error': None}
+        assert len(store.batches) == 2
+
+
+class StubEncodingPool:
+    def __init__(self, free_cores, broken=False):
+        self.free_cores = free_cores
+        self.broken = broken
+
+
+def test_parse_workers_use_cores_the_encoding_pool_leaves_free():
+    """Parsers don't oversubscribe cores pinned to encoder workers"""
+    store = RecordingEmbeddingSystem()
+    store.encoding_pool = StubEncodingPool(free_cores=3)
+    assert IngestionPipeline(store).max_workers == 3
+
+    store.encoding_pool = StubEncodingPool(free_cores=0)
+    assert IngestionPipeline(store).max_workers == 1
+
+    store.encoding_pool = StubEncodingPool(free_cores=0, broken=True)
+    assert IngestionPipeline(store).max_workers == IngestionPipeline(RecordingEmbeddingSystem()).max_workers
+    assert IngestionPipeline(store, max_workers=5).max_workers == 5
+
+
+if __name__ == "__main__":
+    test_documents_are_parsed_in_parallel_and_written_in_batches()
+    test_write_failure_is_reported_per_document()
+    test_documents_without_chunks_are_indexed()
+    test_parse_workers_use_cores_the_encoding_pool_leaves_free()
+    print("Ingestion pipeline tests passed!")
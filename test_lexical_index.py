@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test the segmented BM25 lexical index and reciprocal-rank fusion
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from embeddings.lexical_index import LexicalIndex, reciprocal_rank_fusion, fuse_dense_and_lexical
+
+
+def test_exact_terms_rank_first():
+    """Rare exact tokens like 'bi-rads' and 'kvp' find the documents containing them"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = LexicalIndex(temp_dir)
+        index.add(['a', 'b', 'c'], [
+            "BI-RADS 4 lesions warrant biopsy",
+            "Breast imaging overview and screening",
+            "Increasing kVp reduces subject contrast"
+        ], "radiology_texts")
+        index.flush()
+
+        assert index.search("BI-RADS 4")[0]['id'] == 'a'
+        assert index.search("effect of kVp")[0]['id'] == 'c'
+        assert index.search("kVp")[0]['collection'] == "radiology_texts"
+        assert index.search("nothing matches") == []
+
+
+def test_segments_supersede_and_delete():
+    """Later segments replace earlier copies; deletions survive compaction and reopen"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = LexicalIndex(temp_dir)
+        index.add(['a', 'b'], ["pneumothorax deep sulcus sign", "pleural effusion meniscus"])
+        index.flush()
+        index.add(['a'], ["tension pneumothorax mediastinal shift"])
+        index.delete(['b'])
+        index.flush()
+
+        assert len(index) == 1
+        assert index.search("deep sulcus") == []
+        assert index.search("mediastinal shift")[0]['id'] == 'a'
+
+        index.compact()
+        reopened = LexicalIndex(temp_dir)
+        assert len(reopened.segments) == 1
+        assert len(reopened) == 1
+        assert reopened.search("tension pneumothorax")[0]['id'] == 'a'
+        assert reopened.search("meniscus") == []
+
+
+def test_compacting_twice_is_a_no_op():
+    """A compacted index carries no tombstones, so compacting again writes nothing"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = LexicalIndex(temp_dir)
+        index.add(['d1', 'd2'], ["renal calculi", "hydronephrosis grading"])
+        index.flush()
+        index.delete(['d1'])
+        index.flush()
+
+        index.compact()
+        compacted = index.segments[0].name
+        assert index.segments[0].deleted == []
+
+        index.compact()
+        assert [segment.name for segment in index.segments] == [compacted]
+
+
+def test_auto_compaction():
+    """Flushing past max_segments merges segments without losing documents"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = LexicalIndex(temp_dir, max_segments=3)
+        for number in range(5):
+            index.add([f"doc{number}"], [f"finding number{number} on ct"])
+            index.flush()
+
+        assert len(index.segments) <= 3
+        assert len(index) == 5
+        assert index.search("number4")[0]['id'] == 'doc4'
+
+
+def test_tiered_merge_leaves_large_segments_alone():
+    """Small recent segments merge among themselves; tombstones in them still apply to older docs"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = LexicalIndex(temp_dir, max_segments=3, merge_factor=2)
+        index.add([f"base{number}" for number in range(50)],
+                  [f"baseline report {number}" for number in range(50)])
+        index.flush()
+        base_segment = index.segments[0].name
+
+        index.delete(['base7'])
+        index.flush()
+        for number in range(6):
+            index.add([f"doc{number}"], [f"finding number{number} on ct"])
+            index.flush()
+
+        assert len(index.segments) <= 3
+        assert index.segments[0].name == base_segment
+        assert len(index) == 55
+        assert 'base7' not in index.live_docs
+        assert index.search("number5")[0]['id'] == 'doc5'
+
+        reopened = LexicalIndex(temp_dir)
+        assert len(reopened) == 55
+        assert 'base7' not in reopened.live_docs
+
+
+def test_merge_after_first_segment_keeps_tombstones():
+    """Tombstones in a merged run still hide deleted docs in the segments before it"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = LexicalIndex(temp_dir, max_segments=2, merge_factor=2)
+        index.add([f"big{number}" for number in range(10)], [f"baseline report {number}" for number in range(10)])
+        index.flush()
+        index.add(['x'], ["xanthogranulomatous"])
+        index.delete(['big1'])
+        index.flush()
+        index.add(['y'], ["yolk"])
+        index.flush()
+
+        assert len(index.segments) == 2
+        assert 'big1' not in index.live_docs
+        assert all(hit['id'] != 'big1' for hit in index.search("baseline report 1"))
+        assert len(LexicalIndex(temp_dir)) == 11
+
+
+def test_reciprocal_rank_fusion():
+    """Documents ranked well by both lists beat documents ranked well by one"""
+    fused = reciprocal_rank_fusion([['x', 'y', 'z'], ['y', 'w']], k=60)
+    assert fused[0][0] == 'y'
+    assert {doc_id for doc_id, _ in fused} == {'x', 'y', 'z', 'w'}
+
+
+def test_fuse_fetches_lexical_only_hits():
+    """Lexical-only hits are fetched and given the worst dense distance"""
+    dense = {
+        'ids': [['d1', 'd2']],
+        'documents': [['dense one', 'dense two']],
+        'metadatas': [[{}, {}]],
+        'distances': [[0.2, 0.6]]
+    }
+    lexical = [{'id': 'l1', 'score': 5.0, 'collection': 'radiology_texts'},
+               {'id': 'd2', 'score': 3.0, 'collection': 'radiology_texts'}]
+
+    def fetch_records(collection_name, ids):
+        assert collection_name == 'radiology_texts'
+        return {doc_id: (f"fetched {doc_id}", {'source': 'x'}) for doc_id in ids}
+
+    results = fuse_dense_and_lexical(dense, lexical, 3, fetch_records)
+
+    assert results['ids'][0][0] == 'd2'
+    assert set(results['ids'][0]) == {'d1', 'd2', 'l1'}
+    position = results['ids'][0].index('l1')
+    assert results['documents'][0][position] == "fetched l1"
+    assert results['distances'][0][position] == 0.6
+
+
+if __name__ == "__main__":
+    test_exact_terms_rank_first()
+    test_segments_supersede_and_delete()
+    test_compacting_twice_is_a_no_op()
+    test_auto_compaction()
+    test_tiered_merge_leaves_large_segments_alone()
+    test_merge_after_first_segment_keeps_tombstones()
+    test_reciprocal_rank_fusion()
+    test_fuse_fetches_lexical_only_hits()
+    print("Lexical index tests passed!")
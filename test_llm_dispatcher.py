@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test the bounded-concurrency LLM dispatcher
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from llm.llm_dispatcher import LLMDispatcher, chat_request
+
+
+class FakeAsyncClient:
+    """Stand-in for ollama.AsyncClient that echoes the prompt after a delay"""
+
+    def __init__(self, delay=0.05, failures=None, hang_on=None):
+        self.delay = delay
+        self.failures = dict(failures or {})  # prompt -> number of calls that raise first
+        self.hang_on = hang_on
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def chat(self, model, messages, options, format=None):
+        prompt = messages[-1]['content']
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(60 if prompt == self.hang_on else self.delay)
+            if self.failures.get(prompt):
+                self.failures[prompt] -= 1
+                raise ConnectionError("server busy")
+            return {'message': {'content': f"{model}: {prompt}"}}
+        finally:
+            self.in_flight -= 1
+
+
+def test_batch_runs_concurrently_within_the_limit():
+    """Results come back in request order; no more than max_concurrency requests are in flight"""
+    client = FakeAsyncClient(delay=0.05)
+    dispatcher = LLMDispatcher("llama3.1:8b", max_concurrency=4, client_factory=lambda: client)
+    finished = []
+
+    start = time.perf_counter()
+    results = dispatcher.chat_many([chat_request("system", f"q{i}") for i in range(12)], on_result=finished.append)
+    elapsed = time.perf_counter() - start
+
+    assert [result['content'] for result in results] == [f"llama3.1:8b: q{i}" for i in range(12)]
+    assert client.max_in_flight == 4
+    assert len(finished) == 12
+    assert elapsed < 12 * 0.05  # About three rounds of four, not twelve sequential calls
+
+
+def test_failures_are_retried_then_reported():
+    client = FakeAsyncClient(delay=0.01, failures={'flaky': 1, 'down': 5})
+    dispatcher = LLMDispatcher("m", max_concurrency=2, retries=2, retry_backoff=0.01,
+                               client_factory=lambda: client)
+
+    flaky, down = dispatcher.chat_many([chat_request("s", "flaky"), chat_request("s", "down")])
+
+    assert flaky['error'] is None and flaky['attempts'] == 2
+    assert down['content'] is None and down['attempts'] == 3
+    assert "server busy" in down['error']
+
+
+def test_timeout_and_cancellation():
+    """A hung request times out; cancel() stops the rest of a batch and keeps what finished"""
+    dispatcher = LLMDispatcher("m", max_concurrency=1, timeout=0.1, retries=0,
+                               client_factory=lambda: FakeAsyncClient(delay=0.01, hang_on='hang'))
+    hung, ok = dispatcher.chat_many([chat_request("s", "hang"), chat_request("s", "ok")])
+    assert hung['error'].startswith("timed out") and ok['error'] is None
+
+    dispatcher = LLMDispatcher("m", max_concurrency=1, client_factory=lambda: FakeAsyncClient(delay=0.2))
+    threading.Timer(0.3, dispatcher.cancel).start()
+    start = time.perf_counter()
+    results = dispatcher.chat_many([chat_request("s", f"q{i}") for i in range(10)])
+
+    assert time.perf_counter() - start < 1.0
+    assert results[0]['error'] is None
+    assert results[-1]['error'] == "cancelled"
+
+
+if __name__ == "__main__":
+    test_batch_runs_concurrently_within_the_limit()
+    test_failures_are_retried_then_reported()
+    test_timeout_and_cancellation()
+    print("LLM dispatcher tests passed!")
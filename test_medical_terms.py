@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test the single-pass medical term annotator
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from embeddings.medical_terms import MEDICAL_VOCABULARIES, TermAnnotator, get_medical_annotator
+from embeddings.medical_parameter_optimizer import MedicalParameterOptimizer
+
+
+def test_counts_match_per_keyword_scans():
+    """One pass gives the same counts as text.lower().count(term) for every term"""
+    terms = sorted({term for category_terms in MEDICAL_VOCABULARIES.values() for term in category_terms})
+    filler = ["the", "affected", "mass effect", "ct angiography", "CT", "ahead", "aaaa"]
+    vocabularies = {**MEDICAL_VOCABULARIES, 'overlapping': ['aa', 'aaa']}
+
+    for use_automaton in (True, False):
+        annotator = TermAnnotator(vocabularies, use_automaton=use_automaton)
+        random.seed(7)
+        for _ in range(200):
+            text = " ".join(random.choice(terms + filler * 4) for _ in range(random.randint(0, 120)))
+            lowered = text.lower()
+            expected = {term: lowered.count(term) for term in terms + ['aa', 'aaa'] if term in lowered}
+            assert annotator.count_terms(text) == expected
+
+
+def test_annotation_views():
+    """Category hits, totals, presence and weighted scores"""
+    annotator = TermAnnotator({
+        'findings': ['mass', 'mass effect', 'edema'],
+        'modality': ['ct', 'mri']
+    })
+    annotation = annotator.annotate("MRI shows a mass with mass effect and edema; no prior MRI.")
+
+    assert annotation.hits('findings') == {'mass': 2, 'mass effect': 1, 'edema': 1}
+    # Substring matching, like str.count: "effect" contains "ct"
+    assert annotation.hits('modality') == {'ct': 1, 'mri': 2}
+    assert annotation.count('modality') == 3
+    assert annotation.has('findings')
+    assert annotation.matched('modality') == ['ct', 'mri']
+    assert annotation.score({'findings': 2.0, 'modality': 0.5}) == 9.5
+    assert annotation.categories() == {'findings': 4, 'modality': 3}
+
+
+def test_annotate_many_keeps_order():
+    """Bulk annotation returns one annotation per text, in order, matching repeated texts once"""
+    annotator = TermAnnotator({'modality': ['ct', 'mri']}, use_automaton=False)
+    texts = ["Medical image", "CT chest", "Medical image", "MRI brain", "CT chest"]
+    annotations = annotator.annotate_many(texts)
+
+    assert [annotation.matched('modality') for annotation in annotations] == [[], ['ct'], [], ['mri'], ['ct']]
+    assert annotations[1] is annotations[4]
+    assert annotator.annotate_many([]) == []
+
+
+def test_shared_annotator_serves_every_call_site():
+    """The process-wide annotator caches by text and covers the optimizer's questions"""
+    annotator = get_medical_annotator()
+    text = "Patient presents with acute stroke; CT angiography shows occlusion. Radiation dose was low."
+
+    assert annotator.annotate(text).counts is annotator.annotate(text).counts
+
+    optimizer = MedicalParameterOptimizer()
+    assert optimizer._classify_core_section(text) == 'Physics & Safety'
+    assert 'critical_findings:acute' in optimizer._identify_high_yield_terms(text)
+    assert {'ct', 'angiography'} <= set(optimizer._extract_medical_entities(text))
+    # dose (5.0) + acute (4.5) + neuro: stroke (1) and ct angiography (0.5) x 1.3
+    assert abs(optimizer.calculate_medical_relevance_score(text) - (5.0 + 4.5 + 1.5 * 1.3)) < 1e-9
+
+
+if __name__ == "__main__":
+    test_counts_match_per_keyword_scans()
+    test_annotation_views()
+    test_annotate_many_keeps_order()
+    test_shared_annotator_serves_every_call_site()
+    print("Medical term annotator tests passed!")
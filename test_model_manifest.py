@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the local embedding model manifest
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from embeddings.model_manifest import ModelManifest, local_model_path
+
+
+def _fake_model(root: Path) -> Path:
+    model_dir = root / "radbert"
+    (model_dir / "1_Pooling").mkdir(parents=True)
+    (model_dir / "config.json").write_text('{"hidden_size": 768}', encoding='utf-8')
+    (model_dir / "model.safetensors").write_bytes(b"\x00" * 64)
+    (model_dir / "1_Pooling" / "config.json").write_text('{"pooling_mode_mean_tokens": true}', encoding='utf-8')
+    return model_dir
+
+
+def test_record_and_resolve():
+    """A recorded model resolves from disk, and survives a reload of the manifest"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        model_dir = _fake_model(Path(temp_dir))
+        manifest = ModelManifest(str(Path(temp_dir) / "model_manifest.json"))
+
+        assert local_model_path(str(model_dir)) == str(model_dir.resolve())
+
+        entry = manifest.record("radiology_optimized", "zzxslp/RadBERT-RoBERTa-4m", 768, path=str(model_dir))
+        manifest.save()
+        assert set(entry['files']) == {"config.json", "model.safetensors", "1_Pooling/config.json"}
+
+        reloaded = ModelManifest(str(Path(temp_dir) / "model_manifest.json"))
+        resolved = reloaded.resolve("radiology_optimized")
+        assert resolved['model_name'] == "zzxslp/RadBERT-RoBERTa-4m"
+        assert resolved['dimension'] == 768
+        assert reloaded.verify("radiology_optimized")
+        assert reloaded.resolve("clinical") is None
+
+
+def test_changed_files_are_detected():
+    """Missing or resized files make the entry stale; same-size edits fail verification"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        model_dir = _fake_model(Path(temp_dir))
+        manifest = ModelManifest(str(Path(temp_dir) / "model_manifest.json"))
+        manifest.record("radiology_optimized", "zzxslp/RadBERT-RoBERTa-4m", 768, path=str(model_dir))
+
+        (model_dir / "model.safetensors").write_bytes(b"\x01" * 64)
+        assert manifest.resolve("radiology_optimized") is not None
+        assert not manifest.verify("radiology_optimized")
+
+        (model_dir / "model.safetensors").write_bytes(b"\x01" * 32)
+        assert manifest.resolve("radiology_optimized") is None
+
+        (model_dir / "model.safetensors").unlink()
+        assert manifest.resolve("radiology_optimized") is None
+
+
+def test_models_without_local_copy_are_not_recorded():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manifest = ModelManifest(str(Path(temp_dir) / "model_manifest.json"))
+        assert manifest.record("radiology_optimized", str(Path(temp_dir) / "missing"), 768) is None
+        assert len(manifest) == 0
+
+
+if __name__ == "__main__":
+    test_record_and_resolve()
+    test_changed_files_are_detected()
+    test_models_without_local_copy_are_not_recorded()
+    print("Model manifest tests passed!")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test that the model registry loads each model once per process
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from embeddings.model_registry import ModelRegistry
+
+
+def test_concurrent_get_loads_once():
+    """Concurrent requests for the same model share a single load"""
+    registry = ModelRegistry()
+    load_calls = []
+
+    def loader():
+        load_calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("model", loader)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(load_calls) == 1
+    assert all(result is results[0] for result in results)
+
+    stats = registry.get_stats()
+    assert stats["model"]["load_seconds"] >= 0.05
+    assert "resident_memory_mb" in stats["model"]
+
+
+def test_failed_load_is_retried():
+    """A loader that raises is not cached"""
+    registry = ModelRegistry()
+    attempts = []
+
+    def flaky_loader():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("network unavailable")
+        return "model"
+
+    try:
+        registry.get("flaky", flaky_loader)
+    except RuntimeError:
+        pass
+
+    assert not registry.is_loaded("flaky")
+    assert registry.get("flaky", flaky_loader) == "model"
+    assert len(attempts) == 2
+
+
+if __name__ == "__main__":
+    test_concurrent_get_loads_once()
+    test_failed_load_is_retried()
+    print("Model registry tests passed!")
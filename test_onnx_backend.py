@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test the quantized ONNX embedding backend
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from embeddings.onnx_backend import compare_backends, load_quantized, resolve_backend
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+TEXTS = [
+    "Tension pneumothorax with mediastinal shift to the left.",
+    "Ring enhancing lesion in the right frontal lobe with vasogenic edema.",
+    "BI-RADS 4 irregular mass with spiculated margins.",
+    "Hounsfield units of simple fluid range from 0 to 20.",
+    "Target sign on ultrasound suggests intussusception in a child."
+]
+
+
+def test_int8_embeddings_track_fp32():
+    """The quantized export reproduces the fp32 embeddings closely"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        encoder = load_quantized(MODEL, onnx_dir=temp_dir)
+        fp32 = SentenceTransformer(MODEL, device="cpu").encode(TEXTS, convert_to_numpy=True)
+        int8 = encoder.encode(TEXTS, batch_size=2)
+
+        assert int8.shape == fp32.shape
+        assert encoder.get_sentence_embedding_dimension() == fp32.shape[1]
+        cosines = (fp32 * int8).sum(axis=1) / (np.linalg.norm(fp32, axis=1) * np.linalg.norm(int8, axis=1))
+        assert cosines.min() > 0.95
+        assert encoder.encode(TEXTS[0]).shape == (fp32.shape[1],)
+
+
+def test_comparison_harness_reports():
+    """Throughput, memory and retrieval overlap are reported for both backends"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        report = compare_backends(MODEL, TEXTS * 4, k=3, onnx_dir=temp_dir)
+
+        assert report['fp32']['texts_per_second'] and report['onnx_int8']['texts_per_second']
+        assert report['onnx_int8']['file_size_mb'] > 0
+        assert 0.0 <= report['top_3_overlap'] <= 1.0
+        assert report['mean_cosine_to_fp32'] > 0.95
+
+
+def test_backend_names_are_validated():
+    assert resolve_backend("onnx_int8") == "onnx_int8"
+    try:
+        resolve_backend("tensorrt")
+        assert False, "unknown backend accepted"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_int8_embeddings_track_fp32()
+    test_comparison_harness_reports()
+    test_backend_names_are_validated()
+    print("ONNX backend tests passed!")
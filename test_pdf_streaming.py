@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test streaming, page-wise PDF chunking
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import pymupdf
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from document_processor.pdf_processor import PDFProcessor
+
+
+def write_pdf(path: Path, pages):
+    doc = pymupdf.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+
+
+def test_streamed_chunks_match_whole_document_chunking():
+    """iter_chunks yields what semantic_chunking produces from the full text"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "textbook.pdf"
+        body = "Ring enhancing lesion with surrounding edema. " * 6
+        write_pdf(path, [
+            f"Introduction\n{body}\nImaging Findings",
+            f"{body}\nDifferential Diagnosis\n{body}",
+            f"{body * 3}"
+        ])
+
+        processor = PDFProcessor()
+        content = processor.extract_text_and_metadata(str(path))
+        expected = processor.semantic_chunking(content['text'], content['metadata'])
+        streamed = list(processor.iter_chunks(str(path)))
+
+        assert streamed == expected
+        assert content['metadata']['pages'] == 3
+
+
+def test_sections_continue_across_page_breaks():
+    """A header at the bottom of one page owns the text on the next"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "notes.pdf"
+        write_pdf(path, ["Imaging Findings", "Hyperdense clot in the MCA."])
+
+        chunks = list(PDFProcessor().iter_chunks(str(path)))
+
+        assert len(chunks) == 1
+        assert chunks[0]['metadata']['section'] == "Imaging Findings"
+        assert "Hyperdense clot" in chunks[0]['text']
+
+
+def test_page_iteration_can_stop_early():
+    """Closing the generator after one page releases the document"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "book.pdf"
+        write_pdf(path, [f"Page {number}" for number in range(1, 6)])
+
+        pages = PDFProcessor().iter_pages(str(path))
+        first = next(pages)
+        pages.close()
+
+        assert first['page_num'] == 1
+        assert "Page 1" in first['text']
+
+
+if __name__ == "__main__":
+    test_streamed_chunks_match_whole_document_chunking()
+    test_sections_continue_across_page_breaks()
+    test_page_iteration_can_stop_early()
+    print("PDF streaming tests passed!")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test the shared query embedding LRU cache
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from embeddings.query_embedding_cache import QueryEmbeddingCache
+
+
+class CountingModel:
+    """Stand-in SentenceTransformer that counts forward passes"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, show_progress_bar=False, convert_to_numpy=True):
+        self.calls += 1
+        return np.array([[float(len(text)), 1.0] for text in texts])
+
+
+def test_repeated_queries_hit_cache():
+    """Whitespace variants of a query share one forward pass per model"""
+    cache = QueryEmbeddingCache(max_entries=10)
+    model = CountingModel()
+
+    first = cache.encode(model, "radbert", "signs of  pneumonia")
+    second = cache.encode(model, "radbert", "  signs of pneumonia ")
+    assert model.calls == 1
+    assert np.array_equal(first, second)
+
+    cache.encode(model, "minilm", "signs of pneumonia")
+    assert model.calls == 2
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+
+
+def test_lru_bound():
+    """The least recently used query is evicted at capacity"""
+    cache = QueryEmbeddingCache(max_entries=2)
+    model = CountingModel()
+
+    cache.encode(model, "m", "a")
+    cache.encode(model, "m", "b")
+    cache.encode(model, "m", "a")
+    cache.encode(model, "m", "c")
+    assert cache.get_stats()['entries'] == 2
+
+    cache.encode(model, "m", "b")
+    assert model.calls == 4
+
+
+if __name__ == "__main__":
+    test_repeated_queries_hit_cache()
+    test_lru_bound()
+    print("Query embedding cache tests passed!")
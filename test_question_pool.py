@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test the pre-generated board question pool
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from study.question_pool import QuestionPool
+
+
+def _fake_generate(section, difficulty):
+    return {'question': f"{section} {difficulty} question", 'options': {'A': 'a', 'B': 'b', 'C': 'c', 'D': 'd'},
+            'correct_answer': 'A', 'explanation': 'because', 'success': True}
+
+
+def test_refill_take_and_persist():
+    """The most depleted queue is refilled first, takes are FIFO and the bank survives a reload"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bank_file = str(Path(temp_dir) / "question_bank.json")
+        targets = {('Neuroradiology', 'easy'): 2, ('Neuroradiology', 'hard'): 1}
+        pool = QuestionPool(bank_file, _fake_generate, targets)
+
+        assert pool.shortfall() == {('Neuroradiology', 'easy'): 2, ('Neuroradiology', 'hard'): 1}
+        while pool.refill_once():
+            pass
+        assert pool.shortfall() == {}
+        pool.save()
+
+        reloaded = QuestionPool(bank_file, _fake_generate, targets)
+        assert reloaded.depth('Neuroradiology', 'easy') == 2
+        assert reloaded.take('Neuroradiology', 'hard')['question'] == "Neuroradiology hard question"
+        assert reloaded.take('Neuroradiology', 'hard') is None
+        assert reloaded.shortfall() == {('Neuroradiology', 'hard'): 1}
+
+
+def test_failed_generation_is_not_pooled():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pool = QuestionPool(str(Path(temp_dir) / "question_bank.json"), lambda section, difficulty: None,
+                            {('Breast Imaging', 'easy'): 1})
+        assert not pool.refill_once()
+        assert pool.depth('Breast Imaging', 'easy') == 0
+
+
+def test_background_worker_tops_up_after_take():
+    """The worker fills the pool, sleeps, and refills what a session took"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pool = QuestionPool(str(Path(temp_dir) / "question_bank.json"), _fake_generate,
+                            {('Cardiothoracic', 'intermediate'): 3})
+        pool.start()
+        try:
+            deadline = time.time() + 5
+            while pool.shortfall() and time.time() < deadline:
+                time.sleep(0.01)
+            assert pool.depth('Cardiothoracic', 'intermediate') == 3
+
+            assert pool.take('Cardiothoracic', 'intermediate') is not None
+            deadline = time.time() + 5
+            while pool.shortfall() and time.time() < deadline:
+                time.sleep(0.01)
+            assert pool.depth('Cardiothoracic', 'intermediate') == 3
+        finally:
+            pool.stop(timeout=5)
+        assert not pool.running
+        assert (Path(temp_dir) / "question_bank.json").exists()
+
+
+if __name__ == "__main__":
+    test_refill_take_and_persist()
+    test_failed_generation_is_not_pooled()
+    test_background_worker_tops_up_after_take()
+    print("Question pool tests passed!")
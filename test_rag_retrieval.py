@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Test concurrent retrieval fan-out in the RAG system
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from retrieval.rag_system import RadiologyRAGSystem
+from llm.context_packer import ContextPacker
+from retrieval.answer_cache import SemanticAnswerCache
+
+
+class SlowEmbeddingSystem:
+    """Stand-in embedding system with a fixed search latency"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def search_similar_texts(self, query, n_results=5, search_type="dense"):
+        time.sleep(self.delay)
+        return {'documents': [["chunk"]], 'metadatas': [[{}]], 'distances': [[0.1]]}
+
+
+def make_rag(flashcard_delay: float, image_delay: float, **kwargs) -> RadiologyRAGSystem:
+    rag = RadiologyRAGSystem(**kwargs)
+
+    def search_flashcards(query, n_results=3):
+        time.sleep(flashcard_delay)
+        return [{'card_id': '1', 'front': "Sign of pneumothorax?", 'back': "Deep sulcus", 'deck_name': "Chest"}]
+
+    def search_images(query, n_results=2):
+        time.sleep(image_delay)
+        return [{'image_id': 'img'}]
+
+    rag._search_flashcards = search_flashcards
+    rag._search_images = search_images
+    return rag
+
+
+def test_sources_run_concurrently():
+    """Total retrieval time tracks the slowest source, not the sum"""
+    rag = make_rag(flashcard_delay=0.2, image_delay=0.2)
+
+    start = time.perf_counter()
+    results, timing = rag._retrieve_sources(SlowEmbeddingSystem(0.2), "pneumothorax", 5)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5
+    assert results['flashcards'][0]['card_id'] == '1'
+    assert timing['timed_out_sources'] == []
+    assert set(timing['source_latency_ms']) == {'documents', 'flashcards', 'images'}
+
+
+def test_slow_source_is_dropped():
+    """A source past its deadline is dropped without delaying the others"""
+    rag = make_rag(flashcard_delay=0.0, image_delay=1.0, source_timeouts={'images': 0.1})
+
+    start = time.perf_counter()
+    results, timing = rag._retrieve_sources(SlowEmbeddingSystem(0.0), "pneumothorax", 5)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5
+    assert results['images'] is None
+    assert results['documents']['documents'] == [["chunk"]]
+    assert timing['timed_out_sources'] == ['images']
+    assert timing['source_latency_ms']['images'] is None
+
+
+class StreamingLLMManager:
+    """Stand-in LLM manager that streams a fixed answer"""
+
+    def generate_response_stream(self, query, context_chunks, conversation_history=None):
+        for token in ["Deep ", "sulcus ", "sign"]:
+            yield {'type': 'token', 'content': token}
+        yield {'type': 'done', 'response': {'answer': "Deep sulcus sign", 'success': True,
+                                            'time_to_first_token_ms': 1.0}}
+
+
+def test_query_stream_sends_sources_first():
+    """query_stream yields sources before tokens and a complete response last"""
+    rag = make_rag(flashcard_delay=0.0, image_delay=0.0, enable_answer_cache=False, rerank=False)
+    rag.embedding_system = SlowEmbeddingSystem(0.0)
+    rag.llm_manager = StreamingLLMManager()
+
+    events = list(rag.query_stream("pneumothorax on supine film"))
+
+    assert events[0]['type'] == 'meta'
+    assert [source['type'] for source in events[0]['sources']] == ['document', 'flashcard', 'image']
+    assert events[0]['retrieval_info']['chunks_retrieved'] == 3
+    assert "".join(event['content'] for event in events if event['type'] == 'token') == "Deep sulcus sign"
+
+    response = events[-1]['response']
+    assert events[-1]['type'] == 'done'
+    assert response['sources'] == events[0]['sources']
+    assert response['time_to_first_token_ms'] == 1.0
+    assert response['retrieval_info']['time_to_first_token_ms'] >= 0
+
+
+class OneShotLLMManager:
+    """Stand-in for FallbackLLMManager, which has no streaming method"""
+
+    def generate_response(self, query, context_chunks, conversation_history=None):
+        return {'answer': "Deep sulcus sign", 'success': True}
+
+
+class FailingStreamLLMManager:
+    """Stand-in LLM manager whose stream breaks after the first token"""
+
+    def generate_response_stream(self, query, context_chunks, conversation_history=None):
+        yield {'type': 'token', 'content': "Deep "}
+        raise ConnectionError("Ollama went away")
+
+
+def test_query_stream_without_streaming_manager():
+    """A manager without generate_response_stream still answers through query_stream"""
+    rag = make_rag(flashcard_delay=0.0, image_delay=0.0, enable_answer_cache=False, rerank=False)
+    rag.embedding_system = SlowEmbeddingSystem(0.0)
+    rag.llm_manager = OneShotLLMManager()
+
+    events = list(rag.query_stream("pneumothorax on supine film"))
+
+    assert [event['type'] for event in events] == ['meta', 'token', 'done']
+    assert events[1]['content'] == "Deep sulcus sign"
+    assert events[-1]['response']['answer'] == "Deep sulcus sign"
+    assert events[-1]['response']['sources'] == events[0]['sources']
+
+
+def test_query_stream_reports_generation_errors():
+    """An exception mid-stream ends the stream with an error response"""
+    rag = make_rag(flashcard_delay=0.0, image_delay=0.0, enable_answer_cache=False, rerank=False)
+    rag.embedding_system = SlowEmbeddingSystem(0.0)
+    rag.llm_manager = FailingStreamLLMManager()
+
+    events = list(rag.query_stream("pneumothorax on supine film"))
+
+    assert events[-1]['type'] == 'done'
+    assert events[-1]['response']['success'] is False
+    assert "Ollama went away" in events[-1]['response']['error']
+
+
+def test_sources_cite_only_packed_context():
+    """Chunks the context packer drops are not listed as sources"""
+    rag = make_rag(flashcard_delay=0.0, image_delay=0.0, enable_answer_cache=False, rerank=False)
+    rag.embedding_system = SlowEmbeddingSystem(0.0)
+    rag.llm_manager = StreamingLLMManager()
+    rag.llm_manager.context_packer = ContextPacker(max_tokens=5)
+
+    events = list(rag.query_stream("pneumothorax on supine film"))
+
+    assert [source['type'] for source in events[0]['sources']] == ['document']
+    assert events[0]['retrieval_info']['chunks_retrieved'] == 3
+    assert events[0]['retrieval_info']['chunks_in_context'] == 1
+    assert events[-1]['response']['context_packing']['chunks_dropped'] == 2
+
+
+class HistoryAwareLLMManager(StreamingLLMManager):
+    """Stand-in LLM manager whose prompt includes the last two exchanges"""
+
+    HISTORY_TURNS = 2
+
+
+def test_answer_cache_is_keyed_on_prompt_history():
+    """Cached answers are reused only under the same recent history the prompt includes"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rag = make_rag(flashcard_delay=0.0, image_delay=0.0, rerank=False)
+        rag.embedding_system = SlowEmbeddingSystem(0.0)
+        rag.embedding_system.embed_query = lambda query: [1.0, 0.0]
+        rag.llm_manager = HistoryAwareLLMManager()
+        rag.answer_cache = SemanticAnswerCache(cache_dir=str(Path(tmp_dir) / "cache"),
+                                               corpus_version_file=str(Path(tmp_dir) / "corpus_version.json"))
+
+        def cache_hit(history):
+            events = list(rag.query_stream("what about in children?", conversation_history=history))
+            return events[-1]['response'].get('retrieval_info', {}).get('cache_hit', False)
+
+        chest = [{'question': "Signs of pneumothorax?", 'answer': {'answer': "Deep sulcus sign"}},
+                 {'question': "On CT?", 'answer': {'answer': "Air in the pleural space"}}]
+        neuro = [{'question': "Signs of subdural hematoma?", 'answer': {'answer': "Crescentic collection"}}]
+
+        assert not cache_hit(chest)
+        assert cache_hit(chest)
+        assert not cache_hit(neuro)
+        assert not cache_hit([])
+        # Exchanges older than the prompt's window don't change the key
+        assert cache_hit([{'question': "Unrelated earlier question", 'answer': "..."}] + chest)
+
+
+if __name__ == "__main__":
+    test_sources_run_concurrently()
+    test_slow_source_is_dropped()
+    test_query_stream_sends_sources_first()
+    test_query_stream_without_streaming_manager()
+    test_query_stream_reports_generation_errors()
+    test_sources_cite_only_packed_context()
+    test_answer_cache_is_keyed_on_prompt_history()
+    print("RAG retrieval tests passed!")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test the cross-encoder rerank stage
+"""
+
+import math
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from embeddings.model_registry import get_model_registry
+from retrieval.reranker import CrossEncoderReranker
+
+
+class KeywordCrossEncoder:
+    """Stand-in cross-encoder: relevance is whether the chunk mentions 'pneumothorax'
+
+    Returns raw logits in the range ms-marco-MiniLM-L-6-v2 produces.
+    """
+
+    def __init__(self, relevant_logit=6.5, irrelevant_logit=-10.2):
+        self.relevant_logit = relevant_logit
+        self.irrelevant_logit = irrelevant_logit
+        self.batches = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.batches.append(len(pairs))
+        return [self.relevant_logit if 'pneumothorax' in text.lower() else self.irrelevant_logit
+                for _, text in pairs]
+
+
+def make_reranker(model=None, **kwargs):
+    model = model or KeywordCrossEncoder()
+    get_model_registry().get(f"cross_encoder:{id(model)}", lambda: model)
+    return CrossEncoderReranker(str(id(model)), **kwargs), model
+
+
+def make_chunks():
+    return [
+        {'chunk_id': 'a', 'text': "Pleural effusion meniscus sign"},
+        {'chunk_id': 'b', 'text': "Tension pneumothorax shifts the mediastinum"},
+        {'chunk_id': 'c', 'text': "Deep sulcus sign of pneumothorax"},
+        {'chunk_id': 'd', 'text': "Cardiomegaly on PA film"}
+    ]
+
+
+def test_rerank_drops_below_threshold():
+    """Only chunks at or above the threshold are kept, in one batched forward pass"""
+    reranker, model = make_reranker()
+    kept, stats = reranker.rerank("pneumothorax signs", make_chunks(), threshold=0.7)
+
+    assert [chunk['chunk_id'] for chunk in kept] == ['b', 'c']
+    assert all(chunk['rerank_score'] == 0.9985 for chunk in kept)
+    assert model.batches == [4]
+    assert stats['rerank_candidates'] == 4
+    assert stats['rerank_kept'] == 2
+    assert stats['rerank_below_threshold'] is False
+
+
+def test_logits_are_mapped_to_probabilities():
+    """Raw logits, including negative ones, come back as scores in [0, 1]"""
+    reranker, _ = make_reranker(KeywordCrossEncoder(relevant_logit=1.2, irrelevant_logit=-800.0))
+    scores = reranker.score("pneumothorax", [(chunk['chunk_id'], chunk['text']) for chunk in make_chunks()])
+
+    assert all(0.0 <= score <= 1.0 for score in scores)
+    assert scores[0] == 0.0
+    assert abs(scores[1] - 0.7685) < 1e-4
+
+
+class SigmoidDefaultCrossEncoder(KeywordCrossEncoder):
+    """Stand-in for a CrossEncoder whose config sets a Sigmoid default activation"""
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False, activation_fct=None):
+        logits = super().predict(pairs, batch_size, show_progress_bar)
+        activation = activation_fct or (lambda values: [1 / (1 + math.exp(-value)) for value in values])
+        return list(activation(logits))
+
+
+def test_default_activation_is_not_applied_twice():
+    """Models with a built-in Sigmoid are asked for logits, so scores keep their full range"""
+    reranker, _ = make_reranker(SigmoidDefaultCrossEncoder())
+    kept, _ = reranker.rerank("pneumothorax signs", make_chunks(), threshold=0.7)
+
+    assert [chunk['chunk_id'] for chunk in kept] == ['b', 'c']
+    assert all(chunk['rerank_score'] == 0.9985 for chunk in kept)
+    assert reranker.score("pneumothorax signs", [('a', "Pleural effusion meniscus sign")])[0] < 0.001
+
+
+def test_best_chunks_kept_when_none_pass():
+    """When every chunk falls below the threshold the best min_kept survive"""
+    reranker, _ = make_reranker(KeywordCrossEncoder(relevant_logit=-1.5, irrelevant_logit=-9.0), min_kept=2)
+    kept, stats = reranker.rerank("pneumothorax signs", make_chunks(), threshold=0.7)
+
+    assert [chunk['chunk_id'] for chunk in kept] == ['b', 'c']
+    assert all(chunk['rerank_score'] < 0.7 for chunk in kept)
+    assert stats['rerank_below_threshold'] is True
+
+
+def test_scores_are_cached_per_query_and_chunk():
+    """Repeated (query, chunk id) pairs skip the model"""
+    reranker, model = make_reranker()
+    reranker.rerank("pneumothorax signs", make_chunks()[:2], threshold=0.7)
+    reranker.rerank("pneumothorax  signs", make_chunks(), threshold=0.7)
+
+    assert model.batches == [2, 2]
+    assert reranker.get_stats()['hits'] == 2
+
+
+def test_candidate_set_is_bounded():
+    """Chunks past max_candidates are never scored"""
+    reranker, model = make_reranker(max_candidates=3)
+    kept, stats = reranker.rerank("pneumothorax", make_chunks(), threshold=0.0, top_k=2)
+
+    assert model.batches == [3]
+    assert stats['rerank_candidates'] == 3
+    assert len(kept) == 2
+
+
+if __name__ == "__main__":
+    test_rerank_drops_below_threshold()
+    test_logits_are_mapped_to_probabilities()
+    test_default_activation_is_not_applied_twice()
+    test_best_chunks_kept_when_none_pass()
+    test_scores_are_cached_per_query_and_chunk()
+    test_candidate_set_is_bounded()
+    print("Reranker tests passed!")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test structured (single JSON document) study content and its per-section fallback
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from study.study_suggester import RadiologyStudySuggester
+
+SECTIONS = ['what_is_it', 'what_next_step', 'what_associated']
+
+
+def section_text(label):
+    return f"{label}: enough explanatory text to pass the structured content length check."
+
+
+class StubDispatcher:
+    """Stand-in for LLMDispatcher: the structured request gets a canned reply, section requests echo their prompt"""
+
+    def __init__(self, structured_reply, structured_error=None):
+        self.structured_reply = structured_reply
+        self.structured_error = structured_error
+        self.batches = []
+
+    def chat_many(self, requests, on_result=None):
+        self.batches.append(requests)
+        results = []
+        for index, request in enumerate(requests):
+            if request['format'] == 'json':
+                content, error = self.structured_reply, self.structured_error
+            else:
+                content, error = f"Per-section: {request['messages'][-1]['content'].splitlines()[0]}", None
+            results.append({'index': index, 'content': content, 'error': error, 'attempts': 1, 'seconds': 0.0})
+        return results
+
+
+def generate(structured_reply, structured_error=None):
+    suggester = RadiologyStudySuggester(structured_content=True)
+    suggester.dispatcher = StubDispatcher(structured_reply, structured_error)
+    content = suggester._generate_topic_content("pneumothorax", SECTIONS, "intermediate", structured=True)
+    return content, suggester.dispatcher.batches
+
+
+def section_calls(batches):
+    return sum(1 for batch in batches for request in batch if request['format'] != 'json')
+
+
+def test_valid_json_needs_one_call():
+    """Every section comes from the one structured reply, in template order"""
+    reply = json.dumps({section: section_text(section) for section in reversed(SECTIONS)})
+    content, batches = generate(reply)
+
+    assert list(content) == SECTIONS
+    assert content['what_next_step'] == section_text('what_next_step')
+    assert len(batches) == 1
+    assert section_calls(batches) == 0
+
+
+def test_fenced_json_is_accepted():
+    """A reply wrapped in a ```json fence still parses"""
+    reply = "```json\n" + json.dumps({section: section_text(section) for section in SECTIONS}) + "\n```"
+    content, batches = generate(reply)
+
+    assert content['what_is_it'] == section_text('what_is_it')
+    assert section_calls(batches) == 0
+
+
+def test_list_sections_become_bullets():
+    """A section returned as a list of strings is joined into bullet lines"""
+    reply = json.dumps({
+        'what_is_it': ["Air in the pleural space", "Visceral pleural line without lung markings"],
+        'what_next_step': section_text('what_next_step'),
+        'what_associated': section_text('what_associated')
+    })
+    content, batches = generate(reply)
+
+    assert content['what_is_it'] == "• Air in the pleural space\n• Visceral pleural line without lung markings"
+    assert section_calls(batches) == 0
+
+
+def test_short_and_missing_sections_fall_back_per_section():
+    """Only sections that are too short or absent are generated one by one"""
+    reply = json.dumps({'what_is_it': section_text('what_is_it'), 'what_next_step': "Chest tube."})
+    content, batches = generate(reply)
+
+    assert content['what_is_it'] == section_text('what_is_it')
+    assert content['what_next_step'].startswith('Per-section: Answer "What is the next step?"')
+    assert content['what_associated'].startswith('Per-section: Answer "What is it associated with?"')
+    assert len(batches) == 2
+    assert section_calls(batches) == 2
+
+
+def test_non_json_reply_falls_back_for_every_section():
+    """Free text, or a failed structured request, regenerates all sections"""
+    content, batches = generate("Pneumothorax is air in the pleural space.")
+    assert all(content[section].startswith("Per-section") for section in SECTIONS)
+    assert section_calls(batches) == len(SECTIONS)
+
+    content, batches = generate(None, structured_error="timed out")
+    assert all(content[section].startswith("Per-section") for section in SECTIONS)
+    assert section_calls(batches) == len(SECTIONS)
+
+
+if __name__ == "__main__":
+    test_valid_json_needs_one_call()
+    test_fenced_json_is_accepted()
+    test_list_sections_become_bullets()
+    test_short_and_missing_sections_fall_back_per_section()
+    test_non_json_reply_falls_back_for_every_section()
+    print("Study suggester tests passed!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the structured timing fields of lecture transcript segments
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from document_processor.transcript_processor import (LectureTranscriptProcessor, format_timestamp,
+                                                     timestamp_to_seconds)
+from embeddings.chunk_ids import flatten_metadata
+
+TRANSCRIPT = """Chest Imaging Lecture 3 - Pulmonary Nodules
+00:00
+Dr. Smith: Welcome everyone to the lecture on pulmonary nodules.
+00:45
+Today we discuss the Fleischner criteria.
+Resident: Is this on the board exam?
+Dr. Smith: Yes, this is testable.
+12:34
+Ground glass nodules need longer follow-up.
+1:02:03
+In conclusion, remember the size thresholds.
+"""
+
+
+def test_timestamp_conversion():
+    assert timestamp_to_seconds("12:34") == 754
+    assert timestamp_to_seconds("1:02:03") == 3723
+    assert timestamp_to_seconds("[00:45]") == 45
+    assert timestamp_to_seconds("95:10") == 5710  # Extended minutes
+    assert timestamp_to_seconds(None) is None
+    assert format_timestamp(754) == "12:34"
+    assert format_timestamp(3723) == "1:02:03"
+
+
+def test_segments_carry_numeric_timing():
+    """Each segment knows where it starts and ends in seconds, its speaker and its lecture"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "chest_lecture_3.txt"
+        path.write_text(TRANSCRIPT, encoding='utf-8')
+
+        processor = LectureTranscriptProcessor()
+        segments = processor.create_chunks(processor.process_transcript(str(path)))
+        timed = [segment['metadata'] for segment in segments if 'timestamp_seconds' in segment['metadata']]
+
+        assert [(m['timestamp_seconds'], m['segment_end_seconds']) for m in timed] == [
+            (0, 45), (45, 754), (45, 754), (45, 754), (754, 3723), (3723, 3723)
+        ]
+        assert [m['speaker'] for m in timed[:4]] == ['Smith', None, 'Resident', 'Smith']
+        assert all(m['lecture_title'] == "Chest Imaging Lecture 3 - Pulmonary Nodules" for m in timed)
+        # "exam" marks the segment as exam-relevant emphasis
+        assert 'exam_relevant' in timed[2]['emphasis_level']
+
+
+def test_metadata_is_flattened_for_the_vector_store():
+    """None is dropped, lists are joined and numbers stay numbers (so range filters work)"""
+    flat = flatten_metadata({
+        'timestamp_seconds': 754, 'speaker': None, 'content_type': ['imaging', 'clinical'],
+        'core_exam_relevant': True, 'timestamp': '12:34'
+    })
+    assert flat == {'timestamp_seconds': 754, 'content_type': 'imaging, clinical',
+                    'core_exam_relevant': True, 'timestamp': '12:34'}
+
+
+if __name__ == "__main__":
+    test_timestamp_conversion()
+    test_segments_carry_numeric_timing()
+    test_metadata_is_flattened_for_the_vector_store()
+    print("Transcript index tests passed!")